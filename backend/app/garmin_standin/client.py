@@ -0,0 +1,79 @@
+from typing import Any, Optional
+from garminconnect import (
+    GarminConnectAuthenticationError,
+    GarminConnectConnectionError,
+    GarminConnectTooManyRequestsError,
+)
+import json
+import requests
+
+class GarminStandInClient:
+    """
+    Garmin Connect 스탠드인 서버용 클라이언트
+
+    GarminService가 사용하는 garminconnect.Garmin의 메서드(login, get_activities,
+    get_activity_splits, get_activity_details, garth.dumps)를 같은 시그니처로 제공합니다.
+    HTTP 오류는 garminconnect와 같은 예외로 바꿔 던지므로 재시도/호출 제한 로직이 그대로 동작합니다.
+    """
+
+    def __init__(self, email: str, password: str, base_url: str):
+        """
+        GarminStandInClient 초기화
+
+        Args:
+            email (str): 계정 이메일
+            password (str): 계정 비밀번호
+            base_url (str): 스탠드인 서버 주소 (예: http://localhost:8002)
+        """
+        self.email = email
+        self.password = password
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.access_token = None
+        # GarminService는 client.garth.dumps()로 토큰을 저장함
+        self.garth = self
+
+    def login(self, tokenstore: Optional[str] = None) -> bool:
+        """
+        tokenstore가 있으면 저장된 토큰으로 세션을 재개하고, 없으면 전체 로그인합니다.
+        """
+        if tokenstore:
+            self.loads(tokenstore)
+            self._get("/userprofile-service/socialProfile")
+            return True
+        response = self.session.post(f"{self.base_url}/sso/login", json={"email": self.email, "password": self.password})
+        self._raise_for_status(response)
+        self.access_token = response.json()["access_token"]
+        return True
+
+    def get_activities(self, start: int = 0, limit: int = 20) -> list:
+        return self._get("/activitylist-service/activities/search/activities", params={"start": start, "limit": limit})
+
+    def get_activity_splits(self, activity_id) -> dict:
+        return self._get(f"/activity-service/activity/{activity_id}/splits")
+
+    def get_activity_details(self, activity_id, maxchart: int = 2000, maxpoly: int = 4000) -> dict:
+        return self._get(f"/activity-service/activity/{activity_id}/details", params={"maxChartSize": maxchart, "maxPolylineSize": maxpoly})
+
+    def dumps(self) -> str:
+        return json.dumps({"access_token": self.access_token})
+
+    def loads(self, tokens: str) -> None:
+        self.access_token = json.loads(tokens)["access_token"]
+
+    def _get(self, path: str, params: dict = None) -> Any:
+        response = self.session.get(
+            f"{self.base_url}{path}",
+            params=params,
+            headers={"Authorization": f"Bearer {self.access_token}"}
+        )
+        self._raise_for_status(response)
+        return response.json()
+
+    def _raise_for_status(self, response: requests.Response) -> None:
+        if response.status_code == 401:
+            raise GarminConnectAuthenticationError(f"Authentication error: {response.text}")
+        if response.status_code == 429:
+            raise GarminConnectTooManyRequestsError(f"Too many requests: {response.text}")
+        if response.status_code >= 400:
+            raise GarminConnectConnectionError(f"Error {response.status_code}: {response.text}")
@@ -0,0 +1,222 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+import os
+import random
+import threading
+import zlib
+
+from app.services.garmin_archive import ACTIVITY, DETAILS, SPLITS, GarminArchive
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# 합성 활동 ID 시작값 (실제 Garmin 활동 ID와 겹치지 않도록 큰 값 사용)
+SYNTHETIC_ACTIVITY_ID_BASE = 90_000_000_000
+# 계정마다 배정하는 합성 활동 ID 구간 크기 (계정별 최대 활동 수)
+SYNTHETIC_IDS_PER_ACCOUNT = 1_000_000
+
+# 합성 활동을 만든 순서대로 계정에 붙이는 번호 (이메일 해시 대신 번호로 ID 구간을 나눠 계정 간 ID가 겹치지 않음)
+_account_numbers: Dict[str, int] = {}
+_account_numbers_lock = threading.Lock()
+
+class FixtureSet:
+    """
+    Garmin 스탠드인 서버가 한 계정에 대해 돌려줄 활동/랩 응답 모음
+
+    활동은 Garmin과 같이 최신순으로 정렬되어 있으며, 응답 형식은
+    get_activities / get_activity_splits 응답과 같습니다.
+    """
+
+    def __init__(self, activities: List[dict], splits: Dict[int, dict], details: Dict[int, dict] = None):
+        self.activities = sorted(activities, key=lambda activity: activity["startTimeLocal"], reverse=True)
+        self.splits = splits
+        self.details = details if details is not None else {}
+
+    def page(self, start: int, limit: int) -> List[dict]:
+        return self.activities[start:start + limit]
+
+    def get_splits(self, activity_id: int) -> Optional[dict]:
+        return self.splits.get(activity_id)
+
+    def get_details(self, activity_id: int, max_chart: int) -> Optional[dict]:
+        """
+        초 단위 샘플(get_activity_details) 응답을 반환합니다.
+        기록된 응답이 없으면 랩 데이터로 합성 샘플을 만듭니다. (max_chart보다 많으면 간격을 두고 줄임)
+        """
+        if activity_id not in self.details:
+            activity = next((item for item in self.activities if item["activityId"] == activity_id), None)
+            splits = self.splits.get(activity_id)
+            if activity is None or splits is None:
+                return None
+            self.details[activity_id] = _synthetic_details(activity, splits["lapDTOs"])
+        details = self.details[activity_id]
+        metrics = details["activityDetailMetrics"]
+        if len(metrics) <= max_chart:
+            return details
+        step = -(-len(metrics) // max_chart)
+        return {**details, "activityDetailMetrics": metrics[::step], "measurementCount": len(metrics[::step])}
+
+def load_recorded(directory: str) -> FixtureSet:
+    """
+    Garmin 원본 응답 보관소(GarminArchive)에 기록된 한 사용자의 응답을 불러옵니다.
+
+    Args:
+        directory (str): {GARMIN_ARCHIVE_DIR}/{user_id} 디렉토리
+
+    Returns:
+        FixtureSet: 기록된 활동/랩 응답
+    """
+    root, user_dir = os.path.split(os.path.normpath(directory))
+    archive = GarminArchive(root)
+    activities = []
+    splits = {}
+    details = {}
+    for user_id, activity_id in archive.iter_entries(int(user_dir)):
+        activity = archive.load(user_id, activity_id, ACTIVITY)
+        if activity is None:
+            continue
+        activities.append(activity)
+        activity_splits = archive.load(user_id, activity_id, SPLITS)
+        if activity_splits is not None:
+            splits[activity_id] = activity_splits
+        activity_details = archive.load(user_id, activity_id, DETAILS)
+        if activity_details is not None:
+            details[activity_id] = activity_details
+    logger.info(f"Loaded {len(activities)} recorded activities from {directory}")
+    return FixtureSet(activities, splits, details)
+
+def generate_synthetic(email: str, count: int, end: datetime = None) -> FixtureSet:
+    """
+    계정별로 항상 같은 합성 러닝 활동을 만듭니다. (이메일로 난수 시드 결정)
+    활동 ID는 프로세스 안에서 계정에 처음 배정된 번호의 구간을 쓰므로 다른 계정과 겹치지 않습니다.
+
+    Args:
+        email (str): Garmin 계정 이메일
+        count (int): 활동 수
+        end (datetime, optional): 가장 최근 활동 날짜 기준. 기본값은 오늘
+
+    Returns:
+        FixtureSet: 합성 활동/랩 응답
+    """
+    if count >= SYNTHETIC_IDS_PER_ACCOUNT:
+        raise ValueError(f"Synthetic accounts hold at most {SYNTHETIC_IDS_PER_ACCOUNT - 1} activities")
+    rng = random.Random(zlib.crc32(email.encode()))
+    end = (end or datetime.now()).replace(hour=7, minute=0, second=0, microsecond=0)
+    with _account_numbers_lock:
+        account_number = _account_numbers.setdefault(email, len(_account_numbers))
+    id_base = SYNTHETIC_ACTIVITY_ID_BASE + account_number * SYNTHETIC_IDS_PER_ACCOUNT
+
+    activities = []
+    splits = {}
+    for index in range(count):
+        activity_id = id_base + count - index
+        start_local = end - timedelta(days=index, minutes=rng.randint(0, 120))
+        start_gmt = start_local - timedelta(hours=9)
+        laps = rng.randint(3, 21)
+        pace = rng.uniform(270, 390)  # 초/km
+        average_hr = rng.randint(130, 170)
+        activity, lap_dtos = _synthetic_run(activity_id, start_local, start_gmt, laps, pace, average_hr, rng)
+        activities.append(activity)
+        splits[activity_id] = {"activityId": activity_id, "lapDTOs": lap_dtos}
+    return FixtureSet(activities, splits)
+
+def _synthetic_run(activity_id, start_local, start_gmt, laps, pace, average_hr, rng):
+    lap_dtos = []
+    elapsed = 0.0
+    for lap_index in range(1, laps + 1):
+        duration = pace * rng.uniform(0.95, 1.05)
+        lap_dtos.append({
+            "lapIndex": lap_index,
+            "startTimeGMT": (start_gmt + timedelta(seconds=elapsed)).strftime("%Y-%m-%dT%H:%M:%S.0"),
+            "distance": 1000.0,
+            "duration": duration,
+            "movingDuration": duration,
+            "averageSpeed": 1000.0 / duration,
+            "maxSpeed": 1000.0 / duration * 1.15,
+            "averageHR": average_hr + rng.randint(-5, 5),
+            "maxHR": average_hr + rng.randint(5, 15),
+            "averageRunCadence": rng.uniform(165, 185),
+            "maxRunCadence": rng.uniform(185, 195),
+            "calories": 65,
+        })
+        elapsed += duration
+
+    distance = 1000.0 * laps
+    zones = [elapsed * share for share in (0.05, 0.25, 0.4, 0.2, 0.1)]
+    activity = {
+        "activityId": activity_id,
+        "activityName": "Running",
+        "startTimeLocal": start_local.strftime(DATETIME_FORMAT),
+        "startTimeGMT": start_gmt.strftime(DATETIME_FORMAT),
+        "endTimeGMT": (start_gmt + timedelta(seconds=elapsed)).strftime(DATETIME_FORMAT),
+        "activityType": {"typeId": 1, "typeKey": "running", "parentTypeId": 17, "isHidden": False, "restricted": False, "trimmable": True},
+        "eventType": {"typeId": 9, "typeKey": "uncategorized", "sortOrder": 10},
+        "privacy": {"typeId": 2, "typeKey": "private"},
+        "distance": distance,
+        "duration": elapsed,
+        "elapsedDuration": elapsed,
+        "movingDuration": elapsed,
+        "averageSpeed": distance / elapsed,
+        "maxSpeed": distance / elapsed * 1.2,
+        "averageHR": average_hr,
+        "maxHR": average_hr + 20,
+        "averageRunningCadenceInStepsPerMinute": 176.0,
+        "maxRunningCadenceInStepsPerMinute": 190.0,
+        "calories": 65 * laps,
+        "steps": int(elapsed * 176 / 60),
+        "lapCount": laps,
+        "vO2MaxValue": 50.0,
+        "activityTrainingLoad": elapsed / 60 * (average_hr - 100) / 20,
+        "aerobicTrainingEffect": 3.0,
+        "anaerobicTrainingEffect": 1.0,
+        "trainingEffectLabel": "TEMPO",
+        "timeZoneId": 164,
+        "sportTypeId": 1,
+        "deviceId": 3_000_000_000,
+        "manufacturer": "GARMIN",
+        "manualActivity": False,
+        "favorite": False,
+        "elevationCorrected": False,
+        "waterEstimated": 500.0,
+        "moderateIntensityMinutes": int(elapsed / 120),
+        "vigorousIntensityMinutes": int(elapsed / 120),
+    }
+    for zone, seconds in enumerate(zones, start=1):
+        activity[f"hrTimeInZone_{zone}"] = seconds
+    return activity, lap_dtos
+
+# 합성 get_activity_details 응답의 메트릭 순서
+DETAIL_METRIC_KEYS = (
+    "directTimestamp", "sumDuration", "sumDistance", "directHeartRate", "directSpeed",
+    "directRunCadence", "directElevation", "directLatitude", "directLongitude",
+)
+
+def _synthetic_details(activity: dict, lap_dtos: List[dict]) -> dict:
+    """
+    랩별 속도/심박을 따라가는 1초 간격 샘플을 만듭니다. (활동 ID로 난수 시드 결정)
+    """
+    rng = np.random.default_rng(activity["activityId"] % (2 ** 32))
+    speed = np.concatenate([np.full(int(round(lap["duration"])), lap["averageSpeed"]) for lap in lap_dtos])
+    hr = np.concatenate([np.full(int(round(lap["duration"])), lap["averageHR"]) for lap in lap_dtos])
+    count = len(speed)
+    speed = np.clip(speed + rng.normal(0, 0.15, count), 0, None)
+    hr = np.round(hr + rng.normal(0, 2, count))
+    distance = np.cumsum(speed)
+    seconds = np.arange(count, dtype=np.float64)
+    start = datetime.strptime(activity["startTimeGMT"], DATETIME_FORMAT)
+    timestamp = (start - datetime(1970, 1, 1)).total_seconds() * 1000 + seconds * 1000
+    cadence = np.round(176 + rng.normal(0, 3, count))
+    altitude = 30 + 10 * np.sin(distance / 2000)
+    latitude = 37.5 + distance / 111_000 * 0.7
+    longitude = 127.0 + distance / 88_000 * 0.7
+
+    columns = np.column_stack([timestamp, seconds, distance, hr, speed, cadence, altitude, latitude, longitude])
+    return {
+        "activityId": activity["activityId"],
+        "measurementCount": count,
+        "metricsCount": len(DETAIL_METRIC_KEYS),
+        "metricDescriptors": [{"metricsIndex": index, "key": key} for index, key in enumerate(DETAIL_METRIC_KEYS)],
+        "activityDetailMetrics": [{"metrics": row} for row in columns.tolist()],
+    }
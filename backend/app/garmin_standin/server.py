@@ -0,0 +1,163 @@
+"""
+네트워크 없이 Garmin 동기화를 테스트/벤치마크하기 위한 Garmin Connect 스탠드인 서버
+
+garminconnect가 사용하는 경로(활동 목록, 랩, 초 단위 샘플)를 같은 형식으로 흉내 내며,
+응답 지연, 오류율, 토큰별 분당 호출 한도(초과 시 429)를 설정할 수 있습니다.
+
+실행:
+    uvicorn app.garmin_standin.server:app --port 8002
+
+GarminService는 GARMIN_STANDIN_URL=http://localhost:8002 으로 이 서버를 사용합니다.
+"""
+from collections import deque
+from typing import Dict, Optional
+from fastapi import FastAPI, HTTPException, Header, Query
+from pydantic import BaseModel
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from app.garmin_standin.fixtures import FixtureSet, generate_synthetic, load_recorded
+
+logger = logging.getLogger(__name__)
+
+class StandInConfig(BaseModel):
+    latency_ms: float = float(os.getenv("STANDIN_LATENCY_MS", "150"))  # API 응답 평균 지연
+    latency_jitter_ms: float = float(os.getenv("STANDIN_LATENCY_JITTER_MS", "50"))  # 지연 편차 (균등 분포)
+    login_latency_ms: float = float(os.getenv("STANDIN_LOGIN_LATENCY_MS", "2500"))  # 전체 로그인(SSO) 지연
+    error_rate: float = float(os.getenv("STANDIN_ERROR_RATE", "0"))  # 500 응답 비율 (0~1)
+    quota_per_minute: int = int(os.getenv("STANDIN_QUOTA_PER_MINUTE", "0"))  # 토큰별 한도 구간(기본 1분)당 호출 한도 (0이면 무제한)
+    quota_window_seconds: float = float(os.getenv("STANDIN_QUOTA_WINDOW_SECONDS", "60"))  # 호출 한도를 세는 구간 (초, 테스트에서 짧게 설정)
+    activities_per_account: int = int(os.getenv("STANDIN_ACTIVITIES", "200"))  # 합성 활동 수
+    fixtures_dir: Optional[str] = os.getenv("STANDIN_FIXTURES_DIR")  # 기록된 응답 디렉토리 ({GARMIN_ARCHIVE_DIR}/{user_id})
+
+app = FastAPI(title="Garmin Connect stand-in")
+config = StandInConfig()
+
+_lock = threading.Lock()
+_sessions: Dict[str, str] = {}  # 토큰 -> 이메일
+_fixtures: Dict[str, FixtureSet] = {}  # 이메일 -> 응답 모음
+_calls: Dict[str, deque] = {}  # 토큰 -> 최근 한도 구간 안의 호출 시각
+_stats = {"logins": 0, "requests": 0, "rate_limited": 0, "errors": 0}
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+def _get_fixtures(email: str) -> FixtureSet:
+    with _lock:
+        if email not in _fixtures:
+            if config.fixtures_dir:
+                _fixtures[email] = load_recorded(config.fixtures_dir)
+            else:
+                _fixtures[email] = generate_synthetic(email, config.activities_per_account)
+        return _fixtures[email]
+
+async def _simulate(authorization: Optional[str]) -> str:
+    """
+    인증, 호출 한도, 오류율, 지연을 적용하고 요청한 계정의 이메일을 반환합니다.
+    """
+    token = (authorization or "").replace("Bearer ", "")
+    email = _sessions.get(token)
+    if email is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    with _lock:
+        _stats["requests"] += 1
+        if config.quota_per_minute:
+            now = time.monotonic()
+            calls = _calls.setdefault(token, deque())
+            while calls and now - calls[0] >= config.quota_window_seconds:
+                calls.popleft()
+            if len(calls) >= config.quota_per_minute:
+                _stats["rate_limited"] += 1
+                raise HTTPException(status_code=429, detail="Too Many Requests")
+            calls.append(now)
+        if config.error_rate and random.random() < config.error_rate:
+            _stats["errors"] += 1
+            raise HTTPException(status_code=500, detail="Simulated server error")
+
+    latency_ms = config.latency_ms + random.uniform(-config.latency_jitter_ms, config.latency_jitter_ms)
+    await asyncio.sleep(max(latency_ms, 0) / 1000)
+    return email
+
+@app.post("/sso/login")
+async def login(request: LoginRequest):
+    # 실제 SSO처럼 느린 전체 로그인. 비밀번호가 "invalid"면 실패
+    await asyncio.sleep(config.login_latency_ms / 1000)
+    if request.password == "invalid":
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    token = uuid.uuid4().hex
+    with _lock:
+        _sessions[token] = request.email
+        _stats["logins"] += 1
+    return {"access_token": token}
+
+@app.get("/userprofile-service/socialProfile")
+async def get_profile(authorization: Optional[str] = Header(None)):
+    # 저장된 토큰으로 세션을 재개할 때 토큰 검증용으로 호출됨
+    email = await _simulate(authorization)
+    return {"displayName": email.split("@")[0], "userName": email}
+
+@app.get("/activitylist-service/activities/search/activities")
+async def get_activities(
+    start: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=1000),
+    authorization: Optional[str] = Header(None)
+):
+    email = await _simulate(authorization)
+    return _get_fixtures(email).page(start, limit)
+
+@app.get("/activity-service/activity/{activity_id}/splits")
+async def get_activity_splits(activity_id: int, authorization: Optional[str] = Header(None)):
+    email = await _simulate(authorization)
+    splits = _get_fixtures(email).get_splits(activity_id)
+    if splits is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return splits
+
+@app.get("/activity-service/activity/{activity_id}/details")
+async def get_activity_details(
+    activity_id: int,
+    maxChartSize: int = Query(2000, ge=1),
+    authorization: Optional[str] = Header(None)
+):
+    email = await _simulate(authorization)
+    details = _get_fixtures(email).get_details(activity_id, maxChartSize)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return details
+
+@app.get("/_standin/config")
+async def get_config():
+    return config
+
+@app.put("/_standin/config")
+async def update_config(new_config: StandInConfig):
+    """
+    실행 중에 지연/오류율/한도 설정을 바꿉니다. (fixture 설정이 바뀌면 캐시된 응답을 버림)
+    """
+    global config
+    with _lock:
+        if (new_config.fixtures_dir, new_config.activities_per_account) != (config.fixtures_dir, config.activities_per_account):
+            _fixtures.clear()
+        config = new_config
+    return config
+
+@app.get("/_standin/stats")
+async def get_stats():
+    return _stats
+
+@app.post("/_standin/reset")
+async def reset():
+    with _lock:
+        _sessions.clear()
+        _fixtures.clear()
+        _calls.clear()
+        for key in _stats:
+            _stats[key] = 0
+    return {"message": "Stand-in state reset"}
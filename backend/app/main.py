@@ -1,22 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, date
 import logging
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 import time
 from sqlalchemy.orm import relationship
-from app.models.base import Base
+from app.database import SessionLocal, ReadSessionLocal, init_db, get_db, get_read_db, get_async_read_db
+from app.models.activity import Activity
 from app.models.user import User
 from app.models.training import TrainingLog, SleepLog
-from app.services.activity_service import ActivityService
+from app.services.activity_service import ActivityService, AsyncActivityService
+from app.services.best_effort_service import BestEffortService
+from app.services.data_version import ACTIVITIES, COMMENTS, FEEDBACK, SCHEDULES, bump_data_version
 from app.services.garmin_service import GarminService
+from app.services.garmin_token_store import GarminTokenStore
+from app.services.race_prediction_service import RacePredictionService
+from app.services.response_cache import ResponseCache, encode_body
+from app.services.stats_service import StatsService
+from app.services.sync_job_service import SyncJobService
+from app.services.training_load_service import TrainingLoadService
+from app.services.zone_analytics_service import ZoneAnalyticsService
 import os
+import json
 import aiohttp
 
-from app.services.schedule_service import ScheduleService
+from app.services.schedule_service import ScheduleService, AsyncScheduleService
 
 # 로깅 설정
 logging.basicConfig(
@@ -33,35 +45,34 @@ class GarminSyncRequest(BaseModel):
     garmin_email: str
     garmin_password: str
 
-# 데이터베이스 설정
-SQLALCHEMY_DATABASE_URL = "sqlite:///./marathon.db?check_same_thread=False"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# 데이터베이스 테이블 생성
-def init_db():
-    Base.metadata.create_all(bind=engine)
-
 app = FastAPI()
 
 # 앱 시작 시 데이터베이스 초기화
 @app.on_event("startup")
 async def startup():
+    # Garmin 토큰 암호화 키가 없으면 시작할 때 경고를 남김 (토큰 저장소 없이 매번 전체 로그인)
+    GarminTokenStore()
     init_db()
+    # 롤업 테이블이 새로 생성된 경우 기존 활동으로 채움
+    db = SessionLocal()
+    try:
+        stats_service = StatsService(db)
+        if stats_service.is_empty():
+            stats_service.rebuild()
+        training_load_service = TrainingLoadService(db)
+        if training_load_service.is_empty():
+            training_load_service.rebuild()
+        best_effort_service = BestEffortService(db)
+        if best_effort_service.is_empty():
+            best_effort_service.rebuild()
+    finally:
+        db.close()
 
 @app.get("/dbinit")
 async def dbinit():
     init_db()
     return {"message": "Database initialized"}
 
-# 의존성 주입
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # 요청/응답 로깅 미들웨어
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -88,20 +99,9 @@ async def log_requests(request: Request, call_next):
     # 응답 처리
     response = await call_next(request)
     
-    # 응답 시간 계산
+    # 응답 시간 계산 (응답 헤더가 준비될 때까지)
     process_time = time.time() - start_time
     
-    # 응답 본문 가져오기
-    response_body = b""
-    async for chunk in response.body_iterator:
-        response_body += chunk
-    
-    # 응답 본문 디코딩
-    try:
-        response_body = response_body.decode()
-    except:
-        response_body = str(response_body)
-    
     # 응답 정보 로깅
     logger.info(f"""
     Response:
@@ -110,16 +110,11 @@ async def log_requests(request: Request, call_next):
     Body: 생략
     """)
     
-    # 응답 본문을 다시 설정
-    return Response(
-        content=response_body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type
-    )
+    # 본문은 로깅하지 않으므로 읽지 않고 그대로 반환 (내보내기/시계열 응답이 버퍼링되지 않고 스트리밍됨)
+    return response
 
 @app.get("/users/{user_id}")
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: Session = Depends(get_read_db)):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -149,7 +144,7 @@ async def update_user(user_id: int, user_data: dict, db: Session = Depends(get_d
     return user
 
 @app.post("/users/garmin/{user_id}")
-async def update_garmin_sync(user_id: int, garmin_data: dict, db: Session = Depends(get_db)):
+def update_garmin_sync(user_id: int, garmin_data: dict, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -160,6 +155,8 @@ async def update_garmin_sync(user_id: int, garmin_data: dict, db: Session = Depe
         user.garmin_password = None
         user.garmin_sync_status = "disconnected"
         user.garmin_sync_date = None
+        GarminTokenStore().delete(user_id)
+        GarminTokenStore().delete_credentials(user_id)
         db.commit()
         db.refresh(user)
         return {
@@ -169,7 +166,7 @@ async def update_garmin_sync(user_id: int, garmin_data: dict, db: Session = Depe
     
     # 가민 연동인 경우
     garmin_service = GarminService(db)
-    if not garmin_service.check_garmin_login(garmin_data["garmin_email"], garmin_data["garmin_password"]):
+    if not garmin_service.check_garmin_login(garmin_data["garmin_email"], garmin_data["garmin_password"], user_id):
         raise HTTPException(status_code=400, detail="Garmin login failed")
     
     user.garmin_email = garmin_data["garmin_email"]
@@ -179,6 +176,8 @@ async def update_garmin_sync(user_id: int, garmin_data: dict, db: Session = Depe
     
     db.commit()
     db.refresh(user)
+    # 이후 동기화 작업이 이전 로그인 정보를 쓰지 않도록 함께 갱신
+    GarminTokenStore().save_credentials(user_id, user.garmin_email, user.garmin_password)
     return {
         "garmin_sync_date": user.garmin_sync_date,
         "garmin_sync_status": user.garmin_sync_status
@@ -210,37 +209,195 @@ async def register(user_data: dict, db: Session = Depends(get_db)):
     return {"message": "Registration successful", "user_id": user.id}
 
 @app.get("/activities/user/{user_id}")
-async def get_activities(user_id: int, db: Session = Depends(get_db)):
+def get_activities(
+    user_id: int,
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    # limit 없이 전체 이력을 돌려줄 수 있으므로 이벤트 루프를 막지 않도록 스레드풀에서 실행하는 동기 라우트로 두고,
+    # FastAPI가 이벤트 루프에서 직렬화하지 않도록 JSON 본문까지 여기서 만들어 반환
     activity_service = ActivityService(db)
-    return activity_service.get_activities(user_id)
+    activities = activity_service.get_activities(user_id, start_date, end_date, cursor, limit, fields)
+    headers = {}
+    # 다음 페이지가 있을 수 있으면 커서를 헤더로 전달 (본문 형식은 기존과 동일하게 유지)
+    if limit is not None and len(activities) == limit:
+        last = activities[-1]
+        headers["X-Next-Cursor"] = ActivityService.encode_cursor(last["start_time_local"], last["id"])
+    return Response(content=encode_body(activities), media_type="application/json", headers=headers)
+
+@app.get("/activities/export/user/{user_id}")
+def export_activities(
+    user_id: int,
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    fields: Optional[str] = None
+):
+    # 스트리밍이 끝날 때까지 세션을 유지해야 하므로 의존성 대신 직접 생성
+    db = ReadSessionLocal()
+    activities = ActivityService(db).iter_activities(user_id, start_date, end_date, fields)
+    try:
+        first = next(activities, None)
+    except Exception:
+        db.close()
+        raise
+
+    def generate():
+        try:
+            if first is not None:
+                yield json.dumps(first, default=str, ensure_ascii=False) + "\n"
+                for activity in activities:
+                    yield json.dumps(activity, default=str, ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @app.get("/activities/user/{user_id}/{activity_id}")
-async def get_activity(user_id: int, activity_id: int, db: Session = Depends(get_db)):
-    activity_service = ActivityService(db)
-    return activity_service.get_activity(user_id, activity_id)
+async def get_activity(user_id: int, activity_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db)):
+    activity_service = AsyncActivityService(db)
+    return await activity_service.get_activity(user_id, activity_id, fields)
+
+@app.get("/activities/samples/user/{user_id}/{activity_id}")
+def get_activity_samples(user_id: int, activity_id: int, channels: Optional[str] = None):
+    # 샘플은 DB가 아닌 활동별 파일에서 읽으므로 DB 세션을 사용하지 않음
+    channel_list = [channel.strip() for channel in channels.split(",") if channel.strip()] if channels else None
+    return ActivityService(None).get_activity_samples(user_id, activity_id, channel_list)
+
+@app.get("/activities/series/user/{user_id}/{activity_id}")
+def get_activity_series(
+    user_id: int,
+    activity_id: int,
+    channels: Optional[str] = None,
+    axis: str = "time",
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    step: int = Query(1, ge=1)
+):
+    # 메모리 맵으로 연 채널의 구간 view를 묶음 단위 NDJSON으로 스트리밍
+    channel_list = [channel.strip() for channel in channels.split(",") if channel.strip()] if channels else None
+    activity_service = ActivityService(None)
+    result = activity_service.get_activity_series(user_id, activity_id, channel_list, axis, start, end, step)
+
+    def generate():
+        for chunk in activity_service.iter_series_chunks(result):
+            yield json.dumps(chunk, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @app.get("/activities/laps/user/{user_id}")
-async def get_activities_laps_with_comments(user_id: int, db: Session = Depends(get_db)):
-    activity_service = ActivityService(db)
-    return activity_service.get_activities_laps_with_comments(user_id)
+async def get_activities_laps_with_comments(
+    user_id: int,
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500)
+):
+    def next_cursor(activities):
+        if limit is not None and len(activities) == limit:
+            last = activities[-1]
+            return {"X-Next-Cursor": ActivityService.encode_cursor(last["local_start_time"], last["id"])}
+        return {}
+
+    def compute():
+        # 전체 이력의 랩/댓글을 변환하는 무거운 조회이므로 이벤트 루프 대신 스레드풀에서 동기 세션으로 실행
+        db = ReadSessionLocal()
+        try:
+            return ActivityService(db).get_activities_laps_with_comments(user_id, start_date, end_date, cursor, limit)
+        finally:
+            db.close()
+
+    return await ResponseCache().get_or_set(
+        "activities_laps", user_id, (ACTIVITIES, COMMENTS, FEEDBACK),
+        lambda: run_in_threadpool(compute),
+        params={"from": start_date, "to": end_date, "cursor": cursor, "limit": limit},
+        headers=next_cursor
+    )
 
 @app.get("/activities/summary/user/{user_id}")
-async def get_activity_summary(user_id: int, db: Session = Depends(get_db)):
-    activity_service = ActivityService(db)
-    return activity_service.get_activity_summary(user_id)
+async def get_activity_summary(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    activity_service = AsyncActivityService(db)
+    return await ResponseCache().get_or_set(
+        "activity_summary", user_id, (ACTIVITIES,), lambda: activity_service.get_activity_summary(user_id)
+    )
 
 @app.get("/activities/monthly-summary/user/{user_id}")
-async def get_monthly_activity_summary(user_id: int, db: Session = Depends(get_db)):
-    activity_service = ActivityService(db)
-    return activity_service.get_monthly_activity_summary(user_id)
+async def get_monthly_activity_summary(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    activity_service = AsyncActivityService(db)
+    return await ResponseCache().get_or_set(
+        "monthly_activity_summary", user_id, (ACTIVITIES,), lambda: activity_service.get_monthly_activity_summary(user_id)
+    )
 
+@app.get("/activities/training-load/user/{user_id}")
+def get_training_load(
+    user_id: int,
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db)
+):
+    training_load_service = TrainingLoadService(db)
+    return training_load_service.get_training_load(user_id, start_date, end_date)
+
+@app.get("/activities/personal-records/user/{user_id}")
+def get_personal_records(user_id: int, db: Session = Depends(get_read_db)):
+    best_effort_service = BestEffortService(db)
+    return best_effort_service.get_personal_records(user_id)
+
+@app.get("/activities/best-efforts/user/{user_id}/{activity_id}")
+def get_activity_best_efforts(user_id: int, activity_id: int, db: Session = Depends(get_read_db)):
+    best_effort_service = BestEffortService(db)
+    return best_effort_service.get_activity_best_efforts(user_id, activity_id)
+
+@app.get("/activities/zones/user/{user_id}")
+def get_zone_distribution(
+    user_id: int,
+    kind: str = "hr",
+    period: str = "week",
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_read_db)
+):
+    zone_analytics_service = ZoneAnalyticsService(db)
+    return zone_analytics_service.get_zone_distribution(user_id, kind, period, start_date, end_date)
+
+@app.get("/activities/race-predictions/user/{user_id}")
+def get_race_predictions(user_id: int, db: Session = Depends(get_read_db)):
+    race_prediction_service = RacePredictionService(db)
+    return race_prediction_service.get_predictions(user_id)
+
+# 쓰기 라우트는 def로 두어 스레드풀에서 실행 (롤업/훈련 부하/최고 기록 재계산, Redis, 샘플 파일 삭제가 이벤트 루프를 막지 않도록)
 @app.post("/activities/user/{user_id}") 
-async def create_activity(user_id: int, activity_data: dict, db: Session = Depends(get_db)):
+def create_activity(user_id: int, activity_data: dict, db: Session = Depends(get_db)):
     activity_service = ActivityService(db)
     return activity_service.create_activity(user_id, activity_data)
 
+@app.delete("/activities/user/{user_id}/{activity_id}")
+def delete_activity(user_id: int, activity_id: int, db: Session = Depends(get_db)):
+    activity_service = ActivityService(db)
+    return activity_service.delete_activity(user_id, activity_id)
+
+@app.post("/stats/rebuild")
+def rebuild_stats(user_id: int = None, refresh_training_profile: bool = False, db: Session = Depends(get_db)):
+    stats_service = StatsService(db)
+    result = stats_service.rebuild(user_id)
+    # refresh_training_profile=true이면 저장된 최대 심박수/Garmin 배율도 현재 데이터로 다시 정함
+    result["training_load"] = TrainingLoadService(db).rebuild(user_id, refresh_profile=refresh_training_profile)
+    result["best_efforts"] = BestEffortService(db).rebuild(user_id)
+    # 재계산된 롤업/훈련 부하/최고 기록으로 캐시된 응답과 분석 결과를 무효화
+    if user_id is not None:
+        user_ids = {user_id}
+    else:
+        user_ids = {row_user_id for (row_user_id,) in db.query(User.id)}
+        user_ids.update(row_user_id for (row_user_id,) in db.query(Activity.user_id).distinct() if row_user_id is not None)
+    for rebuilt_user_id in user_ids:
+        bump_data_version(rebuilt_user_id)
+    return result
+
 @app.post("/activities/comments/")
-async def create_activity_comment(comment_data: dict, db: Session = Depends(get_db)):
+def create_activity_comment(comment_data: dict, db: Session = Depends(get_db)):
     activity_service = ActivityService(db)
     return activity_service.create_activity_comment(comment_data)
 
@@ -249,17 +406,21 @@ def delete_activity_comment(comment_id: int, db: Session = Depends(get_db)):
     activity_service = ActivityService(db)
     return activity_service.delete_activity_comment(comment_id)
 
-@app.post("/sync-garmin-activities/{user_id}")
-async def sync_garmin_activities(user_id: int, user_data: GarminSyncRequest, db: Session = Depends(get_db)):
-    garmin_service = GarminService(db)
-    return garmin_service.sync_activities(user_id, user_data.garmin_email, user_data.garmin_password)
+@app.post("/sync-garmin-activities/{user_id}", status_code=202)
+def sync_garmin_activities(user_id: int, user_data: GarminSyncRequest):
+    # 동기화는 Celery 워커에서 실행하고 작업 ID를 바로 반환
+    return SyncJobService().start_sync(user_id, user_data.garmin_email, user_data.garmin_password)
+
+@app.get("/sync-garmin-activities/jobs/{job_id}")
+def get_sync_job(job_id: str):
+    return SyncJobService().get_job(job_id)
 
 @app.post("/activities/feedback/{user_id}/{activity_id}")
 async def request_activity_feedback(
     user_id: int,
     activity_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     try:
         # 요청 본문 파싱
@@ -268,9 +429,9 @@ async def request_activity_feedback(
         logger.info(f"## comments: {comments}")
         
         # 1. 활동 데이터 조회
-        activity_service = ActivityService(db)
-        activity = activity_service.get_activity(user_id, activity_id)
-        laps = activity_service.get_activity_laps(activity_id)
+        activity_service = AsyncActivityService(db)
+        activity = await activity_service.get_activity(user_id, activity_id)
+        laps = await activity_service.get_activity_laps(user_id, activity_id)
         
         if not activity:
             logger.error(f"Activity not found for ID: {activity_id}")
@@ -305,8 +466,16 @@ async def request_activity_feedback(
                         "created_at": datetime.now()
                     }
                     
+                    def save_feedback():
+                        # 저장과 캐시 무효화(Redis)는 스레드풀에서 동기 세션으로 수행
+                        session = SessionLocal()
+                        try:
+                            return ActivityService(session).save_activity_feedback(feedback_data)
+                        finally:
+                            session.close()
+
                     try:
-                        feedback = activity_service.save_activity_feedback(feedback_data)
+                        feedback = await run_in_threadpool(save_feedback)
                         return feedback
                     except Exception as e:
                         logger.error(f"피드백 저장 실패: {str(e)}")
@@ -357,17 +526,17 @@ async def create_training_schedule(
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.get("/schedules/{user_id}")
-async def get_training_schedule(user_id: int, db: Session = Depends(get_db)):
-    schedule_service = ScheduleService(db)
-    return schedule_service.get_user_schedules(user_id)
+async def get_training_schedule(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    schedule_service = AsyncScheduleService(db)
+    return await schedule_service.get_user_schedules(user_id)
 
 @app.delete("/schedules/{user_id}/{schedule_id}")
-async def delete_training_schedule(user_id: int, schedule_id: int, db: Session = Depends(get_db)):
+def delete_training_schedule(user_id: int, schedule_id: int, db: Session = Depends(get_db)):
     schedule_service = ScheduleService(db)
     return schedule_service.delete_schedule(schedule_id, user_id)
 
 @app.put("/schedules/{user_id}/{schedule_id}")
-async def update_training_schedule(user_id: int, schedule_id: int, schedule_data: dict, db: Session = Depends(get_db)):
+def update_training_schedule(user_id: int, schedule_id: int, schedule_data: dict, db: Session = Depends(get_db)):
     schedule_service = ScheduleService(db)
     return schedule_service.update_schedule(schedule_id, user_id, schedule_data)
 
@@ -410,14 +579,24 @@ async def running_coach_prompt(request: Request, db: Session = Depends(get_db)):
                 return "죄송합니다. 답변을 생성하는 중에 문제가 발생했습니다."
 
 @app.get("/dashboard/user/{user_id}/feedback")
-async def get_dashboard_feedback(user_id: int, db: Session = Depends(get_db)):
-    activity_service = ActivityService(db)
-    return activity_service.get_dashboard_feedback(user_id)
+async def get_dashboard_feedback(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    activity_service = AsyncActivityService(db)
+    return await ResponseCache().get_or_set(
+        "dashboard_feedback", user_id, (FEEDBACK,), lambda: activity_service.get_dashboard_feedback(user_id)
+    )
 
 @app.get("/dashboard/user/{user_id}/upcoming-schedule")
-async def get_upcoming_schedule(user_id: int, db: Session = Depends(get_db)):
-    schedule_service = ScheduleService(db)
-    return schedule_service.get_upcoming_schedule(user_id)
+async def get_upcoming_schedule(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    schedule_service = AsyncScheduleService(db)
+    # 다가오는 일정은 시간이 지나면 바뀌므로 해당 일정 시각까지만 캐시
+    return await ResponseCache().get_or_set(
+        "upcoming_schedule", user_id, (SCHEDULES,), lambda: schedule_service.get_upcoming_schedule(user_id),
+        ttl=lambda schedule: (datetime.fromisoformat(schedule["datetime"]) - datetime.now()).total_seconds()
+    )
+
+@app.get("/cache/metrics")
+def get_cache_metrics():
+    return ResponseCache().get_metrics()
 
 ## 유틸 함수
 #region 유틸
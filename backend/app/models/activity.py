@@ -1,20 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, ForeignKeyConstraint, Index
 from sqlalchemy.orm import relationship
-from .base import Base
+from .base import Base, JSONType
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        # 사용자별 최신순 목록/기간 조회 및 키셋 페이지네이션용 복합 인덱스
+        Index("ix_activities_user_id_start_time_local", "user_id", "start_time_local"),
+        # 동시에 실행된 동기화가 같은 활동을 중복 저장하지 않도록 보장 (ON CONFLICT 대상, 하위 테이블 외래 키 대상)
+        # 같은 Garmin 계정을 여러 사용자가 연결할 수 있으므로 activity_id만으로는 유일하지 않음
+        Index("uq_activities_user_id_activity_id", "user_id", "activity_id", unique=True),
+    )
 
     # ─────────────────── 기본 정보 ───────────────────
     id = Column(Integer, primary_key=True, index=True)  # 내부 DB용 고유 ID
-    activity_id = Column(Integer, index=True)  # 가민 활동 고유 ID
+    activity_id = Column(BigInteger, index=True)  # 가민 활동 고유 ID (int32 범위를 넘으므로 BigInteger)
     user_id = Column(Integer, index=True)  # 사용자 ID
     activity_name = Column(String)  # 활동 이름 (예: 서울하프마라톤 10k)
     start_time_local = Column(DateTime)  # 활동 시작 시간 (로컬 기준)
     start_time_gmt = Column(DateTime)  # 활동 시작 시간 (GMT 기준)
     end_time_gmt = Column(DateTime)  # 활동 종료 시간 (GMT 기준)
-    activity_type = Column(JSON)  # 활동 종류 정보 (예: running, parentType 등 포함)
-    event_type = Column(JSON)  # 이벤트 유형 (ex: uncategorized 등)
+    activity_type = Column(JSONType)  # 활동 종류 정보 (예: running, parentType 등 포함)
+    event_type = Column(JSONType)  # 이벤트 유형 (ex: uncategorized 등)
 
     # ─────────────────── 거리 및 시간 정보 ───────────────────
     distance = Column(Float)  # 총 이동 거리 (단위: 미터)
@@ -41,11 +48,11 @@ class Activity(Base):
     # ─────────────────── 생리적 정보 (심박, 파워 등) ───────────────────
     average_hr = Column(Float)  # 평균 심박수 (bpm)
     max_hr = Column(Float)  # 최대 심박수
-    hr_time_in_zones = Column(JSON)  # 심박수 영역별 시간 (zone1~zone5)
+    hr_time_in_zones = Column(JSONType)  # 심박수 영역별 시간 (zone1~zone5)
 
     avg_power = Column(Float)  # 평균 파워 (Watt)
     max_power = Column(Float)  # 최대 파워
-    power_time_in_zones = Column(JSON)  # 파워 영역별 시간
+    power_time_in_zones = Column(JSONType)  # 파워 영역별 시간
 
     aerobic_training_effect = Column(Float)  # 유산소 트레이닝 효과 (0.0~5.0)
     anaerobic_training_effect = Column(Float)  # 무산소 트레이닝 효과 (0.0~5.0)
@@ -71,23 +78,31 @@ class Activity(Base):
     steps = Column(Integer)  # 총 걸음 수
     time_zone_id = Column(Integer)  # 타임존 ID
     sport_type_id = Column(Integer)  # 스포츠 유형 ID
-    device_id = Column(Integer)  # 기록에 사용된 디바이스 ID
+    device_id = Column(BigInteger)  # 기록에 사용된 디바이스 ID
     manufacturer = Column(String)  # 디바이스 제조사 (예: GARMIN)
     lap_count = Column(Integer)  # 랩 수
-    privacy = Column(JSON)  # 공개/비공개 설정 정보
+    privacy = Column(JSONType)  # 공개/비공개 설정 정보
     favorite = Column(Boolean, default=False)  # 즐겨찾기 여부
     manual_activity = Column(Boolean, default=False)  # 수동으로 추가된 활동인지 여부
 
-    # 관계 설정
+    # 관계 설정 (하위 테이블은 (user_id, activity_id) 복합 외래 키로 연결)
     splits = relationship("ActivitySplit", back_populates="activity")
-    activity_feedbacks = relationship("ActivityFeedback", back_populates="activity")
+    activity_feedbacks = relationship("ActivityFeedback", back_populates="activity", overlaps="activity_feedbacks,user")
     activity_comments = relationship("ActivityComment", back_populates="activity")
 
 class ActivitySplit(Base):
     __tablename__ = "activity_splits"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "activity_id"], ["activities.user_id", "activities.activity_id"], name="fk_activity_splits_activity"
+        ),
+        # 랩 중복 저장 방지 (bulk INSERT의 ON CONFLICT 대상)
+        Index("uq_activity_splits_user_id_activity_id_lap_index", "user_id", "activity_id", "lap_index", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    activity_id = Column(Integer, ForeignKey("activities.id"))
+    user_id = Column(Integer)  # 사용자 ID
+    activity_id = Column(BigInteger)  # 가민 활동 ID
     lap_index = Column(Integer)
     start_time_gmt = Column(DateTime)
     distance = Column(Float)  # 미터 단위
@@ -120,22 +135,70 @@ class ActivitySplit(Base):
 
 class ActivityFeedback(Base):
     __tablename__ = "activity_feedbacks"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "activity_id"], ["activities.user_id", "activities.activity_id"], name="fk_activity_feedbacks_activity"
+        ),
+        Index("ix_activity_feedbacks_user_id_activity_id", "user_id", "activity_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    activity_id = Column(Integer, ForeignKey("activities.activity_id"))
+    activity_id = Column(BigInteger)
     created_at = Column(DateTime)
     feedback_data = Column(String)
     
-    user = relationship("User", back_populates="activity_feedbacks") 
-    activity = relationship("Activity", back_populates="activity_feedbacks") 
+    user = relationship("User", back_populates="activity_feedbacks", overlaps="activity,activity_feedbacks")
+    activity = relationship("Activity", back_populates="activity_feedbacks", overlaps="activity_feedbacks,user")
 
 class ActivityComment(Base):
     __tablename__ = "activity_comments"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "activity_id"], ["activities.user_id", "activities.activity_id"], name="fk_activity_comments_activity"
+        ),
+        Index("ix_activity_comments_user_id_activity_id", "user_id", "activity_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    activity_id = Column(Integer, ForeignKey("activities.id"))
+    user_id = Column(Integer)  # 활동의 사용자 ID
+    activity_id = Column(BigInteger)  # 가민 활동 ID
     comment = Column(String)
     created_at = Column(DateTime)
 
     activity = relationship("Activity", back_populates="activity_comments")
+
+class ActivityBestEffort(Base):
+    __tablename__ = "activity_best_efforts"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "activity_id"], ["activities.user_id", "activities.activity_id"], name="fk_activity_best_efforts_activity"
+        ),
+        # 활동별 거리마다 하나의 기록 (재계산 시 ON CONFLICT 대상)
+        Index("uq_activity_best_efforts_user_id_activity_id_distance_key", "user_id", "activity_id", "distance_key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    activity_id = Column(BigInteger, index=True)  # 가민 활동 ID
+    distance_key = Column(String, nullable=False)  # 거리 이름 (1k, 5k, 10k, half, full)
+    distance = Column(Float, nullable=False)  # 거리 (미터)
+    elapsed = Column(Float, nullable=False)  # 해당 거리를 가장 빨리 달린 시간 (초)
+    start_offset = Column(Float)  # 활동 시작 후 구간이 시작된 시간 (초)
+    source = Column(String)  # 계산 근거 (samples: 초 단위 샘플, laps: 랩, activity: 활동 전체 평균)
+    start_time_local = Column(DateTime)  # 활동 시작 시간 (로컬 기준)
+
+class PersonalRecord(Base):
+    __tablename__ = "personal_records"
+    __table_args__ = (
+        Index("uq_personal_records_user_id_distance_key", "user_id", "distance_key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    distance_key = Column(String, nullable=False)  # 거리 이름 (1k, 5k, 10k, half, full)
+    distance = Column(Float, nullable=False)  # 거리 (미터)
+    elapsed = Column(Float, nullable=False)  # 개인 최고 기록 (초)
+    activity_id = Column(BigInteger)  # 기록을 세운 가민 활동 ID
+    source = Column(String)  # 계산 근거 (samples, laps, activity)
+    start_time_local = Column(DateTime)  # 기록을 세운 활동의 시작 시간 (로컬 기준)
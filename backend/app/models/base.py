@@ -1,3 +1,8 @@
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base() 
\ No newline at end of file
+Base = declarative_base()
+
+# PostgreSQL에서는 JSONB, 그 외(SQLite 등)에서는 JSON으로 저장
+JSONType = JSON().with_variant(JSONB(), "postgresql")
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Float, Date, UniqueConstraint
+from .base import Base
+
+class UserDailyStats(Base):
+    __tablename__ = "user_daily_stats"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="uq_user_daily_stats_user_period"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    period = Column(Date, nullable=False)  # 날짜 (활동 로컬 시작 시간 기준)
+    activity_count = Column(Integer, default=0, nullable=False)  # 활동 수
+    total_distance = Column(Float, default=0, nullable=False)  # 총 거리 (미터)
+    total_duration = Column(Float, default=0, nullable=False)  # 총 소요 시간 (초)
+
+class UserWeeklyStats(Base):
+    __tablename__ = "user_weekly_stats"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="uq_user_weekly_stats_user_period"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    period = Column(Date, nullable=False)  # 주 시작일 (월요일)
+    activity_count = Column(Integer, default=0, nullable=False)  # 활동 수
+    total_distance = Column(Float, default=0, nullable=False)  # 총 거리 (미터)
+    total_duration = Column(Float, default=0, nullable=False)  # 총 소요 시간 (초)
+
+class UserMonthlyStats(Base):
+    __tablename__ = "user_monthly_stats"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="uq_user_monthly_stats_user_period"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    period = Column(String(7), nullable=False)  # 월 (YYYY-MM)
+    activity_count = Column(Integer, default=0, nullable=False)  # 활동 수
+    total_distance = Column(Float, default=0, nullable=False)  # 총 거리 (미터)
+    total_duration = Column(Float, default=0, nullable=False)  # 총 소요 시간 (초)
+
+class UserTrainingLoad(Base):
+    __tablename__ = "user_training_load"
+    __table_args__ = (UniqueConstraint("user_id", "period", name="uq_user_training_load_user_period"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)  # 사용자 ID
+    period = Column(Date, nullable=False)  # 날짜 (활동 로컬 시작 시간 기준, 쉬는 날 포함)
+    load = Column(Float, default=0, nullable=False)  # 당일 훈련 부하 합계 (역치 심박 1시간 = 100인 공통 척도)
+    ctl = Column(Float, default=0, nullable=False)  # 체력 (Chronic Training Load, 42일 지수 이동 평균)
+    atl = Column(Float, default=0, nullable=False)  # 피로 (Acute Training Load, 7일 지수 이동 평균)
+    tsb = Column(Float, default=0, nullable=False)  # 컨디션 (Training Stress Balance, 전날 CTL - ATL)
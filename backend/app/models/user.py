@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
 from passlib.context import CryptContext
@@ -21,6 +21,10 @@ class User(Base):
     garmin_password = Column(String)
     garmin_sync_date = Column(DateTime)
     garmin_sync_status = Column(String)
+    garmin_last_activity_time = Column(DateTime)  # 증분 동기화 워터마크: 저장된 가장 최근 활동의 시작 시간 (로컬)
+    garmin_last_activity_id = Column(BigInteger)  # 증분 동기화 워터마크: 저장된 가장 최근 가민 활동 ID
+    training_max_hr = Column(Float)  # 훈련 부하 계산에 쓰는 최대 심박수 (처음 계산할 때 저장해 증분 계산/재계산에 같은 값 사용)
+    training_garmin_scale = Column(Float)  # Garmin Training Load를 공통 부하 척도로 바꾸는 배율 (training_max_hr와 함께 저장)
     
     training_logs = relationship("TrainingLog", back_populates="user")
     sleep_logs = relationship("SleepLog", back_populates="user")
@@ -0,0 +1,21 @@
+import os
+import threading
+import redis
+
+# ─────────────────── Redis 설정 ───────────────────
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_redis() -> redis.Redis:
+    """
+    프로세스 전체에서 공유하는 Redis 클라이언트를 반환합니다.
+    (클라이언트 내부 커넥션 풀은 스레드 간에 안전하게 공유됨)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = redis.Redis.from_url(REDIS_URL)
+    return _client
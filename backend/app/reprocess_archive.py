@@ -0,0 +1,29 @@
+"""
+보관된 Garmin 원본 응답으로 activities/activity_splits를 다시 만드는 명령
+
+사용법:
+    python -m app.reprocess_archive [--user-id USER_ID] [--workers WORKERS]
+"""
+import argparse
+import logging
+
+from app.database import SessionLocal, init_db
+from app.services.garmin_service import GarminService
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild activities and activity splits from the Garmin payload archive")
+    parser.add_argument("--user-id", type=int, default=None, help="reprocess only this user (default: all users)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    init_db()
+    db = SessionLocal()
+    try:
+        result = GarminService(db).reprocess_archive(args.user_id, args.workers)
+        print(f"Reprocessed {result['activities']} activities and {result['splits']} splits")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,86 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
+from datetime import datetime, date, time, timedelta
+from typing import Any, Dict, Iterator, List
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_
 from fastapi import HTTPException
+from app.database import DB_YIELD_PER, insert_ignore
 from app.models.activity import Activity, ActivityComment, ActivityFeedback, ActivitySplit
+from app.services.best_effort_service import BestEffortService
+from app.services.data_version import COMMENTS, FEEDBACK, bump_data_version
+from app.services.garmin_rate_limiter import garmin_rate_limiter
+from app.services.sample_store import SampleStore, SeriesReader, available_channels
+from app.services.stats_service import StatsService
+from app.services.training_load_service import TrainingLoadService
 from garminconnect import Garmin
+import base64
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 샘플 구간 스트리밍 시 한 줄에 담는 샘플 수
+SERIES_CHUNK_SIZE = 1000
+
+# 활동 조회 API가 반환하는 필드 목록 (Activity 모델의 컬럼명과 동일)
+ACTIVITY_FIELDS = (
+    "id",
+    "activity_id",
+    "user_id",
+    "activity_name",
+    "start_time_local",
+    "start_time_gmt",
+    "end_time_gmt",
+    "activity_type",
+    "event_type",
+    "distance",
+    "duration",
+    "elapsed_duration",
+    "moving_duration",
+    "elevation_gain",
+    "elevation_loss",
+    "min_elevation",
+    "max_elevation",
+    "elevation_corrected",
+    "average_speed",
+    "max_speed",
+    "start_latitude",
+    "start_longitude",
+    "end_latitude",
+    "end_longitude",
+    "average_hr",
+    "max_hr",
+    "hr_time_in_zones",
+    "avg_power",
+    "max_power",
+    "power_time_in_zones",
+    "aerobic_training_effect",
+    "anaerobic_training_effect",
+    "training_effect_label",
+    "vo2max_value",
+    "average_cadence",
+    "max_cadence",
+    "avg_vertical_oscillation",
+    "avg_ground_contact_time",
+    "avg_stride_length",
+    "calories",
+    "water_estimated",
+    "activity_training_load",
+    "moderate_intensity_minutes",
+    "vigorous_intensity_minutes",
+    "steps",
+    "time_zone_id",
+    "sport_type_id",
+    "device_id",
+    "manufacturer",
+    "lap_count",
+    "privacy",
+    "favorite",
+    "manual_activity",
+)
+
+# fields 파라미터와 상관없이 항상 포함되는 필드 (페이지네이션 커서에 필요)
+REQUIRED_ACTIVITY_FIELDS = ("id", "start_time_local")
+
 class ActivityService:
     """
     Activity 관련 비즈니스 로직을 처리하는 서비스 클래스
@@ -24,12 +98,17 @@ class ActivityService:
         """
         self.db = db
 
-    def get_activities(self, user_id: int):
+    def get_activities(self, user_id: int, start_date: date = None, end_date: date = None, cursor: str = None, limit: int = None, fields: str = None):
         """
-        특정 사용자의 모든 활동 목록을 조회합니다.
+        특정 사용자의 활동 목록을 최신순으로 조회합니다.
         
         Args:
             user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일 (포함)
+            end_date (date, optional): 조회 종료일 (포함)
+            cursor (str, optional): 이전 페이지의 다음 커서
+            limit (int, optional): 페이지 크기. None이면 전체 조회
+            fields (str, optional): 쉼표로 구분된 반환 필드 목록. None이면 전체 필드
             
         Returns:
             list: 활동 정보 목록. 각 활동은 다음 정보를 포함:
@@ -44,70 +123,39 @@ class ActivityService:
                 - average_hr: 평균 심박수
                 - 기타 활동 관련 메트릭
         """
-        activities = self.db.query(Activity).filter(Activity.user_id == user_id).all()
-        return [{
-            "id": activity.id,
-            "activity_id": activity.activity_id,
-            "user_id": activity.user_id,
-            "activity_name": activity.activity_name,
-            "start_time_local": activity.start_time_local,
-            "start_time_gmt": activity.start_time_gmt,
-            "end_time_gmt": activity.end_time_gmt,
-            "activity_type": activity.activity_type,
-            "event_type": activity.event_type,
-            "distance": activity.distance,
-            "duration": activity.duration,
-            "elapsed_duration": activity.elapsed_duration,
-            "moving_duration": activity.moving_duration,
-            "elevation_gain": activity.elevation_gain,
-            "elevation_loss": activity.elevation_loss,
-            "min_elevation": activity.min_elevation,
-            "max_elevation": activity.max_elevation,
-            "elevation_corrected": activity.elevation_corrected,
-            "average_speed": activity.average_speed,
-            "max_speed": activity.max_speed,
-            "start_latitude": activity.start_latitude,
-            "start_longitude": activity.start_longitude,
-            "end_latitude": activity.end_latitude,
-            "end_longitude": activity.end_longitude,
-            "average_hr": activity.average_hr,
-            "max_hr": activity.max_hr,
-            "hr_time_in_zones": activity.hr_time_in_zones,
-            "avg_power": activity.avg_power,
-            "max_power": activity.max_power,
-            "power_time_in_zones": activity.power_time_in_zones,
-            "aerobic_training_effect": activity.aerobic_training_effect,
-            "anaerobic_training_effect": activity.anaerobic_training_effect,
-            "training_effect_label": activity.training_effect_label,
-            "vo2max_value": activity.vo2max_value,
-            "average_cadence": activity.average_cadence,
-            "max_cadence": activity.max_cadence,
-            "avg_vertical_oscillation": activity.avg_vertical_oscillation,
-            "avg_ground_contact_time": activity.avg_ground_contact_time,
-            "avg_stride_length": activity.avg_stride_length,
-            "calories": activity.calories,
-            "water_estimated": activity.water_estimated,
-            "activity_training_load": activity.activity_training_load,
-            "moderate_intensity_minutes": activity.moderate_intensity_minutes,
-            "vigorous_intensity_minutes": activity.vigorous_intensity_minutes,
-            "steps": activity.steps,
-            "time_zone_id": activity.time_zone_id,
-            "sport_type_id": activity.sport_type_id,
-            "device_id": activity.device_id,
-            "manufacturer": activity.manufacturer,
-            "lap_count": activity.lap_count,
-            "privacy": activity.privacy,
-            "favorite": activity.favorite,
-            "manual_activity": activity.manual_activity
-        } for activity in activities]
-
-    def get_activity(self, user_id: int, activity_id: int):
+        fields = self._parse_fields(fields)
+        activities = self._query_activities(user_id, start_date, end_date, cursor, limit, fields).all()
+        return [self._activity_to_dict(activity, fields) for activity in activities]
+
+    def iter_activities(self, user_id: int, start_date: date = None, end_date: date = None, fields: str = None):
+        """
+        사용자의 전체 활동 이력을 내보내기 위해 한 건씩 반환합니다.
+        yield_per로 나누어 가져오므로 PostgreSQL에서는 서버 사이드 커서가 사용되어
+        이력이 아무리 길어도 메모리에 한 번에 올리지 않습니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일 (포함)
+            end_date (date, optional): 조회 종료일 (포함)
+            fields (str, optional): 쉼표로 구분된 반환 필드 목록. None이면 전체 필드
+            
+        Yields:
+            dict: 활동 정보
+        """
+        fields = self._parse_fields(fields)
+        query = self._query_activities(user_id, start_date, end_date, fields=fields)
+        # 레거시 Query는 JSON 컬럼이 있는 엔티티에 yield_per를 쓸 수 없으므로 select 문으로 실행
+        for activity in self.db.scalars(query.statement.execution_options(yield_per=DB_YIELD_PER)):
+            yield self._activity_to_dict(activity, fields)
+
+    def get_activity(self, user_id: int, activity_id: int, fields: str = None):
         """
         특정 활동의 상세 정보를 조회합니다.
         
         Args:
             user_id (int): 사용자 ID
             activity_id (int): 활동 ID
+            fields (str, optional): 쉼표로 구분된 반환 필드 목록. None이면 전체 필드
             
         Returns:
             dict: 활동의 상세 정보
@@ -115,64 +163,11 @@ class ActivityService:
         Raises:
             HTTPException: 활동을 찾을 수 없는 경우 404 에러
         """
-        activity = self.db.query(Activity).filter(Activity.user_id == user_id, Activity.activity_id == activity_id).first()
+        fields = self._parse_fields(fields)
+        activity = self.db.query(Activity).options(self._load_fields(fields)).filter(Activity.user_id == user_id, Activity.activity_id == activity_id).first()
         if not activity:
             raise HTTPException(status_code=404, detail="Activity not found")
-        return {
-            "id": activity.id,
-            "activity_id": activity.activity_id,
-            "user_id": activity.user_id,
-            "activity_name": activity.activity_name,
-            "start_time_local": activity.start_time_local,
-            "start_time_gmt": activity.start_time_gmt,
-            "end_time_gmt": activity.end_time_gmt,
-            "activity_type": activity.activity_type,
-            "event_type": activity.event_type,
-            "distance": activity.distance,
-            "duration": activity.duration,
-            "elapsed_duration": activity.elapsed_duration,
-            "moving_duration": activity.moving_duration,
-            "elevation_gain": activity.elevation_gain,
-            "elevation_loss": activity.elevation_loss,
-            "min_elevation": activity.min_elevation,
-            "max_elevation": activity.max_elevation,
-            "elevation_corrected": activity.elevation_corrected,
-            "average_speed": activity.average_speed,
-            "max_speed": activity.max_speed,
-            "start_latitude": activity.start_latitude,
-            "start_longitude": activity.start_longitude,
-            "end_latitude": activity.end_latitude,
-            "end_longitude": activity.end_longitude,
-            "average_hr": activity.average_hr,
-            "max_hr": activity.max_hr,
-            "hr_time_in_zones": activity.hr_time_in_zones,
-            "avg_power": activity.avg_power,
-            "max_power": activity.max_power,
-            "power_time_in_zones": activity.power_time_in_zones,
-            "aerobic_training_effect": activity.aerobic_training_effect,
-            "anaerobic_training_effect": activity.anaerobic_training_effect,
-            "training_effect_label": activity.training_effect_label,
-            "vo2max_value": activity.vo2max_value,
-            "average_cadence": activity.average_cadence,
-            "max_cadence": activity.max_cadence,
-            "avg_vertical_oscillation": activity.avg_vertical_oscillation,
-            "avg_ground_contact_time": activity.avg_ground_contact_time,
-            "avg_stride_length": activity.avg_stride_length,
-            "calories": activity.calories,
-            "water_estimated": activity.water_estimated,
-            "activity_training_load": activity.activity_training_load,
-            "moderate_intensity_minutes": activity.moderate_intensity_minutes,
-            "vigorous_intensity_minutes": activity.vigorous_intensity_minutes,
-            "steps": activity.steps,
-            "time_zone_id": activity.time_zone_id,
-            "sport_type_id": activity.sport_type_id,
-            "device_id": activity.device_id,
-            "manufacturer": activity.manufacturer,
-            "lap_count": activity.lap_count,
-            "privacy": activity.privacy,
-            "favorite": activity.favorite,
-            "manual_activity": activity.manual_activity
-        }
+        return self._activity_to_dict(activity, fields)
     
     def create_activity(self, user_id: int, activity_data: dict):
         """
@@ -186,16 +181,174 @@ class ActivityService:
         """
         activity = Activity(**activity_data)
         activity.user_id = user_id
+        # JSON 요청의 시작 시간은 문자열이므로 datetime으로 변환 (SQLite DateTime 컬럼은 문자열을 받지 않음)
+        if isinstance(activity.start_time_local, str):
+            activity.start_time_local = datetime.fromisoformat(activity.start_time_local)
         self.db.add(activity)
+        StatsService(self.db).apply_activities([activity])
+        if activity.start_time_local is not None:
+            TrainingLoadService(self.db).update(user_id, activity.start_time_local.date())
+        BestEffortService(self.db).apply_activities([activity])
         self.db.commit()
+        # commit으로 만료된 속성을 다시 읽어 응답에 담음
+        self.db.refresh(activity)
+        bump_data_version(user_id)
         return activity
 
-    def get_activities_laps_with_comments(self, user_id: int):
+    def delete_activity(self, user_id: int, activity_id: int):
+        """
+        활동과 해당 활동의 랩, 댓글, 피드백을 삭제합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            
+        Returns:
+            dict: 성공 메시지
+            
+        Raises:
+            HTTPException: 활동을 찾을 수 없는 경우 404 에러
+        """
+        activity = self.db.query(Activity).filter(Activity.user_id == user_id, Activity.activity_id == activity_id).first()
+        if not activity:
+            raise HTTPException(status_code=404, detail="Activity not found")
+        
+        try:
+            for model in (ActivitySplit, ActivityComment, ActivityFeedback):
+                self.db.query(model).filter(model.user_id == user_id, model.activity_id == activity_id).delete(synchronize_session=False)
+            BestEffortService(self.db).remove_activity(user_id, activity_id)
+            StatsService(self.db).remove_activities([activity])
+            self.db.delete(activity)
+            if activity.start_time_local is not None:
+                TrainingLoadService(self.db).update(user_id, activity.start_time_local.date())
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error deleting activity {activity_id}: {str(e)}")
+            raise
+        bump_data_version(user_id)
+        SampleStore().delete(user_id, activity_id)
+        SeriesReader().delete(user_id, activity_id)
+        return {"message": "Activity deleted successfully"}
+
+    def get_activity_samples(self, user_id: int, activity_id: int, channels: List[str] = None) -> Dict[str, Any]:
         """
-        사용자의 모든 활동과 각 활동의 랩 데이터, 댓글을 조회합니다.
+        활동의 초 단위 샘플 중 요청한 채널만 조회합니다.
         
         Args:
             user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            channels (list, optional): 채널 이름 목록 (예: ["hr", "pace"]). None이면 저장된 모든 채널
+            
+        Returns:
+            dict: 샘플 정보
+                - activity_id: Garmin 활동 ID
+                - length: 샘플 수
+                - channels: {채널 이름: 값 목록}. 결측값은 None
+                
+        Raises:
+            HTTPException: 알 수 없는 채널이면 400, 샘플이 없으면 404 에러
+        """
+        if channels is not None:
+            unknown = [channel for channel in channels if channel not in available_channels()]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown channels: {', '.join(unknown)}")
+        samples = SampleStore().load(user_id, activity_id, channels)
+        if samples is None:
+            raise HTTPException(status_code=404, detail="Samples not found")
+        return {
+            "activity_id": activity_id,
+            "length": max((len(values) for values in samples.values()), default=0),
+            "channels": {
+                channel: [None if value != value else value for value in values.tolist()]
+                for channel, values in samples.items()
+            }
+        }
+
+    def get_activity_series(
+        self,
+        user_id: int,
+        activity_id: int,
+        channels: List[str] = None,
+        axis: str = "time",
+        start: float = None,
+        end: float = None,
+        step: int = 1
+    ) -> Dict[str, Any]:
+        """
+        활동 샘플 중 시간/거리 구간을 메모리 맵 view로 조회합니다. (차트용, 파일 전체를 풀지 않음)
+        
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            channels (list, optional): 채널 이름 목록. None이면 저장된 모든 채널
+            axis (str): 구간 기준 (time: 경과 초, distance: 미터)
+            start (float, optional): 구간 시작 (포함)
+            end (float, optional): 구간 끝 (포함)
+            step (int): n개 샘플마다 하나씩 반환
+            
+        Returns:
+            dict: 구간 정보
+                - activity_id: Garmin 활동 ID
+                - axis: 구간 기준 채널
+                - length: 구간의 샘플 수
+                - series: {채널 이름: NumPy view}
+                
+        Raises:
+            HTTPException: 알 수 없는 채널/기준이거나 기준 채널이 없으면 400, 샘플이 없으면 404 에러
+        """
+        if channels is not None:
+            unknown = [channel for channel in channels if channel not in available_channels()]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown channels: {', '.join(unknown)}")
+        try:
+            series = SeriesReader().slice(user_id, activity_id, channels, axis, start, end, step)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if series is None:
+            raise HTTPException(status_code=404, detail="Samples not found")
+        return {
+            "activity_id": activity_id,
+            "axis": axis,
+            "length": len(series[axis]),
+            "series": series
+        }
+
+    def iter_series_chunks(self, result: Dict[str, Any], chunk_size: int = SERIES_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        get_activity_series 결과를 헤더 한 줄과 샘플 묶음들로 나누어 반환합니다.
+        묶음마다 view의 일부만 리스트로 변환하므로 구간 전체를 파이썬 객체로 만들지 않습니다.
+        
+        Args:
+            result (dict): get_activity_series 결과
+            chunk_size (int): 한 묶음의 샘플 수
+            
+        Yields:
+            dict: 첫 줄은 {"activity_id", "axis", "length", "channels"}, 이후 {채널 이름: 값 목록}. 결측값은 None
+        """
+        series = result["series"]
+        yield {
+            "activity_id": result["activity_id"],
+            "axis": result["axis"],
+            "length": result["length"],
+            "channels": list(series)
+        }
+        for offset in range(0, result["length"], chunk_size):
+            yield {
+                channel: [None if value != value else value for value in values[offset:offset + chunk_size].tolist()]
+                for channel, values in series.items()
+            }
+
+    def get_activities_laps_with_comments(self, user_id: int, start_date: date = None, end_date: date = None, cursor: str = None, limit: int = None):
+        """
+        사용자의 활동과 각 활동의 랩 데이터, 댓글을 최신순으로 조회합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일 (포함)
+            end_date (date, optional): 조회 종료일 (포함)
+            cursor (str, optional): 이전 페이지의 다음 커서
+            limit (int, optional): 페이지 크기. None이면 전체 조회
             
         Returns:
             list: 활동 목록. 각 활동은 다음 정보를 포함:
@@ -203,13 +356,33 @@ class ActivityService:
                 - 랩 데이터 (거리, 시간, 페이스, 심박수 등)
                 - 댓글 목록
         """
-        activities = self.db.query(Activity).filter(Activity.user_id == user_id).order_by(Activity.start_time_local.desc()).all()
+        activity_query = self._query_activities(user_id, start_date, end_date, cursor, limit)
+        activities = activity_query.all()
         response = []
 
+        # 활동별로 조회하지 않고 테이블당 한 번의 쿼리로 랩/댓글/피드백을 묶어서 가져옴
+        activity_ids = activity_query.with_entities(Activity.activity_id)
+        laps_by_activity = self._group_by_activity_id(
+            self.db.query(ActivitySplit).filter(
+                ActivitySplit.user_id == user_id, ActivitySplit.activity_id.in_(activity_ids)
+            ).order_by(ActivitySplit.id)
+        )
+        comments_by_activity = self._group_by_activity_id(
+            self.db.query(ActivityComment).filter(
+                ActivityComment.user_id == user_id, ActivityComment.activity_id.in_(activity_ids)
+            ).order_by(ActivityComment.id)
+        )
+        feedback_by_activity = {}
+        for feedback in self.db.query(ActivityFeedback).filter(
+            ActivityFeedback.user_id == user_id, ActivityFeedback.activity_id.in_(activity_ids)
+        ).order_by(ActivityFeedback.id):
+            # 활동당 첫 번째 피드백만 사용
+            feedback_by_activity.setdefault(feedback.activity_id, feedback)
+
         for activity in activities:
-            laps = self.db.query(ActivitySplit).filter(ActivitySplit.activity_id == activity.activity_id).all()
-            comments = self.db.query(ActivityComment).filter(ActivityComment.activity_id == activity.activity_id).all()
-            feedback = self.db.query(ActivityFeedback).filter(ActivityFeedback.activity_id == activity.activity_id).first()
+            laps = laps_by_activity.get(activity.activity_id, [])
+            comments = comments_by_activity.get(activity.activity_id, [])
+            feedback = feedback_by_activity.get(activity.activity_id)
             laps_data = []
             comments_data = []
             
@@ -276,14 +449,12 @@ class ActivityService:
                 - total_duration: 총 소요 시간
                 - average_pace: 평균 페이스
         """
-        activities = self.db.query(Activity).filter(Activity.user_id == user_id).all()
-        
-        total_activities = len(activities)
-        total_distance = sum(activity.distance for activity in activities) / 1000  # m -> km
-        total_duration = sum(activity.duration for activity in activities)
+        # 원본 활동 대신 월별 롤업 버킷에서 합계만 계산
+        total_activities, total_distance, total_duration = StatsService(self.db).get_totals(user_id)
+        total_distance = total_distance / 1000  # m -> km
         
         # 평균 페이스 계산
-        if total_distance > 0:
+        if total_distance > 0 and total_duration > 0:
             avg_speed = (total_distance * 1000) / total_duration  # m/s
             avg_speed_kmh = avg_speed * 3.6  # km/h
             avg_pace = self._speed_to_pace(avg_speed_kmh)
@@ -311,21 +482,14 @@ class ActivityService:
                 - total_duration: 총 소요 시간
                 - average_pace: 평균 페이스
         """
-        activities = self.db.query(Activity).filter(
-            Activity.user_id == user_id
-        ).all()
-        
+        # 월별 롤업 테이블에서 집계 행만 가져옴
         monthly_summary = {}
-        for activity in activities:
-            month = activity.start_time_local.strftime('%Y-%m')
-            if month not in monthly_summary:
-                monthly_summary[month] = {
-                    "total_distance": 0,
-                    "total_duration": 0,
-                    "average_pace": "00:00"
-                }
-            monthly_summary[month]["total_distance"] += activity.distance / 1000  # m -> km
-            monthly_summary[month]["total_duration"] += activity.duration
+        for stats in StatsService(self.db).get_monthly_stats(user_id):
+            monthly_summary[stats.period] = {
+                "total_distance": stats.total_distance / 1000,  # m -> km
+                "total_duration": stats.total_duration,
+                "average_pace": "00:00"
+            }
         
         for month, data in monthly_summary.items():
             if data["total_duration"] > 0:
@@ -345,18 +509,30 @@ class ActivityService:
         Args:
             comment_data (dict): 댓글 데이터
                 - activity_id: 활동 ID
+                - user_id: 활동의 사용자 ID (없으면 활동에서 찾음)
                 - comment: 댓글 내용
                 
         Returns:
             dict: 성공 메시지
+            
+        Raises:
+            HTTPException: 활동을 찾을 수 없는 경우 404 에러
         """
+        activity_id = comment_data.get('activity_id')
+        user_id = comment_data.get('user_id')
+        if user_id is None:
+            user_id = self.db.query(Activity.user_id).filter(Activity.activity_id == activity_id).order_by(Activity.id).limit(1).scalar()
+            if user_id is None:
+                raise HTTPException(status_code=404, detail="Activity not found")
         comment = ActivityComment(
-            activity_id=comment_data.get('activity_id'),
+            user_id=user_id,
+            activity_id=activity_id,
             comment=comment_data.get('comment'),
             created_at=datetime.now()
         )
         self.db.add(comment)
         self.db.commit()
+        bump_data_version(user_id, COMMENTS)
         return {"message": "Comment created successfully"}
 
     def delete_activity_comment(self, comment_id: int):
@@ -376,83 +552,114 @@ class ActivityService:
         if not comment:
             raise HTTPException(status_code=404, detail="Comment not found")
         
+        user_id = comment.user_id
         self.db.delete(comment)
         self.db.commit()
+        if user_id is not None:
+            bump_data_version(user_id, COMMENTS)
         return {"message": "Comment deleted successfully"}
 
-    def process_activity_splits(self, client: Garmin, activity_id: str):
+    def process_activity_splits(self, client: Garmin, user_id: int, activity_id: str):
         """
         Garmin Connect API를 통해 활동의 랩 데이터를 가져와 처리합니다.
+        모든 랩을 한 번의 bulk INSERT와 한 번의 commit으로 저장합니다.
         
         Args:
             client (Garmin): Garmin Connect API 클라이언트
+            user_id (int): 사용자 ID
             activity_id (str): Garmin 활동 ID
             
         Raises:
             Exception: 랩 데이터 처리 중 오류 발생 시
         """
         try:
-            splits_data = client.get_activity_splits(activity_id)
+            splits_data = garmin_rate_limiter.call(client.get_activity_splits, activity_id)
             logger.info(f"Fetched splits data for activity {activity_id}")
-            
-            if not splits_data or 'lapDTOs' not in splits_data:
-                logger.warning(f"No lap data found for activity {activity_id}")
-                return
-
-            for lap in splits_data['lapDTOs']:
-                try:
-                    # 이미 존재하는 lap 데이터인지 확인
-                    existing_split = self.db.query(ActivitySplit).filter(
-                        ActivitySplit.activity_id == activity_id,
-                        ActivitySplit.lap_index == lap.get('lapIndex')
-                    ).first()
-                    
-                    # 이미 존재하면 건너뛰기
-                    if existing_split:
-                        logger.info(f"Split {lap.get('lapIndex')} for activity {activity_id} already exists. Skipping...")
-                        continue
-
-                    # 존재하지 않으면 생성
-                    split = ActivitySplit(
-                        activity_id=activity_id,
-                        lap_index=lap.get('lapIndex'),
-                        start_time_gmt=self._parse_garmin_datetime(lap.get('startTimeGMT')),
-                        distance=lap.get('distance'),
-                        duration=lap.get('duration'),
-                        moving_duration=lap.get('movingDuration'),
-                        average_speed=lap.get('averageSpeed'),
-                        max_speed=lap.get('maxSpeed'),
-                        average_hr=lap.get('averageHR'),
-                        max_hr=lap.get('maxHR'),
-                        average_run_cadence=lap.get('averageRunCadence'),
-                        max_run_cadence=lap.get('maxRunCadence'),
-                        average_power=lap.get('averagePower'),
-                        max_power=lap.get('maxPower'),
-                        ground_contact_time=lap.get('groundContactTime'),
-                        stride_length=lap.get('strideLength'),
-                        vertical_oscillation=lap.get('verticalOscillation'),
-                        vertical_ratio=lap.get('verticalRatio'),
-                        calories=lap.get('calories'),
-                        elevation_gain=lap.get('elevationGain'),
-                        elevation_loss=lap.get('elevationLoss'),
-                        max_elevation=lap.get('maxElevation'),
-                        min_elevation=lap.get('minElevation'),
-                        start_latitude=lap.get('startLatitude'),
-                        start_longitude=lap.get('startLongitude'),
-                        end_latitude=lap.get('endLatitude'),
-                        end_longitude=lap.get('endLongitude')
-                    )
-                    self.db.add(split)
-                    self.db.commit()
-                    logger.info(f"Successfully added split {lap.get('lapIndex')} for activity {activity_id}")
-                except Exception as e:
-                    logger.error(f"Error processing lap data: {str(e)}")
-                    self.db.rollback()
-                    continue
         except Exception as e:
             logger.error(f"Error fetching splits data: {str(e)}")
             raise
 
+        try:
+            inserted = self.save_activity_splits(self.build_split_rows(user_id, activity_id, splits_data))
+            self.db.commit()
+            logger.info(f"Successfully added {inserted} splits for activity {activity_id}")
+        except Exception as e:
+            logger.error(f"Error processing lap data: {str(e)}")
+            self.db.rollback()
+            raise
+
+    def build_split_rows(self, user_id: int, activity_id, splits_data: dict) -> list:
+        """
+        Garmin get_activity_splits 응답을 activity_splits 테이블 행(dict) 목록으로 변환합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            activity_id: Garmin 활동 ID
+            splits_data (dict): Garmin Connect get_activity_splits 응답
+            
+        Returns:
+            list: activity_splits 테이블 컬럼명을 키로 하는 딕셔너리 목록
+        """
+        if not splits_data or 'lapDTOs' not in splits_data:
+            logger.warning(f"No lap data found for activity {activity_id}")
+            return []
+
+        rows = []
+        for lap in splits_data['lapDTOs']:
+            try:
+                rows.append({
+                    "user_id": user_id,
+                    "activity_id": int(activity_id),
+                    "lap_index": lap.get('lapIndex'),
+                    "start_time_gmt": self._parse_garmin_datetime(lap.get('startTimeGMT')),
+                    "distance": lap.get('distance'),
+                    "duration": lap.get('duration'),
+                    "moving_duration": lap.get('movingDuration'),
+                    "average_speed": lap.get('averageSpeed'),
+                    "max_speed": lap.get('maxSpeed'),
+                    "average_hr": lap.get('averageHR'),
+                    "max_hr": lap.get('maxHR'),
+                    "average_run_cadence": lap.get('averageRunCadence'),
+                    "max_run_cadence": lap.get('maxRunCadence'),
+                    "average_power": lap.get('averagePower'),
+                    "max_power": lap.get('maxPower'),
+                    "ground_contact_time": lap.get('groundContactTime'),
+                    "stride_length": lap.get('strideLength'),
+                    "vertical_oscillation": lap.get('verticalOscillation'),
+                    "vertical_ratio": lap.get('verticalRatio'),
+                    "calories": lap.get('calories'),
+                    "elevation_gain": lap.get('elevationGain'),
+                    "elevation_loss": lap.get('elevationLoss'),
+                    "max_elevation": lap.get('maxElevation'),
+                    "min_elevation": lap.get('minElevation'),
+                    "start_latitude": lap.get('startLatitude'),
+                    "start_longitude": lap.get('startLongitude'),
+                    "end_latitude": lap.get('endLatitude'),
+                    "end_longitude": lap.get('endLongitude')
+                })
+            except Exception as e:
+                logger.error(f"Error processing lap data: {str(e)}")
+                continue
+        return rows
+
+    def save_activity_splits(self, split_rows: list) -> int:
+        """
+        랩 데이터를 한 번의 bulk INSERT로 저장합니다.
+        이미 저장된 (user_id, activity_id, lap_index) 랩은 유니크 제약으로 건너뜁니다.
+        commit 하지 않으므로 호출한 쪽의 트랜잭션에 포함됩니다.
+        
+        Args:
+            split_rows (list): build_split_rows로 만든 랩 데이터 목록 (여러 활동 혼합 가능)
+            
+        Returns:
+            int: 새로 저장된 랩 수
+        """
+        if not split_rows:
+            return 0
+        stmt = insert_ignore(self.db, ActivitySplit, ["user_id", "activity_id", "lap_index"])
+        result = self.db.connection().execute(stmt, split_rows)
+        return result.rowcount
+
     def save_activity_feedback(self, feedback_data: dict):
         """
         활동에 대한 피드백을 저장합니다.
@@ -472,6 +679,7 @@ class ActivityService:
         )
         self.db.add(feedback)
         self.db.commit()
+        bump_data_version(feedback_data.get('user_id'), FEEDBACK)
         return {"message": "Activity feedback saved successfully"}
     
     def get_activity_feedback(self, activity_id: int):
@@ -495,14 +703,18 @@ class ActivityService:
         feedback = self.db.query(ActivityFeedback).filter(ActivityFeedback.user_id == user_id).order_by(ActivityFeedback.activity_id.desc()).first()
         return feedback
     
-    def get_activity_laps(self, activity_id: int):
+    def get_activity_laps(self, user_id: int, activity_id: int):
         """
         활동의 랩 데이터를 조회합니다.
         
         Args:
+            user_id (int): 사용자 ID
             activity_id (int): 활동 ID
         """
-        laps = self.db.query(ActivitySplit).filter(ActivitySplit.activity_id == activity_id).all()
+        laps = self.db.query(ActivitySplit).filter(
+            ActivitySplit.user_id == user_id,
+            ActivitySplit.activity_id == activity_id
+        ).order_by(ActivitySplit.lap_index).all()
         return [{
             "lap_index": lap.lap_index,
             "distance": lap.distance,
@@ -513,6 +725,119 @@ class ActivityService:
             "average_run_cadence": lap.average_run_cadence,
         } for lap in laps]
 
+    def _query_activities(self, user_id: int, start_date: date = None, end_date: date = None, cursor: str = None, limit: int = None, fields: tuple = None):
+        """
+        활동 목록 조회 쿼리를 생성합니다.
+        (start_time_local, id) 내림차순 키셋 페이지네이션으로
+        (user_id, start_time_local) 인덱스를 타므로 페이지 위치와 무관하게 비용이 일정합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일 (포함)
+            end_date (date, optional): 조회 종료일 (포함)
+            cursor (str, optional): 이전 페이지의 다음 커서
+            limit (int, optional): 페이지 크기
+            fields (tuple, optional): SELECT 할 컬럼 목록. None이면 전체 컬럼
+            
+        Returns:
+            Query: 활동 조회 쿼리
+        """
+        query = self.db.query(Activity).filter(Activity.user_id == user_id)
+        if fields is not None:
+            query = query.options(self._load_fields(fields))
+        if start_date is not None:
+            query = query.filter(Activity.start_time_local >= datetime.combine(start_date, time.min))
+        if end_date is not None:
+            query = query.filter(Activity.start_time_local < datetime.combine(end_date + timedelta(days=1), time.min))
+        if cursor:
+            cursor_time, cursor_id = self.decode_cursor(cursor)
+            query = query.filter(or_(
+                Activity.start_time_local < cursor_time,
+                and_(Activity.start_time_local == cursor_time, Activity.id < cursor_id)
+            ))
+        query = query.order_by(Activity.start_time_local.desc(), Activity.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    def _parse_fields(self, fields: str = None) -> tuple:
+        """
+        fields 파라미터를 검증하여 반환할 필드 목록으로 변환합니다.
+        
+        Args:
+            fields (str, optional): 쉼표로 구분된 필드 목록 (예: "activity_name,start_time_local,distance")
+            
+        Returns:
+            tuple: 반환할 필드 목록. id, start_time_local은 항상 포함
+            
+        Raises:
+            HTTPException: 알 수 없는 필드가 포함된 경우 400 에러
+        """
+        if not fields:
+            return ACTIVITY_FIELDS
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in ACTIVITY_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return tuple(field for field in ACTIVITY_FIELDS if field in requested or field in REQUIRED_ACTIVITY_FIELDS)
+
+    def _load_fields(self, fields: tuple):
+        """
+        요청된 필드만 SELECT 하도록 load_only 옵션을 생성합니다.
+        """
+        return load_only(*[getattr(Activity, field) for field in fields], raiseload=True)
+
+    def _activity_to_dict(self, activity: Activity, fields: tuple = ACTIVITY_FIELDS) -> dict:
+        """
+        활동 객체를 요청된 필드만 포함한 딕셔너리로 변환합니다.
+        """
+        return {field: getattr(activity, field) for field in fields}
+
+    @staticmethod
+    def encode_cursor(start_time_local, id: int) -> str:
+        """
+        페이지의 마지막 활동으로 다음 페이지 커서를 생성합니다.
+        
+        Args:
+            start_time_local (datetime | str): 마지막 활동의 시작 시간
+            id (int): 마지막 활동의 내부 ID
+            
+        Returns:
+            str: URL-safe base64 커서 문자열
+        """
+        if isinstance(start_time_local, datetime):
+            start_time_local = start_time_local.isoformat()
+        return base64.urlsafe_b64encode(f"{start_time_local}|{id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """
+        커서 문자열을 (시작 시간, ID)로 변환합니다.
+        
+        Raises:
+            HTTPException: 잘못된 커서인 경우 400 에러
+        """
+        try:
+            start_time_local, id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+            return datetime.fromisoformat(start_time_local), int(id)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+    def _group_by_activity_id(self, rows) -> dict:
+        """
+        조회 결과를 activity_id 기준으로 묶습니다.
+        
+        Args:
+            rows: activity_id 속성을 가진 ORM 객체 목록 또는 쿼리
+            
+        Returns:
+            dict: {activity_id: [row, ...]} 형태의 딕셔너리 (조회 순서 유지)
+        """
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row.activity_id, []).append(row)
+        return grouped
+
     def _format_duration(self, seconds: float) -> str:
         """
         초 단위 시간을 HH:MM:SS.mmm 형식의 문자열로 변환합니다.
@@ -579,4 +904,48 @@ class ActivityService:
             return datetime.fromisoformat(date_str)
         except ValueError as e:
             logger.error(f"Error parsing date {date_str}: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+
+class AsyncActivityService:
+    """
+    ActivityService의 비동기 버전 (조회 전용)
+    
+    AsyncSession.run_sync를 통해 ActivityService의 동기 구현을 그대로 재사용하므로 쿼리 로직은 한 곳에만 존재하고,
+    DB I/O를 기다리는 동안 이벤트 루프가 막히지 않습니다.
+    run_sync의 함수 자체는 이벤트 루프 스레드에서 실행되므로, Redis/파일 I/O나 재계산이 따르는 쓰기 메서드는
+    두지 않습니다. (쓰기 라우트는 def 라우트에서 ActivityService를 사용해 스레드풀에서 실행)
+    """
+    
+    def __init__(self, db: AsyncSession):
+        """
+        AsyncActivityService 초기화
+        
+        Args:
+            db (AsyncSession): SQLAlchemy 비동기 데이터베이스 세션
+        """
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(lambda session: getattr(ActivityService(session), method)(*args, **kwargs))
+
+    async def get_activities(self, *args, **kwargs):
+        return await self._run("get_activities", *args, **kwargs)
+
+    async def get_activity(self, *args, **kwargs):
+        return await self._run("get_activity", *args, **kwargs)
+
+    async def get_activities_laps_with_comments(self, *args, **kwargs):
+        return await self._run("get_activities_laps_with_comments", *args, **kwargs)
+
+    async def get_activity_summary(self, user_id: int):
+        return await self._run("get_activity_summary", user_id)
+
+    async def get_monthly_activity_summary(self, user_id: int):
+        return await self._run("get_monthly_activity_summary", user_id)
+
+    async def get_activity_laps(self, user_id: int, activity_id: int):
+        return await self._run("get_activity_laps", user_id, activity_id)
+
+    async def get_dashboard_feedback(self, user_id: int):
+        return await self._run("get_dashboard_feedback", user_id)
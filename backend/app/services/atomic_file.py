@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from typing import IO, Iterator
+import os
+import tempfile
+
+@contextmanager
+def atomic_open(path: str, mode: str = "wb", permissions: int = 0o644) -> Iterator[IO]:
+    """
+    읽는 쪽이 반쯤 쓴 파일을 보지 않도록 같은 디렉토리의 임시 파일에 쓴 뒤 원래 경로로 교체합니다.
+    임시 파일 이름은 mkstemp로 만들므로 같은 프로세스의 여러 스레드가 같은 파일을 동시에 써도 서로의 임시 파일을 덮어쓰지 않습니다.
+    with 블록에서 예외가 나면 임시 파일을 지우고 원래 파일은 그대로 둡니다.
+
+    Args:
+        path (str): 최종 파일 경로
+        mode (str): 파일 열기 모드 ("wb" 또는 "w")
+        permissions (int): 파일 권한 (mkstemp 기본값은 0o600)
+
+    Yields:
+        IO: 임시 파일 객체
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.chmod(tmp_path, permissions)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
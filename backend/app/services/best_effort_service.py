@@ -0,0 +1,346 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..database import DB_YIELD_PER, upsert
+from ..models.activity import Activity, ActivityBestEffort, ActivitySplit, PersonalRecord
+from .sample_store import SampleStore
+
+logger = logging.getLogger(__name__)
+
+# 최고 기록을 계산할 거리 (미터)
+BEST_EFFORT_DISTANCES = {
+    "1k": 1000.0,
+    "5k": 5000.0,
+    "10k": 10000.0,
+    "half": 21097.5,
+    "full": 42195.0,
+}
+
+def find_best_effort(times: Sequence[float], distances: Sequence[float], target: float) -> Optional[Tuple[float, float]]:
+    """
+    누적 거리/시간 배열에서 target 미터를 가장 빨리 지난 구간을 두 포인터로 찾습니다. O(n)
+
+    구간 끝(right)을 하나씩 늘리면서, 구간 시작(left)은 끝에서 target 미터 전 지점을 넘지 않는 마지막 점까지만 앞으로 옮깁니다.
+    시작 지점은 left와 left + 1 사이를 선형 보간해 구간 거리가 정확히 target이 되도록 맞춥니다.
+
+    Args:
+        times (sequence): 누적 시간 (초, 단조 증가)
+        distances (sequence): 누적 거리 (미터, 단조 증가)
+        target (float): 목표 거리 (미터)
+
+    Returns:
+        tuple | None: (소요 시간, 구간 시작 시간). 전체 거리가 target보다 짧으면 None
+    """
+    count = len(distances)
+    if count < 2 or distances[-1] - distances[0] < target:
+        return None
+    best = None
+    left = 0
+    for right in range(1, count):
+        reach = distances[right] - target  # 구간 시작 지점의 누적 거리
+        if reach < distances[0]:
+            continue
+        # reach는 right가 늘어날수록 커지므로 left는 뒤로 돌아가지 않음 (전체 이동 횟수 n 이하)
+        while distances[left + 1] <= reach:
+            left += 1
+        span = distances[left + 1] - distances[left]
+        start = times[left] + (reach - distances[left]) / span * (times[left + 1] - times[left])
+        elapsed = times[right] - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, start)
+    return best
+
+def is_running(activity: Any) -> bool:
+    # 수동 입력 등 종류 정보가 없는 활동은 달리기로 간주
+    type_key = (activity.activity_type or {}).get("typeKey") if isinstance(activity.activity_type, dict) else None
+    return type_key is None or "running" in type_key
+
+class BestEffortService:
+    """
+    활동별 표준 거리(1k, 5k, 10k, 하프, 풀) 최고 기록과 사용자별 개인 기록(PR)을 관리하는 서비스 클래스
+
+    - 초 단위 샘플이 있으면 누적 거리/시간으로, 없으면 랩(랩도 없으면 활동 전체)을 구간별 일정 페이스로 보고 계산합니다.
+    - 새 활동이 들어오면 그 활동만 계산해 기존 개인 기록과 비교하고, 삭제 시에는 해당 거리만 다시 찾습니다.
+    이 클래스의 쓰기 메서드 중 apply_activities/remove_activity는 commit 하지 않으므로 호출한 쪽에서 commit 해야 합니다.
+    """
+
+    def __init__(self, db: Session, sample_store: SampleStore = None):
+        """
+        BestEffortService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+            sample_store (SampleStore, optional): 초 단위 샘플 저장소
+        """
+        self.db = db
+        self.sample_store = sample_store or SampleStore()
+
+    def apply_activities(self, activities: Iterable[Any]) -> int:
+        """
+        활동 목록의 최고 기록을 계산해 저장하고 개인 기록을 갱신합니다.
+
+        Args:
+            activities: user_id, activity_id, start_time_local, activity_type, distance, duration 속성을 가진 객체 목록
+
+        Returns:
+            int: 저장한 최고 기록 수
+        """
+        # Garmin 활동 ID가 없는 수동 입력 활동은 최고 기록 행을 활동과 연결할 수 없으므로 제외
+        activities = [activity for activity in activities if activity.activity_id is not None and is_running(activity)]
+        if not activities:
+            return 0
+        laps = self._get_laps(activities)
+        rows = []
+        for activity in activities:
+            rows.extend(self._compute_activity(activity, laps.get((activity.user_id, activity.activity_id))))
+        if not rows:
+            return 0
+
+        stmt = upsert(
+            self.db, ActivityBestEffort, ["user_id", "activity_id", "distance_key"],
+            ["elapsed", "start_offset", "source", "start_time_local"]
+        )
+        self.db.execute(stmt, rows)
+        self._update_records(rows)
+        self.db.flush()
+        return len(rows)
+
+    def remove_activity(self, user_id: int, activity_id: int) -> None:
+        """
+        삭제되는 활동의 최고 기록을 지우고, 그 활동이 세운 개인 기록은 남은 기록 중 최고로 교체합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): 가민 활동 ID
+        """
+        self.db.query(ActivityBestEffort).filter(
+            ActivityBestEffort.user_id == user_id,
+            ActivityBestEffort.activity_id == activity_id
+        ).delete(synchronize_session=False)
+        records = self.db.query(PersonalRecord).filter(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.activity_id == activity_id
+        ).all()
+        for record in records:
+            best = self.db.query(ActivityBestEffort).filter(
+                ActivityBestEffort.user_id == user_id,
+                ActivityBestEffort.distance_key == record.distance_key
+            ).order_by(ActivityBestEffort.elapsed).first()
+            if best is None:
+                self.db.delete(record)
+            else:
+                self._copy_effort(record, best)
+        self.db.flush()
+
+    def rebuild(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        모든 활동의 최고 기록과 개인 기록을 다시 계산합니다.
+
+        Args:
+            user_id (int, optional): 특정 사용자만 재계산. None이면 전체 사용자
+
+        Returns:
+            dict: 재계산 결과
+                - activities: 계산한 활동 수
+                - efforts: 저장된 최고 기록 수
+        """
+        try:
+            for model in (ActivityBestEffort, PersonalRecord):
+                query = self.db.query(model)
+                if user_id is not None:
+                    query = query.filter(model.user_id == user_id)
+                query.delete(synchronize_session=False)
+
+            query = self.db.query(
+                Activity.user_id,
+                Activity.activity_id,
+                Activity.start_time_local,
+                Activity.activity_type,
+                Activity.distance,
+                Activity.duration
+            )
+            if user_id is not None:
+                query = query.filter(Activity.user_id == user_id)
+
+            # 계산 중에 랩/기록을 조회하므로 필요한 컬럼만 먼저 읽은 뒤 랩 조회를 묶음 단위로 나눔
+            activities = query.all()
+            effort_count = 0
+            for offset in range(0, len(activities), DB_YIELD_PER):
+                effort_count += self.apply_activities(activities[offset:offset + DB_YIELD_PER])
+            activity_count = len(activities)
+            self.db.commit()
+
+            logger.info(f"Rebuilt best efforts for {activity_count} activities ({effort_count} efforts)")
+            return {"activities": activity_count, "efforts": effort_count}
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding best efforts: {str(e)}")
+            raise
+
+    def is_empty(self) -> bool:
+        """
+        최고 기록 테이블이 비어 있는데 원본 활동은 존재하는지 확인합니다.
+
+        Returns:
+            bool: 재계산이 필요한 경우 True
+        """
+        has_efforts = self.db.query(ActivityBestEffort.id).first() is not None
+        has_activities = self.db.query(Activity.id).first() is not None
+        return has_activities and not has_efforts
+
+    def get_personal_records(self, user_id: int) -> List[Dict[str, Any]]:
+        """
+        사용자의 거리별 개인 기록을 짧은 거리부터 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+
+        Returns:
+            list: [{distance_key, distance, elapsed, pace(초/km), activity_id, start_time_local, source}]
+        """
+        records = self.db.query(PersonalRecord).filter(PersonalRecord.user_id == user_id).order_by(PersonalRecord.distance).all()
+        return [
+            {
+                "distance_key": record.distance_key,
+                "distance": record.distance,
+                "elapsed": round(record.elapsed, 1),
+                "pace": round(record.elapsed / record.distance * 1000, 1),
+                "activity_id": record.activity_id,
+                "start_time_local": record.start_time_local,
+                "source": record.source
+            }
+            for record in records
+        ]
+
+    def get_activity_best_efforts(self, user_id: int, activity_id: int) -> List[Dict[str, Any]]:
+        """
+        활동 하나의 거리별 최고 기록을 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): 가민 활동 ID
+
+        Returns:
+            list: [{distance_key, distance, elapsed, pace(초/km), start_offset, source, is_personal_record}]
+        """
+        efforts = self.db.query(ActivityBestEffort).filter(
+            ActivityBestEffort.user_id == user_id,
+            ActivityBestEffort.activity_id == activity_id
+        ).order_by(ActivityBestEffort.distance).all()
+        record_keys = {
+            distance_key for (distance_key,) in self.db.query(PersonalRecord.distance_key).filter(
+                PersonalRecord.user_id == user_id,
+                PersonalRecord.activity_id == activity_id
+            )
+        }
+        return [
+            {
+                "distance_key": effort.distance_key,
+                "distance": effort.distance,
+                "elapsed": round(effort.elapsed, 1),
+                "pace": round(effort.elapsed / effort.distance * 1000, 1),
+                "start_offset": effort.start_offset,
+                "source": effort.source,
+                "is_personal_record": effort.distance_key in record_keys
+            }
+            for effort in efforts
+        ]
+
+    def _compute_activity(self, activity: Any, laps: Optional[List[Tuple[float, float]]]) -> List[Dict[str, Any]]:
+        """
+        활동 하나의 거리별 최고 기록 행을 계산합니다.
+        """
+        times, distances, source = self._get_track(activity, laps)
+        if times is None:
+            return []
+        rows = []
+        for distance_key, target in BEST_EFFORT_DISTANCES.items():
+            best = find_best_effort(times, distances, target)
+            if best is None:
+                # 거리 순서대로 계산하므로 더 긴 거리도 불가능
+                break
+            elapsed, start = best
+            rows.append({
+                "user_id": activity.user_id,
+                "activity_id": activity.activity_id,
+                "distance_key": distance_key,
+                "distance": target,
+                "elapsed": elapsed,
+                "start_offset": start - times[0],
+                "source": source,
+                "start_time_local": activity.start_time_local
+            })
+        return rows
+
+    def _get_track(self, activity: Any, laps: Optional[List[Tuple[float, float]]]):
+        """
+        최고 기록 계산에 쓸 누적 (시간, 거리) 목록을 샘플 > 랩 > 활동 전체 순서로 구합니다.
+
+        Returns:
+            tuple: (시간 목록, 거리 목록, 근거). 계산할 수 없으면 (None, None, None)
+        """
+        samples = self.sample_store.load(activity.user_id, activity.activity_id, ["time", "distance"])
+        if samples and "time" in samples and "distance" in samples:
+            times, distances = samples["time"], samples["distance"]
+            valid = ~(np.isnan(times) | np.isnan(distances))
+            if valid.sum() >= 2:
+                # GPS 보정 등으로 누적 거리가 잠깐 줄어드는 경우를 막기 위해 누적 최대값 사용
+                times = np.maximum.accumulate(times[valid])
+                distances = np.maximum.accumulate(distances[valid])
+                return times.tolist(), distances.tolist(), "samples"
+        if laps:
+            lap_distances, lap_durations = zip(*laps)
+            return [0.0] + np.cumsum(lap_durations).tolist(), [0.0] + np.cumsum(lap_distances).tolist(), "laps"
+        if activity.distance and activity.duration:
+            return [0.0, float(activity.duration)], [0.0, float(activity.distance)], "activity"
+        return None, None, None
+
+    def _get_laps(self, activities: List[Any]) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+        """
+        활동들의 랩을 한 번에 조회합니다.
+
+        Returns:
+            dict: {(user_id, activity_id): [(랩 거리, 랩 시간)]} 랩 순서대로. 거리/시간이 없는 랩은 제외
+        """
+        laps = {}
+        keys = {(activity.user_id, activity.activity_id) for activity in activities}
+        query = self.db.query(
+            ActivitySplit.user_id, ActivitySplit.activity_id, ActivitySplit.distance, ActivitySplit.duration
+        ).filter(
+            ActivitySplit.user_id.in_({user_id for user_id, _ in keys}),
+            ActivitySplit.activity_id.in_({activity_id for _, activity_id in keys})
+        ).order_by(ActivitySplit.user_id, ActivitySplit.activity_id, ActivitySplit.lap_index)
+        for user_id, activity_id, distance, duration in query:
+            if distance and duration and (user_id, activity_id) in keys:
+                laps.setdefault((user_id, activity_id), []).append((distance, duration))
+        return laps
+
+    def _update_records(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        새 최고 기록 중 사용자/거리별 가장 빠른 기록을 기존 개인 기록과 비교해 갱신합니다.
+        """
+        fastest = {}
+        for row in rows:
+            key = (row["user_id"], row["distance_key"])
+            if key not in fastest or row["elapsed"] < fastest[key]["elapsed"]:
+                fastest[key] = row
+        for (user_id, distance_key), row in fastest.items():
+            record = self.db.query(PersonalRecord).filter(
+                PersonalRecord.user_id == user_id,
+                PersonalRecord.distance_key == distance_key
+            ).first()
+            if record is None:
+                record = PersonalRecord(user_id=user_id, distance_key=distance_key)
+                self.db.add(record)
+            elif record.elapsed <= row["elapsed"]:
+                continue
+            self._copy_effort(record, ActivityBestEffort(**row))
+
+    def _copy_effort(self, record: PersonalRecord, effort: ActivityBestEffort) -> None:
+        record.distance = effort.distance
+        record.elapsed = effort.elapsed
+        record.activity_id = effort.activity_id
+        record.source = effort.source
+        record.start_time_local = effort.start_time_local
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence, Tuple
+import logging
+import threading
+import time
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 사용자 데이터가 바뀔 때마다 1씩 증가하는 버전 (분석 결과/응답 캐시 키에 포함)
+DATA_VERSION_KEY = "user_data_version:{user_id}"
+
+# 버전 범위. 변경된 데이터를 사용하는 캐시만 무효화되도록 범위별로 따로 증가시킴
+ACTIVITIES = "activities"  # 활동/랩/샘플 (동기화, 활동 추가/삭제)
+COMMENTS = "comments"  # 활동 댓글
+FEEDBACK = "feedback"  # 활동 피드백
+SCHEDULES = "schedules"  # 훈련 일정
+
+_last_warning = None
+
+# Redis를 사용할 수 없을 때 쓰는 프로세스 내 버전 (같은 프로세스에서 일어난 변경만 반영됨)
+_local_versions = {}
+_local_versions_lock = threading.Lock()
+
+def data_version_key(user_id: int, scope: str = ACTIVITIES) -> str:
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    return key if scope == ACTIVITIES else f"{key}:{scope}"
+
+def get_data_version(user_id: int, scope: str = ACTIVITIES) -> Optional[int]:
+    """
+    사용자 데이터 버전을 조회합니다. 동기화 워커와 API 서버가 같은 값을 보도록 Redis에 저장합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        scope (str): 버전 범위 (기본값은 활동 데이터)
+
+    Returns:
+        int | None: 데이터 버전. Redis를 사용할 수 없으면 None (호출한 쪽은 캐시를 사용하지 않아야 함)
+    """
+    try:
+        return int(get_redis().get(data_version_key(user_id, scope)) or 0)
+    except Exception as e:
+        _warn(f"User data version unavailable, skipping analytics cache: {str(e)}")
+        return None
+
+def get_data_versions(user_id: int, scopes: Sequence[str]) -> Tuple[Tuple[int, ...], bool]:
+    """
+    여러 범위의 데이터 버전을 한 번에 조회합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        scopes (Sequence[str]): 버전 범위 목록
+
+    Returns:
+        tuple: (범위별 버전, Redis 값 여부). Redis를 사용할 수 없으면 프로세스 내 버전과 False
+    """
+    try:
+        values = get_redis().mget([data_version_key(user_id, scope) for scope in scopes])
+        return tuple(int(value or 0) for value in values), True
+    except Exception as e:
+        _warn(f"User data version unavailable, using in-process versions: {str(e)}")
+        with _local_versions_lock:
+            return tuple(_local_versions.get((user_id, scope), 0) for scope in scopes), False
+
+def bump_data_version(user_id: int, scope: str = ACTIVITIES) -> None:
+    """
+    사용자 데이터가 바뀌었음을 기록해 이전 버전으로 캐시된 결과를 무효화합니다.
+    데이터를 저장한 트랜잭션을 commit 한 뒤에 호출해야 합니다.
+
+    Args:
+        user_id (int): 사용자 ID
+        scope (str): 바뀐 데이터의 버전 범위 (기본값은 활동 데이터)
+    """
+    with _local_versions_lock:
+        _local_versions[(user_id, scope)] = _local_versions.get((user_id, scope), 0) + 1
+    try:
+        get_redis().incr(data_version_key(user_id, scope))
+    except Exception as e:
+        _warn(f"Failed to bump user data version: {str(e)}")
+
+class LocalCache:
+    """
+    프로세스 메모리에 분석 결과를 보관하는 LRU 캐시
+
+    키에 get_data_version 값을 포함해 사용하면, 데이터가 바뀐 뒤에는 새 키로 조회되어 이전 결과가 쓰이지 않고
+    오래된 항목은 크기 제한에 따라 정리됩니다.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        LocalCache 초기화
+
+        Args:
+            max_size (int): 보관할 최대 항목 수
+            ttl (float): 항목 유지 시간 (초)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """
+        결과를 저장합니다. ttl을 지정하면 이 항목만 기본 유지 시간 대신 해당 시간(초) 동안 유지합니다.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            # 오래 사용하지 않은 결과부터 제거 (이전 데이터 버전의 결과도 여기서 정리됨)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+def _warn(message: str) -> None:
+    # Redis 없이 실행하는 환경에서 요청마다 경고가 쌓이지 않도록 1분에 한 번만 기록
+    global _last_warning
+    if _last_warning is None or time.monotonic() - _last_warning >= 60:
+        _last_warning = time.monotonic()
+        logger.warning(message)
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+import logging
+import math
+import os
+
+from app.models.stats import UserWeeklyStats
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 주기적 전체 동기화 설정 ───────────────────
+GARMIN_FLEET_SYNC_INTERVAL = int(os.getenv("GARMIN_FLEET_SYNC_INTERVAL", "3600"))  # 자주 달리는 사용자의 동기화 주기 (초)
+GARMIN_FLEET_SYNC_TICK = int(os.getenv("GARMIN_FLEET_SYNC_TICK", "60"))  # 스케줄러 실행 주기 (초)
+GARMIN_FLEET_SHARDS = int(os.getenv("GARMIN_FLEET_SHARDS", "4"))  # 사용자 ID 나머지로 나눌 샤드 수
+GARMIN_FLEET_ACTIVE_PER_WEEK = float(os.getenv("GARMIN_FLEET_ACTIVE_PER_WEEK", "3"))  # 이 이상 달리면 기본 주기로 동기화
+GARMIN_FLEET_MAX_INTERVAL_FACTOR = float(os.getenv("GARMIN_FLEET_MAX_INTERVAL_FACTOR", "6"))  # 활동이 적은 사용자의 최대 주기 배수
+
+# 최근 활동 빈도를 계산할 기간 (주)
+FREQUENCY_WEEKS = 4
+
+def get_shard(user_id: int, shards: int = GARMIN_FLEET_SHARDS) -> int:
+    """
+    사용자 ID의 나머지로 샤드 번호를 계산합니다. (plan_shard의 SQL 조건과 같은 값)
+    """
+    return user_id % shards
+
+class FleetSyncService:
+    """
+    Garmin 연동 사용자 전체를 주기적으로 동기화하는 계획을 세우는 서비스 클래스
+
+    - 최근 4주 활동 빈도로 사용자별 동기화 주기를 정합니다. (자주 달릴수록 짧게)
+    - 주기 대비 오래된 정도(staleness)가 큰 사용자부터 동기화합니다.
+    - 한 번의 실행(tick)에 동기화할 사용자 수를 전체 주기에 고르게 나누어 부하를 평탄하게 유지합니다.
+    """
+
+    def __init__(self, db: Session):
+        """
+        FleetSyncService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+        """
+        self.db = db
+
+    def plan_shard(self, shard: int, now: datetime = None, recently_queued: set = frozenset()) -> List[Tuple[int, float]]:
+        """
+        한 샤드에서 이번 tick에 동기화할 사용자와 시작 지연 시간을 계산합니다.
+
+        Args:
+            shard (int): 샤드 번호
+            now (datetime, optional): 기준 시각
+            recently_queued (set): 최근 이미 동기화를 등록한 사용자 ID (실패한 사용자를 매 tick 재시도하지 않도록 제외)
+
+        Returns:
+            list: [(user_id, countdown)] 우선순위 순서. countdown은 tick 안에서 고르게 나눈 지연 시간 (초)
+        """
+        now = now or datetime.now()
+        # 샤드 조건을 SQL로 걸어 각 샤드가 자기 사용자만 읽도록 함
+        users = self.db.query(User.id, User.garmin_sync_date).filter(
+            User.garmin_sync_status == "success",
+            User.id % GARMIN_FLEET_SHARDS == shard
+        ).all()
+        if not users:
+            return []
+
+        intervals = self.get_sync_intervals([user_id for user_id, _ in users], now)
+
+        # 이번 tick의 동기화 수 = 샤드 전체의 tick당 기대 동기화 수
+        budget = math.ceil(sum(GARMIN_FLEET_SYNC_TICK / interval for interval in intervals.values()))
+
+        due = []
+        for user_id, sync_date in users:
+            if user_id in recently_queued:
+                continue
+            interval = intervals[user_id]
+            staleness = math.inf if sync_date is None else (now - sync_date).total_seconds() / interval
+            if staleness >= 1:
+                due.append((staleness, user_id))
+        due.sort(reverse=True)
+        selected = [user_id for _, user_id in due[:budget]]
+        logger.info(f"Fleet sync shard {shard}: {len(users)} users, {len(due)} due, {len(selected)} scheduled")
+        return [(user_id, index * GARMIN_FLEET_SYNC_TICK / len(selected)) for index, user_id in enumerate(selected)]
+
+    def get_sync_intervals(self, user_ids: List[int], now: datetime = None) -> Dict[int, float]:
+        """
+        최근 4주 주간 활동 수로 사용자별 동기화 주기를 계산합니다.
+
+        Args:
+            user_ids (list): 사용자 ID 목록
+            now (datetime, optional): 기준 시각
+
+        Returns:
+            dict: {user_id: 동기화 주기(초)}
+        """
+        now = now or datetime.now()
+        since = now.date() - timedelta(days=now.weekday(), weeks=FREQUENCY_WEEKS - 1)
+        counts = dict(
+            self.db.query(UserWeeklyStats.user_id, func.sum(UserWeeklyStats.activity_count))
+            .filter(UserWeeklyStats.user_id.in_(user_ids), UserWeeklyStats.period >= since)
+            .group_by(UserWeeklyStats.user_id)
+        )
+        intervals = {}
+        for user_id in user_ids:
+            per_week = (counts.get(user_id) or 0) / FREQUENCY_WEEKS
+            factor = GARMIN_FLEET_MAX_INTERVAL_FACTOR if per_week == 0 else GARMIN_FLEET_ACTIVE_PER_WEEK / per_week
+            intervals[user_id] = GARMIN_FLEET_SYNC_INTERVAL * min(GARMIN_FLEET_MAX_INTERVAL_FACTOR, max(1.0, factor))
+        return intervals
@@ -0,0 +1,123 @@
+from typing import Any, Iterator, Optional, Tuple
+import gzip
+import json
+import logging
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .atomic_file import atomic_open
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── Garmin 원본 응답 보관소 설정 ───────────────────
+GARMIN_ARCHIVE_ENABLED = os.getenv("GARMIN_ARCHIVE_ENABLED", "true").lower() == "true"
+GARMIN_ARCHIVE_DIR = os.getenv("GARMIN_ARCHIVE_DIR", "./garmin_archive")
+GARMIN_ARCHIVE_COMPRESSION = os.getenv("GARMIN_ARCHIVE_COMPRESSION", "gzip")  # gzip, zstd (zstandard 패키지 필요)
+
+# 보관하는 응답 종류
+ACTIVITY = "activity"  # get_activities 응답의 활동 항목
+SPLITS = "splits"  # get_activity_splits 응답
+DETAILS = "details"  # get_activity_details 응답 (초 단위 샘플)
+
+EXTENSIONS = {"gzip": ".json.gz", "zstd": ".json.zst"}
+
+class GarminArchive:
+    """
+    Garmin Connect 원본 JSON 응답을 압축해 로컬 디렉토리에 보관하는 클래스
+
+    파일 경로는 {GARMIN_ARCHIVE_DIR}/{user_id}/{activity_id}/{종류}.json.gz 형식으로
+    활동 ID로 결정되므로, 같은 활동을 다시 저장하면 덮어씁니다.
+    보관소를 읽어 Garmin에 다시 요청하지 않고도 activities/activity_splits를 재구성할 수 있습니다.
+    """
+
+    def __init__(self, root: str = GARMIN_ARCHIVE_DIR, compression: str = GARMIN_ARCHIVE_COMPRESSION):
+        """
+        GarminArchive 초기화
+
+        Args:
+            root (str): 보관소 디렉토리
+            compression (str): 저장 시 압축 방식 (gzip, zstd)
+        """
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, archiving Garmin payloads with gzip")
+            compression = "gzip"
+        self.root = root
+        self.compression = compression
+
+    def save(self, user_id: int, activity_id: int, kind: str, payload: Any) -> None:
+        """
+        원본 응답을 압축해 저장합니다. 저장 실패는 로그만 남깁니다. (동기화를 실패시키지 않음)
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            kind (str): 응답 종류 (activity, splits, details)
+            payload: JSON으로 직렬화할 원본 응답
+        """
+        try:
+            directory = os.path.join(self.root, str(user_id), str(activity_id))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, kind + EXTENSIONS[self.compression])
+            data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+            if self.compression == "zstd":
+                data = zstandard.ZstdCompressor().compress(data)
+            else:
+                data = gzip.compress(data)
+            # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+            with atomic_open(path) as f:
+                f.write(data)
+        except Exception as e:
+            logger.error(f"Failed to archive {kind} payload for activity {activity_id}: {str(e)}")
+
+    def load(self, user_id: int, activity_id: int, kind: str) -> Optional[Any]:
+        """
+        보관된 원본 응답을 읽습니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            kind (str): 응답 종류 (activity, splits, details)
+
+        Returns:
+            보관된 응답. 없으면 None
+        """
+        directory = os.path.join(self.root, str(user_id), str(activity_id))
+        for compression, extension in EXTENSIONS.items():
+            path = os.path.join(directory, kind + extension)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            if compression == "zstd":
+                if zstandard is None:
+                    raise RuntimeError(f"zstandard is required to read {path}")
+                data = zstandard.ZstdDecompressor().decompress(data)
+            else:
+                data = gzip.decompress(data)
+            return json.loads(data)
+        return None
+
+    def iter_entries(self, user_id: int = None) -> Iterator[Tuple[int, int]]:
+        """
+        보관된 활동 목록을 반환합니다.
+
+        Args:
+            user_id (int, optional): 특정 사용자만 조회. None이면 전체 사용자
+
+        Yields:
+            tuple: (user_id, activity_id)
+        """
+        if not os.path.isdir(self.root):
+            return
+        user_dirs = [str(user_id)] if user_id is not None else os.listdir(self.root)
+        for user_dir in user_dirs:
+            path = os.path.join(self.root, user_dir)
+            if not user_dir.isdigit() or not os.path.isdir(path):
+                continue
+            for activity_dir in os.listdir(path):
+                if activity_dir.isdigit():
+                    yield int(user_dir), int(activity_dir)
@@ -0,0 +1,231 @@
+from typing import Any, Callable
+from garminconnect import GarminConnectTooManyRequestsError
+import logging
+import os
+import threading
+import time
+import uuid
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── Garmin API 호출 제한 설정 ───────────────────
+# 모든 uvicorn/Celery 프로세스가 Redis로 공유하는 전역 제한
+GARMIN_RATE_PER_MINUTE = float(os.getenv("GARMIN_RATE_PER_MINUTE", "60"))  # 분당 평균 호출 수 (토큰 버킷 충전 속도)
+GARMIN_RATE_BURST = int(os.getenv("GARMIN_RATE_BURST", "10"))  # 한 번에 몰아서 보낼 수 있는 호출 수 (버킷 크기)
+GARMIN_MAX_CONCURRENCY = int(os.getenv("GARMIN_MAX_CONCURRENCY", "16"))  # 동시에 진행 중인 호출 수
+GARMIN_CALL_TIMEOUT = int(os.getenv("GARMIN_CALL_TIMEOUT", "120"))  # 동시 호출 슬롯 임대 시간 (초). 프로세스가 죽어도 이후 회수됨
+GARMIN_RATE_MAX_WAIT = int(os.getenv("GARMIN_RATE_MAX_WAIT", "300"))  # 호출 허가를 기다리는 최대 시간 (초)
+GARMIN_RATE_MAX_RETRIES = int(os.getenv("GARMIN_RATE_MAX_RETRIES", "3"))  # 429 응답 시 재시도 횟수
+GARMIN_BACKOFF_BASE = float(os.getenv("GARMIN_BACKOFF_BASE", "5"))  # 첫 429 이후 전체 호출 중단 시간 (초), 연속 429마다 2배
+GARMIN_BACKOFF_MAX = float(os.getenv("GARMIN_BACKOFF_MAX", "300"))  # 최대 중단 시간 (초)
+
+BUCKET_KEY = "garmin_rate:bucket"
+SLOTS_KEY = "garmin_rate:slots"
+PENALTY_KEY = "garmin_rate:penalty"
+BACKOFF_LEVEL_KEY = "garmin_rate:backoff_level"
+
+# 토큰 버킷: 토큰이 있으면 하나 꺼내고 0, 없으면 다음 토큰까지 기다릴 밀리초를 반환
+# Redis 서버 시간을 사용해 프로세스 간 시계 차이의 영향을 받지 않음
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+if tokens == nil then
+    tokens = burst
+    updated = now
+end
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate) + 1000)
+return wait
+"""
+
+# 동시 호출 슬롯: 만료된 임대를 정리한 뒤 빈 슬롯이 있으면 임대
+CONCURRENCY_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+    return 1
+end
+return 0
+"""
+
+class GarminRateLimitError(Exception):
+    """Garmin API 호출 허가를 제한 시간 안에 받지 못한 경우의 오류"""
+
+def is_rate_limited(error: Exception) -> bool:
+    """
+    Garmin Connect의 429(Too Many Requests) 응답으로 발생한 예외인지 확인합니다.
+    """
+    if isinstance(error, GarminConnectTooManyRequestsError):
+        return True
+    response = getattr(error, "response", None) or getattr(getattr(error, "error", None), "response", None)
+    return getattr(response, "status_code", None) == 429
+
+class GarminRateLimiter:
+    """
+    Garmin Connect API 호출을 여러 프로세스에 걸쳐 제한하는 클래스
+
+    - 토큰 버킷으로 분당 호출 수를 제한합니다.
+    - 동시에 진행 중인 호출 수를 제한합니다.
+    - 429 응답을 받으면 모든 프로세스의 호출을 잠시 멈추고, 연속으로 받을수록 대기 시간을 늘립니다.
+
+    Redis에 연결할 수 없으면 같은 분당 제한을 프로세스 내 토큰 버킷으로 이 프로세스에만 적용하고 경고를 남깁니다.
+    (프로세스 수만큼 전체 호출 수가 늘어날 수 있음. 프로세스 내 사용자별 제한은 GarminService에서 유지)
+    """
+
+    def __init__(self):
+        self._bucket = None
+        self._slots = None
+        self._local_penalty_until = 0.0
+        self._last_warning = None
+        self._fallback = False
+        self._local_lock = threading.Lock()
+        self._local_tokens = None
+        self._local_updated = None
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        호출 허가를 받은 뒤 Garmin API 함수를 실행합니다.
+        429 응답이면 전역 백오프를 건 뒤 재시도합니다.
+
+        Args:
+            func (callable): Garmin 클라이언트 메서드 (예: client.get_activities)
+            *args, **kwargs: func에 전달할 인자
+
+        Returns:
+            func의 반환값
+
+        Raises:
+            GarminRateLimitError: 제한 시간 안에 호출 허가를 받지 못한 경우
+        """
+        for attempt in range(GARMIN_RATE_MAX_RETRIES + 1):
+            slot = self._acquire()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == GARMIN_RATE_MAX_RETRIES:
+                    raise
+                self._on_rate_limited(func)
+            finally:
+                self._release(slot)
+
+    def _acquire(self):
+        """
+        백오프 대기, 토큰 버킷, 동시 호출 슬롯을 차례로 통과할 때까지 기다립니다.
+
+        Returns:
+            str | None: 임대한 동시 호출 슬롯 ID. Redis를 사용할 수 없으면 None
+        """
+        deadline = time.monotonic() + GARMIN_RATE_MAX_WAIT
+        local_wait = self._local_penalty_until - time.monotonic()
+        if local_wait > 0:
+            self._sleep_until(deadline, local_wait)
+        try:
+            client = get_redis()
+            self._register_scripts(client)
+            while True:
+                wait_ms = client.pttl(PENALTY_KEY)
+                if wait_ms <= 0:
+                    wait_ms = self._bucket(keys=[BUCKET_KEY], args=[GARMIN_RATE_PER_MINUTE / 60000, GARMIN_RATE_BURST], client=client)
+                if wait_ms <= 0:
+                    break
+                self._sleep_until(deadline, wait_ms / 1000)
+
+            slot = str(uuid.uuid4())
+            while not self._slots(keys=[SLOTS_KEY], args=[GARMIN_MAX_CONCURRENCY, slot, GARMIN_CALL_TIMEOUT * 1000], client=client):
+                self._sleep_until(deadline, 0.1)
+            if self._fallback:
+                self._fallback = False
+                logger.info("Garmin rate limiter reconnected to Redis, global limit restored")
+            return slot
+        except GarminRateLimitError:
+            raise
+        except Exception as e:
+            # 제한이 풀리는 시점에는 항상 경고하고, 이후에는 호출마다 경고가 쌓이지 않도록 1분에 한 번만 기록
+            if not self._fallback or self._last_warning is None or time.monotonic() - self._last_warning >= 60:
+                self._fallback = True
+                self._last_warning = time.monotonic()
+                logger.warning(
+                    f"Garmin rate limiter cannot reach Redis, falling back to a per-process limit of "
+                    f"{GARMIN_RATE_PER_MINUTE:g}/min without a global limit: {str(e)}"
+                )
+        while True:
+            wait = self._take_local_token()
+            if wait <= 0:
+                return None
+            self._sleep_until(deadline, wait)
+
+    def _take_local_token(self) -> float:
+        """
+        Redis를 사용할 수 없을 때 쓰는 프로세스 내 토큰 버킷 (Redis 스크립트와 같은 방식)
+
+        Returns:
+            float: 토큰을 꺼냈으면 0, 없으면 다음 토큰까지 기다릴 시간 (초)
+        """
+        rate = GARMIN_RATE_PER_MINUTE / 60
+        with self._local_lock:
+            now = time.monotonic()
+            if self._local_tokens is None:
+                self._local_tokens, self._local_updated = GARMIN_RATE_BURST, now
+            self._local_tokens = min(GARMIN_RATE_BURST, self._local_tokens + (now - self._local_updated) * rate)
+            self._local_updated = now
+            if self._local_tokens >= 1:
+                self._local_tokens -= 1
+                return 0
+            return (1 - self._local_tokens) / rate
+
+    def _release(self, slot):
+        if slot is None:
+            return
+        try:
+            get_redis().zrem(SLOTS_KEY, slot)
+        except Exception as e:
+            logger.warning(f"Failed to release Garmin call slot: {str(e)}")
+
+    def _on_rate_limited(self, func: Callable):
+        """
+        429 응답을 받은 경우 모든 프로세스의 Garmin 호출을 일정 시간 멈춥니다.
+        10분 안에 다시 429를 받으면 대기 시간을 두 배로 늘립니다.
+        실제 대기는 다음 호출의 _acquire에서 이루어지므로 슬롯을 쥔 채 기다리지 않습니다.
+        """
+        delay = GARMIN_BACKOFF_BASE
+        try:
+            client = get_redis()
+            level = client.incr(BACKOFF_LEVEL_KEY)
+            client.expire(BACKOFF_LEVEL_KEY, 600)
+            delay = min(GARMIN_BACKOFF_BASE * 2 ** (level - 1), GARMIN_BACKOFF_MAX)
+            # 이미 더 긴 백오프가 걸려 있으면 줄이지 않음
+            if client.pttl(PENALTY_KEY) < delay * 1000:
+                client.set(PENALTY_KEY, 1, px=int(delay * 1000))
+        except Exception as e:
+            logger.warning(f"Failed to record Garmin backoff: {str(e)}")
+        logger.warning(f"Garmin Connect returned 429 for {getattr(func, '__name__', func)}, backing off {delay:.0f}s")
+        # Redis를 사용할 수 없는 경우에도 이 프로세스는 대기
+        self._local_penalty_until = max(self._local_penalty_until, time.monotonic() + delay)
+
+    def _register_scripts(self, client):
+        if self._bucket is None:
+            self._bucket = client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._slots = client.register_script(CONCURRENCY_SCRIPT)
+
+    def _sleep_until(self, deadline: float, seconds: float):
+        if time.monotonic() + seconds > deadline:
+            raise GarminRateLimitError("Timed out waiting for Garmin API rate limit")
+        time.sleep(seconds)
+
+# 프로세스 전체에서 공유하는 인스턴스
+garmin_rate_limiter = GarminRateLimiter()
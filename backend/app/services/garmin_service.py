@@ -1,12 +1,84 @@
 from datetime import datetime
+from typing import Callable, Dict
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from fastapi import HTTPException
 from garminconnect import Garmin
-from app.models.activity import Activity
+from app.database import DB_YIELD_PER, insert_ignore, upsert
+from app.models.activity import Activity, ActivitySplit
+from app.models.user import User
+from app.garmin_standin.client import GarminStandInClient
+from app.services.activity_service import ActivityService
+from app.services.best_effort_service import BestEffortService
+from app.services.data_version import bump_data_version
+from app.services.garmin_archive import ACTIVITY, DETAILS, SPLITS, GARMIN_ARCHIVE_ENABLED, GarminArchive
+from app.services.garmin_rate_limiter import garmin_rate_limiter
+from app.services.garmin_token_store import GarminTokenStore
+from app.services.sample_store import GARMIN_DETAILS_MAX_CHART, GARMIN_SAMPLES_ENABLED, SampleStore, parse_activity_details
+from app.services.stats_service import StatsService
+from app.services.training_load_service import TrainingLoadService
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import repeat
 
 logger = logging.getLogger(__name__)
 
+# Garmin Connect 스탠드인 서버 주소. 설정하면 실제 Garmin 대신 이 서버와 동기화 (테스트/벤치마크용)
+GARMIN_STANDIN_URL = os.getenv("GARMIN_STANDIN_URL")
+
+# 증분 동기화 설정
+GARMIN_SYNC_PAGE_SIZE = int(os.getenv("GARMIN_SYNC_PAGE_SIZE", "20"))  # get_activities 한 번에 가져올 활동 수
+GARMIN_SYNC_MAX_ACTIVITIES = int(os.getenv("GARMIN_SYNC_MAX_ACTIVITIES", "2000"))  # 한 번의 동기화에서 가져올 최대 활동 수 (0이면 무제한)
+
+# 랩 데이터 동시 조회 설정
+GARMIN_FETCH_MAX_WORKERS = int(os.getenv("GARMIN_FETCH_MAX_WORKERS", "8"))  # 프로세스 전체 동시 요청 수
+GARMIN_FETCH_PER_USER = int(os.getenv("GARMIN_FETCH_PER_USER", "4"))  # 사용자(계정)별 동시 요청 수
+
+_splits_executor = ThreadPoolExecutor(max_workers=GARMIN_FETCH_MAX_WORKERS, thread_name_prefix="garmin-splits")
+_user_semaphores = {}
+_user_semaphores_lock = threading.Lock()
+
+def _get_user_semaphore(user_id: int) -> threading.BoundedSemaphore:
+    """
+    한 사용자의 Garmin 계정으로 동시에 보내는 요청 수를 제한하는 세마포어를 반환합니다.
+    """
+    with _user_semaphores_lock:
+        if user_id not in _user_semaphores:
+            _user_semaphores[user_id] = threading.BoundedSemaphore(GARMIN_FETCH_PER_USER)
+        return _user_semaphores[user_id]
+
+# 보관소 재처리 시 프로세스에 한 번에 넘길 활동 수
+REPROCESS_CHUNK_SIZE = 32
+
+def _rebuild_archived_rows(entry: tuple, archive_root: str):
+    """
+    보관된 활동 하나의 원본 응답을 읽어 activities/activity_splits 행으로 변환합니다.
+    초 단위 샘플이 보관되어 있으면 샘플 파일도 다시 만듭니다.
+    프로세스 풀에서 실행되므로 DB 세션을 사용하지 않습니다.
+    
+    Args:
+        entry (tuple): (user_id, activity_id)
+        archive_root (str): 보관소 디렉토리
+        
+    Returns:
+        tuple: (activity 행 또는 None, split 행 목록)
+    """
+    user_id, activity_id = entry
+    archive = GarminArchive(archive_root)
+    activity_data = archive.load(user_id, activity_id, ACTIVITY)
+    activity_row = GarminService.build_activity_row(user_id, activity_data) if activity_data else None
+    if activity_row is None:
+        return None, []
+    splits_data = archive.load(user_id, activity_id, SPLITS)
+    split_rows = ActivityService(None).build_split_rows(user_id, activity_id, splits_data) if splits_data else []
+    details = archive.load(user_id, activity_id, DETAILS)
+    if details:
+        SampleStore().save(user_id, activity_id, parse_activity_details(details))
+    return activity_row, split_rows
+
 class GarminService:
     """
     Garmin Connect API와의 연동을 처리하는 서비스 클래스
@@ -23,22 +95,70 @@ class GarminService:
             db (Session): SQLAlchemy 데이터베이스 세션
         """
         self.db = db
+        self.token_store = GarminTokenStore()
+        self.archive = GarminArchive()
+        self.sample_store = SampleStore()
 
-    def check_garmin_login(self, email: str, password: str):
+    def check_garmin_login(self, email: str, password: str, user_id: int = None):
         """
         Garmin Connect 로그인 여부를 확인합니다.
+        비밀번호 검증이 목적이므로 저장된 토큰을 쓰지 않고 항상 전체 로그인합니다.
+        user_id가 주어지면 발급된 토큰을 저장해 이후 동기화에서 재사용합니다.
         
         Args:
             email (str): Garmin Connect 이메일  
             password (str): Garmin Connect 비밀번호
+            user_id (int, optional): 토큰을 저장할 사용자 ID
             
         Returns:
             bool: 로그인 여부
         """
-        client = Garmin(email, password)
-        return client.login()
+        client = self._create_client(email, password)
+        result = garmin_rate_limiter.call(client.login)
+        if result and user_id is not None:
+            self.token_store.save(user_id, email, client.garth.dumps())
+        return result
+
+    def _create_client(self, email: str, password: str) -> Garmin:
+        """
+        Garmin Connect 클라이언트를 생성합니다. GARMIN_STANDIN_URL이 설정되어 있으면 스탠드인 서버 클라이언트를 사용합니다.
+        """
+        if GARMIN_STANDIN_URL:
+            return GarminStandInClient(email, password, GARMIN_STANDIN_URL)
+        return Garmin(email, password)
 
-    def sync_activities(self, user_id: int, garmin_email: str, garmin_password: str):
+    def login_client(self, user_id: int, email: str, password: str) -> Garmin:
+        """
+        저장된 토큰으로 Garmin Connect 클라이언트를 만들고, 실패하면 전체 로그인합니다.
+        만료된 OAuth2 토큰은 garth가 OAuth1 토큰으로 자동 갱신합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            email (str): Garmin Connect 이메일
+            password (str): Garmin Connect 비밀번호
+            
+        Returns:
+            Garmin: 로그인된 Garmin Connect API 클라이언트
+        """
+        started = time.perf_counter()
+        tokens = self.token_store.load(user_id, email)
+        if tokens:
+            client = self._create_client(email, password)
+            try:
+                garmin_rate_limiter.call(client.login, tokens)
+                logger.info(f"Resumed Garmin session for user {user_id} in {time.perf_counter() - started:.2f}s")
+                return client
+            except Exception as e:
+                logger.warning(f"Stored Garmin tokens rejected for user {user_id}, logging in again: {str(e)}")
+                self.token_store.delete(user_id)
+
+        client = self._create_client(email, password)
+        garmin_rate_limiter.call(client.login)
+        self.token_store.save(user_id, email, client.garth.dumps())
+        logger.info(f"Logged in to Garmin Connect for user {user_id} in {time.perf_counter() - started:.2f}s")
+        return client
+
+    def sync_activities(self, user_id: int, garmin_email: str, garmin_password: str, progress: Callable = None):
         """
         Garmin Connect에서 사용자의 활동 데이터를 동기화합니다.
         
@@ -46,6 +166,7 @@ class GarminService:
             user_id (int): 사용자 ID
             email (str): Garmin Connect 이메일
             password (str): Garmin Connect 비밀번호
+            progress (callable, optional): 단계별 진행 상황을 전달받는 콜백 progress(stage, **info)
             
         Returns:
             dict: 동기화 결과 정보
@@ -55,162 +176,463 @@ class GarminService:
         Raises:
             HTTPException: Garmin Connect 로그인 실패 또는 활동 데이터 가져오기 실패 시
         """
+        if progress is None:
+            progress = lambda stage, **info: None
         try:
             logger.info("Starting Garmin sync process")
+            progress("login")
             
-            # Garmin Connect 클라이언트 초기화
-            client = Garmin(garmin_email, garmin_password)
-            
-            # 로그인
+            # Garmin Connect 로그인 (저장된 토큰이 있으면 재사용)
             logger.info("Attempting to login to Garmin Connect")
             try:
-                client.login()
+                client = self.login_client(user_id, garmin_email, garmin_password)
                 logger.info("Successfully logged in to Garmin Connect")
             except Exception as e:
                 logger.error(f"Failed to login to Garmin Connect: {str(e)}")
                 raise HTTPException(status_code=401, detail="Failed to login to Garmin Connect")
             
-            # 최근 활동 가져오기 (최근 100개)
-            logger.info("Fetching recent activities")
+            # 마지막 동기화 이후의 활동만 가져오기 (워터마크 기준 증분 동기화)
+            user = self.db.query(User).filter(User.id == user_id).first()
+            watermark = self._get_sync_watermark(user_id, user)
+            logger.info(f"Fetching activities newer than {watermark}")
+            progress("fetch_activities")
             try:
-                activities = client.get_activities(0, 100)
-                logger.info(f"Successfully fetched activities: {activities}")
+                activities = self._fetch_new_activities(client, watermark)
+                logger.info(f"Successfully fetched {len(activities)} activities")
             except Exception as e:
                 logger.error(f"Failed to fetch activities: {str(e)}")
                 raise HTTPException(status_code=500, detail="Failed to fetch activities from Garmin Connect")
             
             if not activities:
                 logger.info("No activities found")
+                if user is not None:
+                    user.garmin_sync_date = datetime.now()
+                    self.db.commit()
                 return {"message": "No activities found"}
             
             logger.info(f"Found {len(activities)} activities")
-            synced_count = 0
             
+            # 이미 저장된 활동을 한 번의 IN 쿼리로 확인
+            fetched_ids = [activity_data.get('activityId') for activity_data in activities]
+            existing_ids = {
+                activity_id for (activity_id,) in self.db.query(Activity.activity_id).filter(
+                    Activity.user_id == user_id,
+                    Activity.activity_id.in_(fetched_ids)
+                )
+            }
+            
+            rows = []
             for activity_data in activities:
-                try:
-                    # 이미 저장된 활동인지 확인
-                    existing_activity = self.db.query(Activity).filter(
-                        Activity.user_id == user_id,
-                        Activity.activity_id == activity_data.get('activityId')
-                    ).first()
-                    
-                    if existing_activity:
-                        logger.info(f"Activity {activity_data.get('activityId')} already exists, skipping")
-                        continue
-                    
-                    # 심박수 구간 시간
-                    hr_zones = {
-                        'zone_1': activity_data.get('hrTimeInZone_1', 0),
-                        'zone_2': activity_data.get('hrTimeInZone_2', 0),
-                        'zone_3': activity_data.get('hrTimeInZone_3', 0),
-                        'zone_4': activity_data.get('hrTimeInZone_4', 0),
-                        'zone_5': activity_data.get('hrTimeInZone_5', 0)
-                    }
-                    
-                    # 파워 구간 시간
-                    power_zones = {
-                        'zone_1': activity_data.get('powerTimeInZone_1', 0),
-                        'zone_2': activity_data.get('powerTimeInZone_2', 0),
-                        'zone_3': activity_data.get('powerTimeInZone_3', 0),
-                        'zone_4': activity_data.get('powerTimeInZone_4', 0),
-                        'zone_5': activity_data.get('powerTimeInZone_5', 0)
-                    }
-                    
-                    # 날짜 문자열을 datetime 객체로 변환
-                    try:
-                        start_time_local = datetime.fromisoformat(activity_data.get('startTimeLocal'))
-                        start_time_gmt = datetime.fromisoformat(activity_data.get('startTimeGMT'))
-                        end_time_gmt = datetime.fromisoformat(activity_data.get('endTimeGMT'))
-                    except (ValueError, TypeError) as e:
-                        logger.error(f"Error converting dates for activity {activity_data.get('activityId')}: {str(e)}")
-                        continue
-                    
-                    # Activity 모델에 맞는 데이터 구성
-                    activity = Activity(
-                        activity_id=activity_data.get('activityId'),
-                        activity_name=activity_data.get('activityName'),
-                        user_id=user_id,
-                        start_time_local=start_time_local,
-                        start_time_gmt=start_time_gmt,
-                        end_time_gmt=end_time_gmt,
-                        activity_type=activity_data.get('activityType'),
-                        event_type=activity_data.get('eventType'),
-                        distance=activity_data.get('distance'),
-                        duration=activity_data.get('duration'),
-                        elapsed_duration=activity_data.get('elapsedDuration'),
-                        moving_duration=activity_data.get('movingDuration'),
-                        elevation_gain=activity_data.get('elevationGain'),
-                        elevation_loss=activity_data.get('elevationLoss'),
-                        min_elevation=activity_data.get('minElevation'),
-                        max_elevation=activity_data.get('maxElevation'),
-                        elevation_corrected=activity_data.get('elevationCorrected', False),
-                        average_speed=activity_data.get('averageSpeed'),
-                        max_speed=activity_data.get('maxSpeed'),
-                        start_latitude=activity_data.get('startLatitude'),
-                        start_longitude=activity_data.get('startLongitude'),
-                        end_latitude=activity_data.get('endLatitude'),
-                        end_longitude=activity_data.get('endLongitude'),
-                        average_hr=activity_data.get('averageHR'),
-                        max_hr=activity_data.get('maxHR'),
-                        hr_time_in_zones=hr_zones,
-                        avg_power=activity_data.get('avgPower'),
-                        max_power=activity_data.get('maxPower'),
-                        power_time_in_zones=power_zones,
-                        aerobic_training_effect=activity_data.get('aerobicTrainingEffect'),
-                        anaerobic_training_effect=activity_data.get('anaerobicTrainingEffect'),
-                        training_effect_label=activity_data.get('trainingEffectLabel'),
-                        vo2max_value=activity_data.get('vO2MaxValue'),
-                        average_cadence=activity_data.get('averageRunningCadenceInStepsPerMinute'),
-                        max_cadence=activity_data.get('maxRunningCadenceInStepsPerMinute'),
-                        avg_vertical_oscillation=activity_data.get('avgVerticalOscillation'),
-                        avg_ground_contact_time=activity_data.get('avgGroundContactTime'),
-                        avg_stride_length=activity_data.get('avgStrideLength'),
-                        calories=activity_data.get('calories'),
-                        water_estimated=activity_data.get('waterEstimated'),
-                        activity_training_load=activity_data.get('activityTrainingLoad'),
-                        moderate_intensity_minutes=activity_data.get('moderateIntensityMinutes'),
-                        vigorous_intensity_minutes=activity_data.get('vigorousIntensityMinutes'),
-                        steps=activity_data.get('steps'),
-                        time_zone_id=activity_data.get('timeZoneId'),
-                        sport_type_id=activity_data.get('sportTypeId'),
-                        device_id=activity_data.get('deviceId'),
-                        manufacturer=activity_data.get('manufacturer'),
-                        lap_count=activity_data.get('lapCount'),
-                        privacy=activity_data.get('privacy'),
-                        favorite=activity_data.get('favorite', False),
-                        manual_activity=activity_data.get('manualActivity', False)
-                    )
-                    
-                    self.db.add(activity)
-                    self.db.flush()  # ID를 얻기 위해 flush
-                    
-                    synced_count += 1
-                    logger.info(f"Successfully added activity {activity_data.get('activityId')}")
-
-                    self.process_activity_splits(client, activity_data.get('activityId'))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing activity {activity_data.get('activityId')}: {str(e)}")
+                if activity_data.get('activityId') in existing_ids:
+                    logger.info(f"Activity {activity_data.get('activityId')} already exists, skipping")
                     continue
+                row = self.build_activity_row(user_id, activity_data)
+                if row is not None:
+                    rows.append(row)
             
+            # 신규 활동의 랩 데이터를 쓰기 트랜잭션을 열기 전에 스레드 풀로 동시에 가져옴
+            # (호출 제한 때문에 수 분이 걸릴 수 있으므로, 그동안 DB 쓰기 잠금을 잡고 있지 않도록 함)
+            # 읽기 트랜잭션도 먼저 끝내 Garmin 호출 동안 열린 트랜잭션이 없도록 함
             self.db.commit()
+            progress("fetch_splits", fetched=len(activities), new=len(rows))
+            splits_by_activity = self.fetch_activity_splits(client, user_id, [row["activity_id"] for row in rows])
+            
+            # 신규 활동을 한 번의 bulk INSERT로 저장
+            # 동시에 실행된 다른 동기화가 먼저 저장한 활동은 (user_id, activity_id) 유니크 제약으로 무시됨
+            progress("save_activities", fetched=len(activities))
+            inserted_ids = []
+            if rows:
+                stmt = insert_ignore(self.db, Activity, ["user_id", "activity_id"]).returning(Activity.activity_id)
+                inserted_ids = [activity_id for (activity_id,) in self.db.execute(stmt, rows)]
+            inserted = set(inserted_ids)
+            new_rows = [row for row in rows if row["activity_id"] in inserted]
+            self._archive_payloads(user_id, ACTIVITY, {
+                activity_data.get('activityId'): activity_data
+                for activity_data in activities if activity_data.get('activityId') in inserted
+            })
+            StatsService(self.db).apply_activities([Activity(**row) for row in new_rows])
+            # 가장 이른 신규 활동 날짜부터 오늘까지 CTL/ATL/TSB를 이어서 계산
+            TrainingLoadService(self.db).update(
+                user_id, min((row["start_time_local"].date() for row in new_rows if row.get("start_time_local")), default=None)
+            )
+            synced_count = len(new_rows)
+            logger.info(f"Inserted {synced_count} new activities")
+            
+            # 이번 동기화에서 저장한 활동의 랩만 한 번의 bulk INSERT로 저장
+            activity_service = ActivityService(self.db)
+            splits_by_activity = {
+                activity_id: splits_data for activity_id, splits_data in splits_by_activity.items() if activity_id in inserted
+            }
+            self._archive_payloads(user_id, SPLITS, splits_by_activity)
+            split_rows = []
+            for activity_id, splits_data in splits_by_activity.items():
+                split_rows.extend(activity_service.build_split_rows(user_id, activity_id, splits_data))
+            split_count = activity_service.save_activity_splits(split_rows)
+            logger.info(f"Inserted {split_count} splits")
+            
+            # 워터마크 갱신
+            if user is not None:
+                self._update_sync_watermark(user, new_rows)
+            
+            # 활동, 롤업, 랩, 워터마크를 하나의 짧은 트랜잭션으로 commit
+            self.db.commit()
+            
+            # 신규 활동의 초 단위 샘플 저장 (DB가 아닌 활동별 압축 파일이므로 commit 후 쓰기 잠금 없이 수행)
+            progress("fetch_samples", fetched=len(activities), synced=synced_count)
+            sample_count = self.ingest_activity_samples(client, user_id, [row["activity_id"] for row in new_rows])
+            logger.info(f"Stored samples for {sample_count} activities")
+            
+            # 저장된 샘플(없으면 랩)로 신규 활동의 최고 기록을 계산하고 개인 기록 갱신
+            if new_rows:
+                BestEffortService(self.db, self.sample_store).apply_activities([Activity(**row) for row in new_rows])
+                self.db.commit()
+                # 이전 데이터로 캐시된 분석 결과 무효화
+                bump_data_version(user_id)
+            # 동기화 중 갱신된 OAuth2 토큰 저장
+            self.token_store.save(user_id, garmin_email, client.garth.dumps())
             logger.info(f"Sync completed. Synced {synced_count} activities")
             return {
                 "message": f"Successfully synced {synced_count} activities",
                 "total_activities": len(activities)
             }
             
+        except HTTPException:
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error during sync process: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    def process_activity_splits(self, client: Garmin, activity_id: str):
+    def _archive_payloads(self, user_id: int, kind: str, payloads: dict):
+        """
+        Garmin 원본 응답을 보관소에 저장합니다. (GARMIN_ARCHIVE_ENABLED=false면 저장하지 않음)
+        
+        Args:
+            user_id (int): 사용자 ID
+            kind (str): 응답 종류 (activity, splits, details)
+            payloads (dict): {activity_id: 원본 응답}
+        """
+        if not GARMIN_ARCHIVE_ENABLED:
+            return
+        for activity_id, payload in payloads.items():
+            self.archive.save(user_id, activity_id, kind, payload)
+
+    def reprocess_archive(self, user_id: int = None, workers: int = None) -> Dict[str, int]:
+        """
+        보관된 Garmin 원본 응답으로 activities/activity_splits 행을 다시 만듭니다.
+        Garmin에 요청하지 않으며, 압축 해제와 행 변환은 프로세스 풀에서 병렬로 수행합니다.
+        이미 있는 행은 보관된 응답 기준으로 갱신하고, 롤업은 마지막에 다시 계산합니다.
+        초 단위 샘플(details)이 보관된 활동은 샘플 파일도 다시 만듭니다.
+        
+        Args:
+            user_id (int, optional): 특정 사용자만 재처리. None이면 전체 사용자
+            workers (int, optional): 프로세스 수. None이면 CPU 수
+            
+        Returns:
+            dict: 재처리 결과
+                - activities: 갱신된 활동 수
+                - splits: 갱신된 랩 수
+        """
+        entries = list(self.archive.iter_entries(user_id))
+        activity_count = 0
+        split_count = 0
+        activity_rows = []
+        split_rows = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(_rebuild_archived_rows, entries, repeat(self.archive.root), chunksize=REPROCESS_CHUNK_SIZE)
+                for activity_row, rows in results:
+                    if activity_row is not None:
+                        activity_rows.append(activity_row)
+                    split_rows.extend(rows)
+                    if len(activity_rows) >= DB_YIELD_PER:
+                        activity_count, split_count = self._save_reprocessed_rows(activity_rows, split_rows, activity_count, split_count)
+                        activity_rows, split_rows = [], []
+            activity_count, split_count = self._save_reprocessed_rows(activity_rows, split_rows, activity_count, split_count)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error reprocessing Garmin archive: {str(e)}")
+            raise
+
+        # 활동 거리/시간이 바뀌었을 수 있으므로 롤업 재계산
+        StatsService(self.db).rebuild(user_id)
+        TrainingLoadService(self.db).rebuild(user_id)
+        BestEffortService(self.db, self.sample_store).rebuild(user_id)
+        for reprocessed_user_id in {entry_user_id for entry_user_id, _ in entries}:
+            bump_data_version(reprocessed_user_id)
+        logger.info(f"Reprocessed {activity_count} activities and {split_count} splits from archive")
+        return {"activities": activity_count, "splits": split_count}
+
+    def _save_reprocessed_rows(self, activity_rows: list, split_rows: list, activity_count: int, split_count: int):
+        if activity_rows:
+            columns = [column for column in activity_rows[0] if column not in ("user_id", "activity_id")]
+            stmt = upsert(self.db, Activity, ["user_id", "activity_id"], columns)
+            activity_count += self.db.connection().execute(stmt, activity_rows).rowcount
+        if split_rows:
+            columns = [column for column in split_rows[0] if column not in ("user_id", "activity_id", "lap_index")]
+            stmt = upsert(self.db, ActivitySplit, ["user_id", "activity_id", "lap_index"], columns)
+            split_count += self.db.connection().execute(stmt, split_rows).rowcount
+        return activity_count, split_count
+
+    def _get_sync_watermark(self, user_id: int, user: User = None):
+        """
+        사용자의 동기화 워터마크(이미 저장된 가장 최근 활동의 시작 시간)를 반환합니다.
+        워터마크가 저장되지 않은 기존 사용자는 저장된 활동에서 계산합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            user (User, optional): 사용자 객체
+            
+        Returns:
+            datetime | None: 워터마크. 저장된 활동이 없으면 None (전체 백필)
+        """
+        if user is not None and user.garmin_last_activity_time is not None:
+            return user.garmin_last_activity_time
+        return self.db.query(func.max(Activity.start_time_local)).filter(Activity.user_id == user_id).scalar()
+
+    def _update_sync_watermark(self, user: User, new_rows: list):
+        """
+        새로 저장된 활동 중 가장 최근 활동으로 워터마크를 갱신합니다.
+        
+        Args:
+            user (User): 사용자 객체
+            new_rows (list): 새로 저장된 활동 행 목록
+        """
+        user.garmin_sync_date = datetime.now()
+        if not new_rows:
+            return
+        latest = max(new_rows, key=lambda row: (row["start_time_local"], row["activity_id"]))
+        if user.garmin_last_activity_time is None or latest["start_time_local"] >= user.garmin_last_activity_time:
+            user.garmin_last_activity_time = latest["start_time_local"]
+            user.garmin_last_activity_id = latest["activity_id"]
+
+    def _fetch_new_activities(self, client: Garmin, watermark: datetime = None) -> list:
+        """
+        Garmin 활동 목록을 최신순으로 페이지 단위로 가져오며,
+        워터마크 이전(이미 저장된) 활동이 나오는 페이지에서 멈춥니다.
+        변경이 없으면 작은 요청 한 번으로 끝나고, 신규 사용자는 100개를 넘어 백필합니다.
+        
+        Args:
+            client (Garmin): 로그인된 Garmin Connect API 클라이언트
+            watermark (datetime, optional): 이미 저장된 가장 최근 활동의 시작 시간
+            
+        Returns:
+            list: 가져온 활동 목록 (워터마크와 같은 페이지의 기존 활동 포함 가능)
+        """
+        activities = []
+        start = 0
+        while True:
+            page = garmin_rate_limiter.call(client.get_activities, start, GARMIN_SYNC_PAGE_SIZE) or []
+            activities.extend(page)
+            if len(page) < GARMIN_SYNC_PAGE_SIZE:
+                break
+            if watermark is not None and any(self._is_known_activity(activity_data, watermark) for activity_data in page):
+                break
+            if GARMIN_SYNC_MAX_ACTIVITIES and len(activities) >= GARMIN_SYNC_MAX_ACTIVITIES:
+                logger.info(f"Reached backfill limit of {GARMIN_SYNC_MAX_ACTIVITIES} activities")
+                break
+            start += GARMIN_SYNC_PAGE_SIZE
+        return activities
+
+    def _is_known_activity(self, activity_data: dict, watermark: datetime) -> bool:
+        try:
+            return datetime.fromisoformat(activity_data.get('startTimeLocal')) <= watermark
+        except (ValueError, TypeError):
+            return False
+
+    def fetch_activity_splits(self, client: Garmin, user_id: int, activity_ids: list) -> dict:
+        """
+        여러 활동의 랩 데이터를 스레드 풀에서 동시에 가져옵니다.
+        작업 스레드는 Garmin API 호출만 수행하고 DB 세션은 사용하지 않습니다.
+        
+        Args:
+            client (Garmin): 로그인된 Garmin Connect API 클라이언트
+            user_id (int): 사용자 ID (사용자별 동시 요청 수 제한에 사용)
+            activity_ids (list): Garmin 활동 ID 목록
+            
+        Returns:
+            dict: {activity_id: get_activity_splits 응답}. 가져오기에 실패한 활동은 제외
+        """
+        def fetch(activity_id):
+            return garmin_rate_limiter.call(client.get_activity_splits, activity_id)
+
+        return self._fetch_concurrently(fetch, user_id, activity_ids, "splits")
+
+    def fetch_activity_details(self, client: Garmin, user_id: int, activity_ids: list) -> dict:
+        """
+        여러 활동의 초 단위 샘플(get_activity_details)을 스레드 풀에서 동시에 가져옵니다.
+        
+        Args:
+            client (Garmin): 로그인된 Garmin Connect API 클라이언트
+            user_id (int): 사용자 ID (사용자별 동시 요청 수 제한에 사용)
+            activity_ids (list): Garmin 활동 ID 목록
+            
+        Returns:
+            dict: {activity_id: get_activity_details 응답}. 가져오기에 실패한 활동은 제외
+        """
+        def fetch(activity_id):
+            return garmin_rate_limiter.call(client.get_activity_details, activity_id, GARMIN_DETAILS_MAX_CHART)
+
+        return self._fetch_concurrently(fetch, user_id, activity_ids, "details")
+
+    def _fetch_concurrently(self, fetch: Callable, user_id: int, activity_ids: list, kind: str) -> dict:
+        """
+        활동별 조회를 공유 스레드 풀에 제출하고 결과를 모읍니다.
+        사용자 슬롯은 작업 스레드가 아니라 제출하는 쪽에서 잡으므로, 한 사용자의 작업이 풀에 GARMIN_FETCH_PER_USER개를 넘게 쌓이거나
+        작업 스레드가 슬롯을 기다리며 묶여 다른 사용자의 조회를 막지 않습니다.
+        """
+        user_slots = _get_user_semaphore(user_id)
+        futures = {}
+        for activity_id in activity_ids:
+            user_slots.acquire()
+            try:
+                future = _splits_executor.submit(fetch, activity_id)
+            except Exception:
+                user_slots.release()
+                raise
+            future.add_done_callback(lambda _: user_slots.release())
+            futures[future] = activity_id
+        results = {}
+        for future in as_completed(futures):
+            activity_id = futures[future]
+            try:
+                results[activity_id] = future.result()
+                logger.info(f"Fetched {kind} data for activity {activity_id}")
+            except Exception as e:
+                logger.error(f"Error processing activity {activity_id}: {str(e)}")
+        return results
+
+    def ingest_activity_samples(self, client: Garmin, user_id: int, activity_ids: list) -> int:
+        """
+        신규 활동의 초 단위 샘플을 가져와 SampleStore에 저장합니다.
+        샘플 수집 실패는 동기화를 실패시키지 않습니다.
+        
+        Args:
+            client (Garmin): 로그인된 Garmin Connect API 클라이언트
+            user_id (int): 사용자 ID
+            activity_ids (list): Garmin 활동 ID 목록
+            
+        Returns:
+            int: 샘플을 저장한 활동 수
+        """
+        if not GARMIN_SAMPLES_ENABLED or not activity_ids:
+            return 0
+        details_by_activity = self.fetch_activity_details(client, user_id, activity_ids)
+        self._archive_payloads(user_id, DETAILS, details_by_activity)
+        stored = 0
+        for activity_id, details in details_by_activity.items():
+            try:
+                if self.sample_store.save(user_id, activity_id, parse_activity_details(details or {})):
+                    stored += 1
+            except Exception as e:
+                logger.error(f"Error storing samples for activity {activity_id}: {str(e)}")
+        return stored
+
+    @staticmethod
+    def build_activity_row(user_id: int, activity_data: dict):
+        """
+        Garmin 활동 데이터를 activities 테이블 행(dict)으로 변환합니다.
+        토큰 저장소/보관소 없이 호출할 수 있어 재처리 프로세스에서도 그대로 사용합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            activity_data (dict): Garmin Connect get_activities 응답의 활동 항목
+            
+        Returns:
+            dict | None: activities 테이블 컬럼명을 키로 하는 딕셔너리. 날짜 변환 실패 시 None
+        """
+        # 심박수 구간 시간
+        hr_zones = {
+            'zone_1': activity_data.get('hrTimeInZone_1', 0),
+            'zone_2': activity_data.get('hrTimeInZone_2', 0),
+            'zone_3': activity_data.get('hrTimeInZone_3', 0),
+            'zone_4': activity_data.get('hrTimeInZone_4', 0),
+            'zone_5': activity_data.get('hrTimeInZone_5', 0)
+        }
+        
+        # 파워 구간 시간
+        power_zones = {
+            'zone_1': activity_data.get('powerTimeInZone_1', 0),
+            'zone_2': activity_data.get('powerTimeInZone_2', 0),
+            'zone_3': activity_data.get('powerTimeInZone_3', 0),
+            'zone_4': activity_data.get('powerTimeInZone_4', 0),
+            'zone_5': activity_data.get('powerTimeInZone_5', 0)
+        }
+        
+        # 날짜 문자열을 datetime 객체로 변환
+        try:
+            start_time_local = datetime.fromisoformat(activity_data.get('startTimeLocal'))
+            start_time_gmt = datetime.fromisoformat(activity_data.get('startTimeGMT'))
+            end_time_gmt = datetime.fromisoformat(activity_data.get('endTimeGMT'))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error converting dates for activity {activity_data.get('activityId')}: {str(e)}")
+            return None
+        
+        # Activity 모델에 맞는 데이터 구성
+        return {
+            "activity_id": activity_data.get('activityId'),
+            "activity_name": activity_data.get('activityName'),
+            "user_id": user_id,
+            "start_time_local": start_time_local,
+            "start_time_gmt": start_time_gmt,
+            "end_time_gmt": end_time_gmt,
+            "activity_type": activity_data.get('activityType'),
+            "event_type": activity_data.get('eventType'),
+            "distance": activity_data.get('distance'),
+            "duration": activity_data.get('duration'),
+            "elapsed_duration": activity_data.get('elapsedDuration'),
+            "moving_duration": activity_data.get('movingDuration'),
+            "elevation_gain": activity_data.get('elevationGain'),
+            "elevation_loss": activity_data.get('elevationLoss'),
+            "min_elevation": activity_data.get('minElevation'),
+            "max_elevation": activity_data.get('maxElevation'),
+            "elevation_corrected": activity_data.get('elevationCorrected', False),
+            "average_speed": activity_data.get('averageSpeed'),
+            "max_speed": activity_data.get('maxSpeed'),
+            "start_latitude": activity_data.get('startLatitude'),
+            "start_longitude": activity_data.get('startLongitude'),
+            "end_latitude": activity_data.get('endLatitude'),
+            "end_longitude": activity_data.get('endLongitude'),
+            "average_hr": activity_data.get('averageHR'),
+            "max_hr": activity_data.get('maxHR'),
+            "hr_time_in_zones": hr_zones,
+            "avg_power": activity_data.get('avgPower'),
+            "max_power": activity_data.get('maxPower'),
+            "power_time_in_zones": power_zones,
+            "aerobic_training_effect": activity_data.get('aerobicTrainingEffect'),
+            "anaerobic_training_effect": activity_data.get('anaerobicTrainingEffect'),
+            "training_effect_label": activity_data.get('trainingEffectLabel'),
+            "vo2max_value": activity_data.get('vO2MaxValue'),
+            "average_cadence": activity_data.get('averageRunningCadenceInStepsPerMinute'),
+            "max_cadence": activity_data.get('maxRunningCadenceInStepsPerMinute'),
+            "avg_vertical_oscillation": activity_data.get('avgVerticalOscillation'),
+            "avg_ground_contact_time": activity_data.get('avgGroundContactTime'),
+            "avg_stride_length": activity_data.get('avgStrideLength'),
+            "calories": activity_data.get('calories'),
+            "water_estimated": activity_data.get('waterEstimated'),
+            "activity_training_load": activity_data.get('activityTrainingLoad'),
+            "moderate_intensity_minutes": activity_data.get('moderateIntensityMinutes'),
+            "vigorous_intensity_minutes": activity_data.get('vigorousIntensityMinutes'),
+            "steps": activity_data.get('steps'),
+            "time_zone_id": activity_data.get('timeZoneId'),
+            "sport_type_id": activity_data.get('sportTypeId'),
+            "device_id": activity_data.get('deviceId'),
+            "manufacturer": activity_data.get('manufacturer'),
+            "lap_count": activity_data.get('lapCount'),
+            "privacy": activity_data.get('privacy'),
+            "favorite": activity_data.get('favorite', False),
+            "manual_activity": activity_data.get('manualActivity', False)
+        }
+
+    def process_activity_splits(self, client: Garmin, user_id: int, activity_id: str):
         """
         Garmin Connect API를 통해 활동의 랩 데이터를 가져와 처리합니다.
         
         Args:
             client (Garmin): Garmin Connect API 클라이언트
+            user_id (int): 사용자 ID
             activity_id (str): Garmin 활동 ID
             
         Returns:
@@ -221,16 +643,15 @@ class GarminService:
         """
         try:
             # 활동이 존재하는지 확인
-            activity = self.db.query(Activity).filter(Activity.activity_id == str(activity_id)).first()
+            activity = self.db.query(Activity).filter(Activity.user_id == user_id, Activity.activity_id == int(activity_id)).first()
             if not activity:
                 raise HTTPException(status_code=404, detail="Activity not found")
             
             logger.info(f"activity {str(activity.activity_id)}")
             
             # ActivityService를 사용하여 랩 데이터 처리
-            from app.services.activity_service import ActivityService
             activity_service = ActivityService(self.db)
-            activity_service.process_activity_splits(client, str(activity.activity_id))
+            activity_service.process_activity_splits(client, user_id, str(activity.activity_id))
             return {"message": "Activity splits processed successfully"}
             
         except Exception as e:
@@ -0,0 +1,243 @@
+from typing import Optional, Tuple
+from cryptography.fernet import Fernet, InvalidToken
+import json
+import logging
+import os
+
+from app.redis_client import get_redis
+from .atomic_file import atomic_open
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── Garmin 토큰 저장소 설정 ───────────────────
+GARMIN_TOKEN_STORE = os.getenv("GARMIN_TOKEN_STORE", "disk")  # disk, redis, none
+GARMIN_TOKEN_DIR = os.getenv("GARMIN_TOKEN_DIR", "./garmin_tokens")
+GARMIN_TOKEN_TTL = int(os.getenv("GARMIN_TOKEN_TTL", str(180 * 24 * 60 * 60)))  # Redis 저장 시 만료 시간 (초)
+# Fernet 키 (백엔드와 워커가 같은 키를 써야 함). 생성: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+GARMIN_TOKEN_KEY = os.getenv("GARMIN_TOKEN_KEY")
+# GARMIN_TOKEN_KEY 대신 키를 읽을 파일 (시크릿 마운트 등). 토큰과 함께 유출되지 않도록 GARMIN_TOKEN_DIR 밖에 있어야 함
+GARMIN_TOKEN_KEY_FILE = os.getenv("GARMIN_TOKEN_KEY_FILE")
+# 둘 다 없거나 잘못되면 저장소를 끄고(GARMIN_TOKEN_STORE=none과 같음) 매번 전체 로그인
+
+# 키 설정 문제는 프로세스마다 한 번만 경고
+_key_warning_logged = False
+
+REDIS_KEY = "garmin_tokens:{user_id}"
+# 동기화 요청으로 받은 Garmin 로그인 정보 (Celery 작업 인자에 비밀번호를 싣지 않기 위해 여기에 보관)
+CREDENTIALS_REDIS_KEY = "garmin_credentials:{user_id}"
+
+class GarminTokenStore:
+    """
+    사용자별 Garmin(garth) OAuth 토큰을 암호화해 디스크 또는 Redis에 저장하는 클래스
+
+    토큰은 가민 이메일과 함께 저장되며, 이메일이 바뀌면 저장된 토큰을 사용하지 않습니다.
+    동기화 작업이 읽을 로그인 정보(이메일/비밀번호)도 같은 키로 암호화해 별도 항목으로 저장합니다.
+    저장소 오류는 로그만 남기고 무시하므로, 호출한 쪽은 항상 전체 로그인으로 대체할 수 있습니다.
+    암호화 키가 설정되지 않았으면 경고를 남기고 저장소를 쓰지 않습니다. (backend가 none이 됨)
+    """
+
+    def __init__(self, backend: str = GARMIN_TOKEN_STORE):
+        """
+        GarminTokenStore 초기화
+
+        Args:
+            backend (str): 저장소 종류 (disk, redis, none)
+        """
+        self.backend = backend
+        self._fernet = None
+        if backend != "none":
+            key = load_token_key()
+            if key is None:
+                self.backend = "none"
+            else:
+                self._fernet = Fernet(key)
+
+    def load(self, user_id: int, email: str) -> Optional[str]:
+        """
+        저장된 토큰을 복호화해 반환합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            email (str): Garmin Connect 이메일
+
+        Returns:
+            str | None: garth.dumps() 형식의 토큰. 없거나 사용할 수 없으면 None
+        """
+        if self.backend == "none":
+            return None
+        try:
+            data = self._read(user_id)
+            if data is None:
+                return None
+            payload = json.loads(self._fernet.decrypt(data))
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"Discarding unreadable Garmin tokens for user {user_id}: {str(e)}")
+            self.delete(user_id)
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load Garmin tokens for user {user_id}: {str(e)}")
+            return None
+        if payload.get("email") != email:
+            return None
+        return payload.get("tokens")
+
+    def save(self, user_id: int, email: str, tokens: str) -> None:
+        """
+        토큰을 암호화해 저장합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            email (str): Garmin Connect 이메일
+            tokens (str): garth.dumps() 형식의 토큰
+        """
+        if self.backend == "none":
+            return
+        try:
+            data = self._fernet.encrypt(json.dumps({"email": email, "tokens": tokens}).encode())
+            self._write(user_id, data)
+        except Exception as e:
+            logger.warning(f"Failed to save Garmin tokens for user {user_id}: {str(e)}")
+
+    def delete(self, user_id: int) -> None:
+        """
+        저장된 토큰을 삭제합니다. (가민 연동 해제, 토큰 만료 시)
+
+        Args:
+            user_id (int): 사용자 ID
+        """
+        if self.backend == "none":
+            return
+        try:
+            if self.backend == "redis":
+                get_redis().delete(REDIS_KEY.format(user_id=user_id))
+            elif os.path.exists(self._path(user_id)):
+                os.remove(self._path(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to delete Garmin tokens for user {user_id}: {str(e)}")
+
+    def save_credentials(self, user_id: int, email: str, password: str) -> bool:
+        """
+        동기화 작업이 사용할 로그인 정보를 암호화해 저장합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            email (str): Garmin Connect 이메일
+            password (str): Garmin Connect 비밀번호
+
+        Returns:
+            bool: 저장했으면 True. 저장소를 쓰지 않거나 실패하면 False
+        """
+        if self.backend == "none":
+            return False
+        try:
+            data = self._fernet.encrypt(json.dumps({"email": email, "password": password}).encode())
+            self._write(user_id, data, "credentials")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save Garmin credentials for user {user_id}: {str(e)}")
+            return False
+
+    def load_credentials(self, user_id: int) -> Optional[Tuple[str, str]]:
+        """
+        저장된 로그인 정보를 복호화해 반환합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+
+        Returns:
+            tuple | None: (이메일, 비밀번호). 없거나 사용할 수 없으면 None
+        """
+        if self.backend == "none":
+            return None
+        try:
+            data = self._read(user_id, "credentials")
+            if data is None:
+                return None
+            payload = json.loads(self._fernet.decrypt(data))
+            return payload["email"], payload["password"]
+        except Exception as e:
+            logger.warning(f"Failed to load Garmin credentials for user {user_id}: {str(e)}")
+            return None
+
+    def delete_credentials(self, user_id: int) -> None:
+        """
+        저장된 로그인 정보를 삭제합니다. (가민 연동 해제 시)
+
+        Args:
+            user_id (int): 사용자 ID
+        """
+        if self.backend == "none":
+            return
+        try:
+            if self.backend == "redis":
+                get_redis().delete(CREDENTIALS_REDIS_KEY.format(user_id=user_id))
+            elif os.path.exists(self._path(user_id, "credentials")):
+                os.remove(self._path(user_id, "credentials"))
+        except Exception as e:
+            logger.warning(f"Failed to delete Garmin credentials for user {user_id}: {str(e)}")
+
+    def _read(self, user_id: int, kind: str = "token") -> Optional[bytes]:
+        if self.backend == "redis":
+            return get_redis().get(self._redis_key(user_id, kind))
+        path = self._path(user_id, kind)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _write(self, user_id: int, data: bytes, kind: str = "token") -> None:
+        if self.backend == "redis":
+            get_redis().set(self._redis_key(user_id, kind), data, ex=GARMIN_TOKEN_TTL)
+            return
+        os.makedirs(GARMIN_TOKEN_DIR, exist_ok=True)
+        path = self._path(user_id, kind)
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        with atomic_open(path, permissions=0o600) as f:
+            f.write(data)
+
+    def _path(self, user_id: int, kind: str = "token") -> str:
+        return os.path.join(GARMIN_TOKEN_DIR, f"{user_id}.{kind}")
+
+    def _redis_key(self, user_id: int, kind: str) -> str:
+        return (CREDENTIALS_REDIS_KEY if kind == "credentials" else REDIS_KEY).format(user_id=user_id)
+
+def load_token_key() -> Optional[bytes]:
+    """
+    토큰 암호화 키를 GARMIN_TOKEN_KEY 또는 GARMIN_TOKEN_KEY_FILE에서 읽습니다.
+    키를 토큰 옆에 자동 생성하면 저장소 디렉터리만 유출돼도 토큰을 복호화할 수 있으므로 생성하지 않습니다.
+
+    Returns:
+        bytes | None: Fernet 키. 설정되지 않았거나, 키 파일이 GARMIN_TOKEN_DIR 안에 있거나, 형식이 잘못되면 None
+    """
+    if GARMIN_TOKEN_KEY:
+        key = GARMIN_TOKEN_KEY.encode()
+    elif not GARMIN_TOKEN_KEY_FILE:
+        _warn_once(
+            "GARMIN_TOKEN_KEY (or GARMIN_TOKEN_KEY_FILE) is not set; Garmin tokens will not be stored "
+            "and every sync will log in again (see README: Garmin 토큰 암호화 키)"
+        )
+        return None
+    else:
+        key_path = os.path.realpath(GARMIN_TOKEN_KEY_FILE)
+        token_dir = os.path.realpath(GARMIN_TOKEN_DIR)
+        if os.path.commonpath([key_path, token_dir]) == token_dir:
+            _warn_once(f"GARMIN_TOKEN_KEY_FILE must be outside GARMIN_TOKEN_DIR ({token_dir}); Garmin tokens will not be stored")
+            return None
+        try:
+            with open(key_path, "rb") as f:
+                key = f.read().strip()
+        except OSError as e:
+            _warn_once(f"Failed to read GARMIN_TOKEN_KEY_FILE ({str(e)}); Garmin tokens will not be stored")
+            return None
+    try:
+        Fernet(key)
+    except ValueError:
+        _warn_once("GARMIN_TOKEN_KEY is not a valid Fernet key; Garmin tokens will not be stored")
+        return None
+    return key
+
+def _warn_once(message: str) -> None:
+    global _key_warning_logged
+    if not _key_warning_logged:
+        _key_warning_logged = True
+        logger.warning(message)
@@ -0,0 +1,188 @@
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Any, Dict
+import logging
+import os
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.activity import Activity, ActivityBestEffort
+from .best_effort_service import BEST_EFFORT_DISTANCES
+from .data_version import LocalCache, get_data_version
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 대회 기록 예측 설정 ───────────────────
+RACE_PREDICTION_EFFORT_DAYS = int(os.getenv("RACE_PREDICTION_EFFORT_DAYS", "180"))  # VDOT 계산에 쓰는 최근 최고 기록 기간 (일)
+RACE_PREDICTION_VO2MAX_DAYS = int(os.getenv("RACE_PREDICTION_VO2MAX_DAYS", "90"))  # Garmin VO2max 추정치를 찾는 기간 (일)
+RACE_PREDICTION_CACHE_SIZE = int(os.getenv("RACE_PREDICTION_CACHE_SIZE", "1024"))  # 프로세스당 캐시할 사용자 수
+RACE_PREDICTION_CACHE_TTL = int(os.getenv("RACE_PREDICTION_CACHE_TTL", "86400"))  # 예측 캐시 유지 시간 (초)
+
+# 예측할 대회 거리 (미터)
+RACE_DISTANCES = {key: BEST_EFFORT_DISTANCES[key] for key in ("5k", "10k", "half", "full")}
+
+# VDOT 계산에 쓰는 최고 기록 거리 (1k는 무산소 비중이 커서 Daniels 공식이 맞지 않으므로 제외)
+VDOT_EFFORT_KEYS = ("5k", "10k", "half", "full")
+
+# Riegel 공식 지수 (t2 = t1 × (d2 / d1) ^ 1.06)
+RIEGEL_EXPONENT = 1.06
+
+_cache = LocalCache(RACE_PREDICTION_CACHE_SIZE, RACE_PREDICTION_CACHE_TTL)
+
+def vdot_from_performance(distance: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """
+    거리와 기록으로 Daniels-Gilbert VDOT를 계산합니다.
+
+    Args:
+        distance (ndarray): 거리 (미터)
+        seconds (ndarray): 기록 (초)
+
+    Returns:
+        ndarray: VDOT
+    """
+    minutes = np.asarray(seconds, dtype=np.float64) / 60
+    velocity = np.asarray(distance, dtype=np.float64) / minutes  # m/min
+    vo2 = -4.60 + 0.182258 * velocity + 0.000104 * velocity ** 2
+    fraction = 0.8 + 0.1894393 * np.exp(-0.012778 * minutes) + 0.2989558 * np.exp(-0.1932605 * minutes)
+    return vo2 / fraction
+
+def predict_vdot_times(vdot: float, distances: np.ndarray) -> np.ndarray:
+    """
+    VDOT로 각 거리의 예상 기록을 구합니다. (VDOT가 기록에 대해 단조 감소하므로 모든 거리를 한 번에 이분 탐색)
+
+    Args:
+        vdot (float): VDOT
+        distances (ndarray): 거리 (미터)
+
+    Returns:
+        ndarray: 예상 기록 (초)
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    low = np.full(distances.shape, 60.0)  # 1분
+    high = np.full(distances.shape, 60.0 * 60 * 12)  # 12시간
+    for _ in range(50):
+        middle = (low + high) / 2
+        too_fast = vdot_from_performance(distances, middle) > vdot
+        low = np.where(too_fast, middle, low)
+        high = np.where(too_fast, high, middle)
+    return (low + high) / 2
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+class RacePredictionService:
+    """
+    최근 최고 기록과 Garmin VO2max 추정치로 5k/10k/하프/풀 예상 기록을 계산하는 서비스 클래스
+
+    - 최근 최고 기록(best effort)마다 VDOT를 구해 가장 높은 값을 쓰고, 최근 Garmin VO2max가 있으면 두 값의 평균을 씁니다.
+      (훈련 중 구간 기록은 실제 대회보다 느리고 Garmin 추정치는 높게 나오는 경향을 서로 보정)
+    - 각 거리에 가장 가까운 최근 최고 기록으로 Riegel 공식 예측도 함께 제공합니다.
+    결과는 사용자 데이터 버전과 날짜를 키로 프로세스 메모리에 캐시하므로, 새 활동이 들어오기 전까지는 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, db: Session):
+        """
+        RacePredictionService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+        """
+        self.db = db
+
+    def get_predictions(self, user_id: int, today: date = None) -> Dict[str, Any]:
+        """
+        사용자의 대회 거리별 예상 기록을 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            today (date, optional): 기준일 (최근 기록 기간 계산용)
+
+        Returns:
+            dict: 예측 정보
+                - vdot: 예측에 사용한 VDOT. 근거가 없으면 None
+                - sources: {best_effort_vdot, best_effort, garmin_vo2max} 예측 근거
+                - predictions: [{distance_key, distance, predicted_time, predicted_time_text, predicted_pace, vdot_time, riegel_time}]
+        """
+        today = today or date.today()
+        version = get_data_version(user_id)
+        cache_key = (user_id, version, today)
+        if version is not None:
+            cached = _cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        result = self._predict(user_id, today)
+        if version is not None:
+            _cache.put(cache_key, result)
+        return result
+
+    def _predict(self, user_id: int, today: date) -> Dict[str, Any]:
+        since = datetime.combine(today - timedelta(days=RACE_PREDICTION_EFFORT_DAYS), day_time.min)
+        efforts = self.db.query(ActivityBestEffort).filter(
+            ActivityBestEffort.user_id == user_id,
+            ActivityBestEffort.distance_key.in_(VDOT_EFFORT_KEYS),
+            ActivityBestEffort.start_time_local >= since
+        ).all()
+        garmin_vo2max = self.db.query(Activity.vo2max_value).filter(
+            Activity.user_id == user_id,
+            Activity.vo2max_value.isnot(None),
+            Activity.start_time_local >= datetime.combine(today - timedelta(days=RACE_PREDICTION_VO2MAX_DAYS), day_time.min)
+        ).order_by(Activity.start_time_local.desc()).limit(1).scalar()
+
+        best_effort = None
+        best_effort_vdot = None
+        if efforts:
+            vdots = vdot_from_performance([effort.distance for effort in efforts], [effort.elapsed for effort in efforts])
+            best_index = int(np.argmax(vdots))
+            best_effort = efforts[best_index]
+            best_effort_vdot = float(vdots[best_index])
+
+        estimates = [value for value in (best_effort_vdot, garmin_vo2max) if value]
+        vdot = float(np.mean(estimates)) if estimates else None
+
+        distances = np.array(list(RACE_DISTANCES.values()))
+        vdot_times = predict_vdot_times(vdot, distances).tolist() if vdot else [None] * len(distances)
+        riegel_times = self._riegel_times(efforts, distances)
+
+        predictions = []
+        for (distance_key, distance), vdot_time, riegel_time in zip(RACE_DISTANCES.items(), vdot_times, riegel_times):
+            predicted = vdot_time if vdot_time is not None else riegel_time
+            predictions.append({
+                "distance_key": distance_key,
+                "distance": distance,
+                "predicted_time": round(predicted) if predicted is not None else None,
+                "predicted_time_text": format_duration(predicted) if predicted is not None else None,
+                "predicted_pace": round(predicted / distance * 1000, 1) if predicted is not None else None,
+                "vdot_time": round(vdot_time) if vdot_time is not None else None,
+                "riegel_time": round(riegel_time) if riegel_time is not None else None
+            })
+
+        return {
+            "vdot": round(vdot, 1) if vdot else None,
+            "sources": {
+                "best_effort_vdot": round(best_effort_vdot, 1) if best_effort_vdot else None,
+                "best_effort": {
+                    "distance_key": best_effort.distance_key,
+                    "elapsed": round(best_effort.elapsed, 1),
+                    "activity_id": best_effort.activity_id,
+                    "start_time_local": best_effort.start_time_local
+                } if best_effort else None,
+                "garmin_vo2max": garmin_vo2max
+            },
+            "predictions": predictions
+        }
+
+    def _riegel_times(self, efforts: list, distances: np.ndarray) -> list:
+        """
+        거리마다 로그 거리 차이가 가장 작은 최근 최고 기록(같은 거리면 가장 빠른 기록)으로 Riegel 예측을 계산합니다.
+        """
+        if not efforts:
+            return [None] * len(distances)
+        effort_distances = np.array([effort.distance for effort in efforts])
+        effort_times = np.array([effort.elapsed for effort in efforts])
+        # (대회 거리 × 기록) 행렬에서 거리별로 가장 가까운 기록 선택
+        gaps = np.abs(np.log(distances[:, None] / effort_distances[None, :]))
+        closest = np.isclose(gaps, gaps.min(axis=1, keepdims=True))
+        source_times = np.where(closest, effort_times[None, :], np.inf).min(axis=1)
+        source_distances = effort_distances[np.argmin(np.where(closest, effort_times[None, :], np.inf), axis=1)]
+        return (source_times * (distances / source_distances) ** RIEGEL_EXPONENT).tolist()
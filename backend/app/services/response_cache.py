@@ -0,0 +1,163 @@
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.redis_client import get_redis
+from .data_version import LocalCache, get_data_versions
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 응답 캐시 설정 ───────────────────
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))  # Redis에 캐시한 응답 유지 시간 (초)
+RESPONSE_CACHE_LOCAL_SIZE = int(os.getenv("RESPONSE_CACHE_LOCAL_SIZE", "1024"))  # Redis가 없을 때 프로세스당 캐시할 응답 수
+RESPONSE_CACHE_LOCAL_TTL = int(os.getenv("RESPONSE_CACHE_LOCAL_TTL", "60"))  # Redis가 없을 때 응답 유지 시간 (다른 프로세스의 변경은 이 시간 안에 반영)
+RESPONSE_CACHE_COMPRESSION_LEVEL = int(os.getenv("RESPONSE_CACHE_COMPRESSION_LEVEL", "6"))  # zlib 압축 수준 (1~9)
+
+# 캐시 키: 사용자/응답 이름/데이터 버전/요청 파라미터. 데이터가 바뀌면 버전이 달라져 새 키로 조회됨
+RESPONSE_CACHE_KEY = "response_cache:{user_id}:{name}:{versions}:{params}"
+# 응답 이름별 적중/누락 횟수 (해시 필드: "{name}:hits", "{name}:misses")
+RESPONSE_CACHE_METRICS_KEY = "response_cache:metrics"
+
+_local_cache = LocalCache(RESPONSE_CACHE_LOCAL_SIZE, RESPONSE_CACHE_LOCAL_TTL)
+_local_metrics = Counter()
+_local_metrics_lock = threading.Lock()
+
+def encode_body(value: Any) -> bytes:
+    """
+    응답을 FastAPI 기본 JSONResponse와 같은 형식의 JSON 본문으로 직렬화합니다.
+    JSON 기본 타입이 아닌 값(datetime 등)만 jsonable_encoder로 변환하므로, 큰 응답 전체를 한 번 더 순회하지 않습니다.
+    """
+    return json.dumps(value, default=jsonable_encoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def compress_response(body: bytes, headers: Dict[str, str]) -> bytes:
+    # 헤더 JSON에는 줄바꿈이 없으므로 첫 줄바꿈으로 헤더와 본문을 구분
+    return zlib.compress(json.dumps(headers).encode() + b"\n" + body, RESPONSE_CACHE_COMPRESSION_LEVEL)
+
+def decompress_response(payload: bytes) -> Response:
+    headers, body = zlib.decompress(payload).split(b"\n", 1)
+    return Response(content=body, media_type="application/json", headers=json.loads(headers))
+
+class ResponseCache:
+    """
+    조회가 많은 API 응답을 사용자 데이터 버전별로 캐시하는 클래스
+
+    키에 응답이 의존하는 범위(활동/댓글/피드백/일정)의 데이터 버전을 포함하므로,
+    해당 데이터를 바꾸는 쪽에서 bump_data_version을 호출하면 관련 응답만 다음 요청에서 다시 계산됩니다.
+    응답은 압축한 JSON으로 Redis에 저장하고, Redis를 사용할 수 없으면 프로세스 메모리에 짧게 보관합니다.
+    """
+
+    async def get_or_set(
+        self,
+        name: str,
+        user_id: int,
+        scopes: Sequence[str],
+        compute: Callable[[], Awaitable[Any]],
+        params: Dict[str, Any] = None,
+        ttl: Callable[[Any], Optional[float]] = None,
+        headers: Callable[[Any], Dict[str, str]] = None
+    ) -> Response:
+        """
+        캐시된 응답을 반환하고, 없으면 계산해서 저장합니다.
+        적중 시에는 저장된 JSON 본문을 그대로 반환하므로 다시 직렬화하지 않습니다.
+
+        Args:
+            name (str): 응답 이름 (지표 집계 단위)
+            user_id (int): 사용자 ID
+            scopes (Sequence[str]): 응답이 의존하는 데이터 버전 범위
+            compute (Callable): 응답을 계산하는 비동기 함수
+            params (dict, optional): 응답에 영향을 주는 요청 파라미터
+            ttl (Callable, optional): 응답으로 유지 시간(초)을 계산하는 함수. 0 이하이면 저장하지 않음
+            headers (Callable, optional): 응답으로 응답 헤더를 만드는 함수 (본문과 함께 캐시됨)
+
+        Returns:
+            Response: JSON 응답
+        """
+        key, shared, payload = await run_in_threadpool(self._lookup, name, user_id, scopes, params)
+        if payload is not None:
+            return decompress_response(payload)
+
+        # 큰 응답의 직렬화/압축이 이벤트 루프를 막지 않도록 스레드풀에서 실행
+        body, response_headers = await run_in_threadpool(self._encode_and_store, key, shared, await compute(), ttl, headers)
+        return Response(content=body, media_type="application/json", headers=response_headers)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        응답 이름별 캐시 적중/누락 횟수를 조회합니다. (Redis 집계 + Redis를 쓸 수 없던 동안의 프로세스 내 집계)
+
+        Returns:
+            dict: {name: {hits, misses, hit_rate}}
+        """
+        counts = Counter()
+        try:
+            for field, count in get_redis().hgetall(RESPONSE_CACHE_METRICS_KEY).items():
+                counts[field.decode()] += int(count)
+        except Exception as e:
+            logger.warning(f"Response cache metrics unavailable in Redis: {str(e)}")
+        with _local_metrics_lock:
+            counts.update(_local_metrics)
+
+        metrics = {}
+        for field, count in counts.items():
+            name, kind = field.rsplit(":", 1)
+            metrics.setdefault(name, {"hits": 0, "misses": 0})[kind] = count
+        for values in metrics.values():
+            total = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / total, 4) if total else None
+        return metrics
+
+    def _lookup(self, name: str, user_id: int, scopes: Sequence[str], params: Optional[Dict[str, Any]]):
+        versions, shared = get_data_versions(user_id, scopes)
+        key = RESPONSE_CACHE_KEY.format(
+            user_id=user_id,
+            name=name,
+            versions=".".join(map(str, versions)),
+            params=hashlib.sha1(json.dumps(params or {}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        )
+        payload = None
+        if shared:
+            try:
+                payload = get_redis().get(key)
+            except Exception as e:
+                logger.warning(f"Response cache read failed: {str(e)}")
+                shared = False
+        if not shared:
+            payload = _local_cache.get(key)
+        self._record(name, "hits" if payload is not None else "misses", shared)
+        return key, shared, payload
+
+    def _encode_and_store(self, key: str, shared: bool, value: Any, ttl: Optional[Callable], headers: Optional[Callable]):
+        body = encode_body(value)
+        # 헤더/유지 시간 함수에는 응답 본문과 같은 JSON 값을 넘김
+        encoded = json.loads(body) if ttl or headers else None
+        response_headers = headers(encoded) if headers else {}
+        expires_in = ttl(encoded) if ttl else None
+        if expires_in is None or expires_in > 0:
+            self._store(key, shared, compress_response(body, response_headers), expires_in)
+        return body, response_headers
+
+    def _store(self, key: str, shared: bool, payload: bytes, expires_in: Optional[float]) -> None:
+        if shared:
+            try:
+                get_redis().set(key, payload, px=max(1, int((RESPONSE_CACHE_TTL if expires_in is None else expires_in) * 1000)))
+                return
+            except Exception as e:
+                logger.warning(f"Response cache write failed: {str(e)}")
+        _local_cache.put(key, payload, None if expires_in is None else min(expires_in, RESPONSE_CACHE_LOCAL_TTL))
+
+    def _record(self, name: str, kind: str, shared: bool) -> None:
+        if shared:
+            try:
+                get_redis().hincrby(RESPONSE_CACHE_METRICS_KEY, f"{name}:{kind}", 1)
+                return
+            except Exception:
+                pass
+        with _local_metrics_lock:
+            _local_metrics[f"{name}:{kind}"] += 1
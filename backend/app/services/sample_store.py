@@ -0,0 +1,323 @@
+from typing import Dict, Iterable, List, Optional
+import io
+import json
+import logging
+import os
+import shutil
+import numpy as np
+
+from .atomic_file import atomic_open
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 초 단위 샘플 저장소 설정 ───────────────────
+GARMIN_SAMPLES_ENABLED = os.getenv("GARMIN_SAMPLES_ENABLED", "true").lower() == "true"
+GARMIN_SAMPLES_DIR = os.getenv("GARMIN_SAMPLES_DIR", "./activity_samples")
+GARMIN_DETAILS_MAX_CHART = int(os.getenv("GARMIN_DETAILS_MAX_CHART", "100000"))  # get_activity_details 최대 샘플 수 (기본값 2000은 다운샘플링됨)
+GARMIN_SERIES_DIR = os.getenv("GARMIN_SERIES_DIR", "./activity_series")  # 메모리 맵으로 읽을 채널별 비압축 .npy 캐시
+
+# 채널 이름: (get_activity_details 메트릭 키 후보, 저장 배율, 저장 정수 타입)
+# 값은 round(값 * 배율)로 정수화한 뒤 이전 샘플과의 차이(delta)로 저장하므로 압축률이 높음
+CHANNELS = {
+    "time": (("sumDuration",), 1000, np.int32),  # 시작 후 경과 시간 (초, ms 단위로 저장)
+    "timestamp": (("directTimestamp",), 1, np.int64),  # epoch 밀리초
+    "distance": (("sumDistance",), 100, np.int32),  # 누적 거리 (미터, cm 단위로 저장)
+    "hr": (("directHeartRate",), 1, np.int16),  # 심박수 (bpm)
+    "speed": (("directSpeed",), 1000, np.int32),  # 속도 (m/s, mm/s 단위로 저장)
+    "cadence": (("directRunCadence", "directDoubleCadence"), 10, np.int32),  # 케이던스 (spm)
+    "altitude": (("directElevation",), 100, np.int32),  # 고도 (미터, cm 단위로 저장)
+    "lat": (("directLatitude",), 10 ** 7, np.int32),  # 위도 (1e-7도 단위로 저장)
+    "lon": (("directLongitude",), 10 ** 7, np.int32),  # 경도
+    "power": (("directPower",), 1, np.int32),  # 파워 (W)
+}
+
+# 저장하지 않고 다른 채널에서 계산하는 채널
+DERIVED_CHANNELS = {
+    "pace": ("speed",),  # 페이스 (초/km)
+}
+
+# 구간 조회 기준으로 쓸 수 있는 단조 증가 채널 (time: 초, distance: 미터)
+AXIS_CHANNELS = ("time", "distance")
+
+def parse_activity_details(details: dict) -> Dict[str, np.ndarray]:
+    """
+    Garmin get_activity_details 응답을 채널별 float64 배열로 변환합니다.
+    값이 없는 샘플은 NaN입니다.
+
+    Args:
+        details (dict): get_activity_details 응답
+
+    Returns:
+        dict: {채널 이름: 샘플 배열}. 응답에 없는 채널은 제외
+    """
+    descriptors = {descriptor["key"]: descriptor["metricsIndex"] for descriptor in details.get("metricDescriptors") or []}
+    rows = [sample.get("metrics") or [] for sample in details.get("activityDetailMetrics") or []]
+    if not rows or not descriptors:
+        return {}
+
+    width = max(descriptors.values()) + 1
+    matrix = np.full((len(rows), width), np.nan)
+    for row_index, metrics in enumerate(rows):
+        values = [np.nan if value is None else value for value in metrics[:width]]
+        matrix[row_index, :len(values)] = values
+
+    columns = {}
+    for channel, (keys, _, _) in CHANNELS.items():
+        for key in keys:
+            if key in descriptors:
+                columns[channel] = matrix[:, descriptors[key]]
+                break
+    return columns
+
+class SampleStore:
+    """
+    활동별 초 단위 샘플(심박, 속도, 케이던스, 고도, GPS 등)을 압축된 열 형식으로 저장하는 클래스
+
+    활동 하나당 .npz 파일 하나를 만들며, 각 채널은 정수화 + delta 인코딩된 배열로 저장됩니다.
+    .npz는 채널별로 따로 압축되어 있으므로 요청한 채널만 읽어 복원합니다.
+    """
+
+    def __init__(self, root: str = GARMIN_SAMPLES_DIR):
+        """
+        SampleStore 초기화
+
+        Args:
+            root (str): 저장 디렉토리
+        """
+        self.root = root
+
+    def path(self, user_id: int, activity_id: int) -> str:
+        return os.path.join(self.root, str(user_id), f"{activity_id}.npz")
+
+    def exists(self, user_id: int, activity_id: int) -> bool:
+        return os.path.exists(self.path(user_id, activity_id))
+
+    def save(self, user_id: int, activity_id: int, columns: Dict[str, np.ndarray]) -> Optional[int]:
+        """
+        채널별 샘플을 인코딩해 저장합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            columns (dict): {채널 이름: float 배열}. NaN은 결측값
+
+        Returns:
+            int | None: 저장한 샘플 수. 저장할 샘플이 없으면 None
+        """
+        if not columns:
+            return None
+        arrays = {}
+        for channel, values in columns.items():
+            if channel not in CHANNELS:
+                continue
+            _, scale, dtype = CHANNELS[channel]
+            values = np.asarray(values, dtype=np.float64)
+            missing = np.isnan(values)
+            if missing.all():
+                continue
+            # 결측값은 앞 값으로 채워 delta가 0이 되도록 하고, 위치는 비트마스크로 따로 저장
+            filled = values * scale
+            if missing.any():
+                filled = _forward_fill(filled)
+                arrays[f"{channel}__missing"] = np.packbits(missing)
+            quantized = np.round(filled).astype(np.int64)
+            arrays[channel] = np.diff(quantized, prepend=0).astype(dtype)
+        if not arrays:
+            return None
+
+        length = len(next(iter(columns.values())))
+        arrays["__length"] = np.array([length], dtype=np.int64)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+
+        path = self.path(user_id, activity_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        with atomic_open(path) as f:
+            f.write(buffer.getvalue())
+        return length
+
+    def load(self, user_id: int, activity_id: int, channels: Iterable[str] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        요청한 채널만 읽어 float64 배열로 복원합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            channels (iterable, optional): 채널 이름 목록. None이면 저장된 모든 채널
+
+        Returns:
+            dict | None: {채널 이름: 샘플 배열}. 저장된 샘플이 없으면 None.
+            저장되지 않은 채널은 결과에서 제외됩니다.
+        """
+        path = self.path(user_id, activity_id)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            stored = [name for name in data.files if not name.startswith("__") and "__" not in name]
+            requested = stored if channels is None else list(channels)
+            result = {}
+            for channel in requested:
+                if channel in DERIVED_CHANNELS:
+                    sources = self._decode_many(data, DERIVED_CHANNELS[channel])
+                    if sources is not None:
+                        result[channel] = _derive(channel, sources)
+                elif channel in stored:
+                    result[channel] = self._decode(data, channel)
+            return result
+
+    def delete(self, user_id: int, activity_id: int) -> None:
+        path = self.path(user_id, activity_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _decode_many(self, data, channels: Iterable[str]) -> Optional[List[np.ndarray]]:
+        if not all(channel in data.files for channel in channels):
+            return None
+        return [self._decode(data, channel) for channel in channels]
+
+    def _decode(self, data, channel: str) -> np.ndarray:
+        _, scale, _ = CHANNELS[channel]
+        values = np.cumsum(data[channel], dtype=np.int64) / scale
+        missing_key = f"{channel}__missing"
+        if missing_key in data.files:
+            missing = np.unpackbits(data[missing_key], count=len(values)).astype(bool)
+            values[missing] = np.nan
+        return values
+
+class SeriesReader:
+    """
+    SampleStore의 샘플을 채널별 비압축 .npy 파일로 풀어 두고 메모리 맵으로 읽는 클래스
+
+    첫 조회 시 .npz를 한 번 풀어 {GARMIN_SERIES_DIR}/{user_id}/{activity_id}/{채널}.npy로 저장하고,
+    이후에는 np.load(mmap_mode="r")로 열어 시간/거리 구간의 슬라이스(view)만 반환합니다.
+    활동 전체를 메모리에 올리거나 복사하지 않으므로 마라톤(약 15k 샘플)도 필요한 구간만 페이지 단위로 읽힙니다.
+    .npz가 다시 저장되면(재동기화/재처리) 수정 시각을 비교해 캐시를 다시 만듭니다.
+    """
+
+    def __init__(self, store: SampleStore = None, root: str = GARMIN_SERIES_DIR):
+        """
+        SeriesReader 초기화
+
+        Args:
+            store (SampleStore, optional): 원본 샘플 저장소
+            root (str): 채널별 캐시 디렉토리
+        """
+        self.store = store or SampleStore()
+        self.root = root
+
+    def directory(self, user_id: int, activity_id: int) -> str:
+        return os.path.join(self.root, str(user_id), str(activity_id))
+
+    def open(self, user_id: int, activity_id: int, channels: Iterable[str] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        요청한 채널을 읽기 전용 메모리 맵 배열로 엽니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            channels (iterable, optional): 채널 이름 목록 (파생 채널 포함). None이면 캐시된 모든 채널
+
+        Returns:
+            dict | None: {채널 이름: np.memmap}. 저장된 샘플이 없으면 None.
+            저장되지 않은 채널은 결과에서 제외됩니다.
+        """
+        manifest = self._ensure_materialized(user_id, activity_id)
+        if manifest is None:
+            return None
+        directory = self.directory(user_id, activity_id)
+        requested = manifest if channels is None else [channel for channel in channels if channel in manifest]
+        return {channel: np.load(os.path.join(directory, f"{channel}.npy"), mmap_mode="r") for channel in requested}
+
+    def slice(
+        self,
+        user_id: int,
+        activity_id: int,
+        channels: Iterable[str] = None,
+        axis: str = "time",
+        start: float = None,
+        end: float = None,
+        step: int = 1
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        시간 또는 거리 구간의 샘플을 복사 없이 view로 반환합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            activity_id (int): Garmin 활동 ID
+            channels (iterable, optional): 채널 이름 목록. None이면 캐시된 모든 채널
+            axis (str): 구간 기준 채널 (time: 경과 초, distance: 미터). 결과에 항상 포함
+            start (float, optional): 구간 시작 (포함)
+            end (float, optional): 구간 끝 (포함)
+            step (int): n개 샘플마다 하나씩 반환 (차트 다운샘플링, 1이면 전체)
+
+        Returns:
+            dict | None: {채널 이름: 구간 view}. 저장된 샘플이 없으면 None.
+            기준 채널이 저장되어 있지 않으면 ValueError
+        """
+        if axis not in AXIS_CHANNELS:
+            raise ValueError(f"Unknown axis: {axis}")
+        requested = None if channels is None else [axis] + [channel for channel in channels if channel != axis]
+        series = self.open(user_id, activity_id, requested)
+        if series is None:
+            return None
+        if axis not in series:
+            raise ValueError(f"Activity has no {axis} samples")
+
+        # 기준 채널은 정렬되어 있으므로 이진 탐색으로 구간 경계만 찾음
+        values = series[axis]
+        lo = 0 if start is None else int(np.searchsorted(values, start, side="left"))
+        hi = len(values) if end is None else int(np.searchsorted(values, end, side="right"))
+        return {channel: array[lo:hi:step] for channel, array in series.items()}
+
+    def delete(self, user_id: int, activity_id: int) -> None:
+        shutil.rmtree(self.directory(user_id, activity_id), ignore_errors=True)
+
+    def _ensure_materialized(self, user_id: int, activity_id: int) -> Optional[List[str]]:
+        """
+        채널별 캐시가 없거나 원본보다 오래되었으면 원본 .npz를 풀어 다시 만들고, 캐시된 채널 목록을 반환합니다.
+        """
+        source = self.store.path(user_id, activity_id)
+        if not os.path.exists(source):
+            return None
+        directory = self.directory(user_id, activity_id)
+        manifest_path = os.path.join(directory, "channels.json")
+        if os.path.exists(manifest_path) and os.path.getmtime(manifest_path) >= os.path.getmtime(source):
+            with open(manifest_path) as f:
+                return json.load(f)
+
+        columns = self.store.load(user_id, activity_id, available_channels())
+        if columns is None:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        for channel, values in columns.items():
+            if channel in AXIS_CHANNELS:
+                # 구간 검색을 위해 기준 채널의 결측값은 앞 값으로 채움
+                values = _forward_fill(values)
+            # 이미 열린 메모리 맵이 깨지지 않도록 새 파일에 쓴 뒤 교체
+            path = os.path.join(directory, f"{channel}.npy")
+            with atomic_open(path) as f:
+                np.save(f, np.ascontiguousarray(values))
+        # 채널 파일을 모두 쓴 뒤 목록을 마지막에 교체하므로, 목록이 있으면 캐시가 완성된 것
+        with atomic_open(manifest_path, "w") as f:
+            json.dump(list(columns), f)
+        return list(columns)
+
+def available_channels() -> List[str]:
+    return list(CHANNELS) + list(DERIVED_CHANNELS)
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    # 앞쪽 결측값은 첫 유효값으로 채움
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(index, out=index)
+    filled = values[index]
+    filled[:np.argmax(valid)] = values[np.argmax(valid)]
+    return filled
+
+def _derive(channel: str, sources: List[np.ndarray]) -> np.ndarray:
+    if channel == "pace":
+        (speed,) = sources
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(speed > 0, 1000.0 / speed, np.nan)
+    raise ValueError(f"Unknown derived channel: {channel}")
@@ -4,9 +4,11 @@ import logging
 import aiohttp
 import json
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc
 
 from ..models.schedule import TrainingSchedule
+from .data_version import SCHEDULES, bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +85,7 @@ class ScheduleService:
                             saved_schedules.append(db_schedule)
                         
                         self.db.commit()
+                        bump_data_version(user_id, SCHEDULES)
                         
                         # 저장된 일정 반환
                         return [schedule.to_dict() for schedule in saved_schedules]
@@ -197,6 +200,7 @@ class ScheduleService:
             
             self.db.delete(schedule)
             self.db.commit()
+            bump_data_version(user_id, SCHEDULES)
             
             return schedule.to_dict()
         
@@ -235,6 +239,7 @@ class ScheduleService:
                 setattr(schedule, key, value)
             
             self.db.commit()
+            bump_data_version(user_id, SCHEDULES)
             self.db.refresh(schedule)
             
             logger.info(f"수정된 일정: {schedule.to_dict()}")
@@ -265,4 +270,28 @@ class ScheduleService:
         except Exception as e:
             logger.error(f"다가오는 최근 일정 조회 중 오류 발생: {str(e)}")
             raise
-    
\ No newline at end of file
+
+
+class AsyncScheduleService:
+    """
+    ScheduleService의 비동기 버전 (조회 전용)
+    
+    AsyncSession.run_sync를 통해 ScheduleService의 동기 조회 로직을 재사용합니다.
+    run_sync의 함수는 이벤트 루프 스레드에서 실행되므로, 캐시 무효화(Redis)가 따르는 수정/삭제는
+    def 라우트에서 ScheduleService로 실행합니다.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(lambda session: getattr(ScheduleService(session), method)(*args, **kwargs))
+
+    async def get_user_schedules(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await self._run("get_user_schedules", *args, **kwargs)
+
+    async def get_schedule_by_id(self, schedule_id: int, user_id: int) -> Dict[str, Any]:
+        return await self._run("get_schedule_by_id", schedule_id, user_id)
+
+    async def get_upcoming_schedule(self, user_id: int) -> Dict[str, Any]:
+        return await self._run("get_upcoming_schedule", user_id)
@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from ..database import DB_YIELD_PER, upsert
+from ..models.activity import Activity
+from ..models.stats import UserDailyStats, UserWeeklyStats, UserMonthlyStats
+
+logger = logging.getLogger(__name__)
+
+def _day_key(start_time: datetime):
+    return start_time.date()
+
+def _week_key(start_time: datetime):
+    # 주 단위 버킷은 해당 주의 월요일 날짜로 표현
+    day = start_time.date()
+    return day - timedelta(days=day.weekday())
+
+def _month_key(start_time: datetime):
+    return start_time.strftime('%Y-%m')
+
+# (롤업 모델, 버킷 키 함수)
+ROLLUPS = (
+    (UserDailyStats, _day_key),
+    (UserWeeklyStats, _week_key),
+    (UserMonthlyStats, _month_key),
+)
+
+class StatsService:
+    """
+    사용자별 일/주/월 활동 통계 롤업 테이블을 관리하는 서비스 클래스
+
+    활동이 추가/삭제될 때 같은 트랜잭션 안에서 롤업을 증감시키며,
+    요약 조회는 원본 activities 대신 롤업 버킷만 읽습니다.
+    이 클래스의 쓰기 메서드는 commit 하지 않으므로 호출한 쪽에서 commit 해야 합니다.
+    """
+
+    def __init__(self, db: Session):
+        """
+        StatsService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+        """
+        self.db = db
+
+    def apply_activities(self, activities: Iterable[Any], sign: int = 1) -> None:
+        """
+        활동 목록을 롤업 테이블에 반영합니다.
+
+        Args:
+            activities: user_id, start_time_local, distance, duration 속성을 가진 객체 목록
+            sign (int): 1이면 추가, -1이면 삭제 반영
+        """
+        deltas = self._collect_deltas(activities, sign)
+        for model, _ in ROLLUPS:
+            rows = [
+                {"user_id": user_id, "period": period, "activity_count": count, "total_distance": distance, "total_duration": duration}
+                for (delta_model, user_id, period), (count, distance, duration) in deltas.items()
+                if delta_model is model
+            ]
+            if not rows:
+                continue
+            # 버킷마다 읽고 쓰지 않고 INSERT ... ON CONFLICT로 기존 값에 더함 (동시 동기화에도 갱신이 유실되지 않음)
+            self.db.execute(
+                upsert(self.db, model, ["user_id", "period"], [], ["activity_count", "total_distance", "total_duration"]),
+                rows
+            )
+            # 활동이 모두 삭제된 버킷 정리
+            self.db.query(model).filter(
+                model.user_id.in_({row["user_id"] for row in rows}),
+                model.activity_count <= 0
+            ).delete(synchronize_session=False)
+
+    def remove_activities(self, activities: Iterable[Any]) -> None:
+        """
+        삭제되는 활동 목록을 롤업 테이블에서 차감합니다.
+
+        Args:
+            activities: 삭제할 활동 목록
+        """
+        self.apply_activities(activities, sign=-1)
+
+    def rebuild(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        원본 activities 데이터로부터 롤업 테이블을 다시 계산합니다.
+        롤업이 원본과 어긋난 경우 이 메서드로 정합성을 맞춥니다.
+
+        Args:
+            user_id (int, optional): 특정 사용자만 재계산. None이면 전체 사용자
+
+        Returns:
+            dict: 재계산 결과
+                - users: 재계산된 사용자 수
+                - activities: 반영된 활동 수
+        """
+        try:
+            for model, _ in ROLLUPS:
+                query = self.db.query(model)
+                if user_id is not None:
+                    query = query.filter(model.user_id == user_id)
+                query.delete(synchronize_session=False)
+
+            query = self.db.query(
+                Activity.user_id,
+                Activity.start_time_local,
+                Activity.distance,
+                Activity.duration
+            )
+            if user_id is not None:
+                query = query.filter(Activity.user_id == user_id)
+
+            # 서버 사이드 커서로 나누어 읽어 전체 이력을 메모리에 올리지 않음
+            users = set()
+            activity_count = 0
+            deltas = {}
+            for activity in query.execution_options(yield_per=DB_YIELD_PER):
+                users.add(activity.user_id)
+                activity_count += 1
+                self._collect_deltas([activity], 1, deltas)
+            for (model, row_user_id, period), (count, distance, duration) in deltas.items():
+                self.db.add(model(
+                    user_id=row_user_id,
+                    period=period,
+                    activity_count=count,
+                    total_distance=distance,
+                    total_duration=duration
+                ))
+            self.db.commit()
+
+            logger.info(f"Rebuilt activity rollups for {len(users)} users ({activity_count} activities)")
+            return {"users": len(users), "activities": activity_count}
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding activity rollups: {str(e)}")
+            raise
+
+    def is_empty(self) -> bool:
+        """
+        롤업 테이블이 비어 있는데 원본 활동은 존재하는지 확인합니다.
+
+        Returns:
+            bool: 롤업 재계산이 필요한 경우 True
+        """
+        has_rollups = self.db.query(UserMonthlyStats.id).first() is not None
+        has_activities = self.db.query(Activity.id).first() is not None
+        return has_activities and not has_rollups
+
+    def get_totals(self, user_id: int) -> Tuple[int, float, float]:
+        """
+        사용자의 전체 누적 통계를 월별 롤업에서 계산합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+
+        Returns:
+            tuple: (활동 수, 총 거리(미터), 총 소요 시간(초))
+        """
+        return self.db.query(
+            func.coalesce(func.sum(UserMonthlyStats.activity_count), 0),
+            func.coalesce(func.sum(UserMonthlyStats.total_distance), 0),
+            func.coalesce(func.sum(UserMonthlyStats.total_duration), 0)
+        ).filter(UserMonthlyStats.user_id == user_id).one()
+
+    def get_monthly_stats(self, user_id: int) -> List[UserMonthlyStats]:
+        """
+        사용자의 월별 롤업을 월 순서대로 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+        """
+        return self.db.query(UserMonthlyStats).filter(
+            UserMonthlyStats.user_id == user_id
+        ).order_by(UserMonthlyStats.period).all()
+
+    def get_weekly_stats(self, user_id: int, start_date=None, end_date=None) -> List[UserWeeklyStats]:
+        """
+        사용자의 주별 롤업을 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작 주
+            end_date (date, optional): 조회 종료 주
+        """
+        return self._query_range(UserWeeklyStats, user_id, start_date, end_date)
+
+    def get_daily_stats(self, user_id: int, start_date=None, end_date=None) -> List[UserDailyStats]:
+        """
+        사용자의 일별 롤업을 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일
+            end_date (date, optional): 조회 종료일
+        """
+        return self._query_range(UserDailyStats, user_id, start_date, end_date)
+
+    def _query_range(self, model, user_id: int, start_date, end_date):
+        query = self.db.query(model).filter(model.user_id == user_id)
+        if start_date is not None:
+            query = query.filter(model.period >= start_date)
+        if end_date is not None:
+            query = query.filter(model.period <= end_date)
+        return query.order_by(model.period).all()
+
+    def _collect_deltas(self, activities: Iterable[Any], sign: int, deltas: Dict[tuple, list] = None) -> Dict[tuple, list]:
+        """
+        활동 목록을 (롤업 모델, 사용자, 버킷) 단위의 증감값으로 합산합니다.
+
+        Args:
+            activities: 반영할 활동 목록
+            sign (int): 1 또는 -1
+            deltas (dict, optional): 누적할 기존 증감값
+
+        Returns:
+            dict: {(model, user_id, period): [count, distance, duration]}
+        """
+        if deltas is None:
+            deltas = {}
+        for activity in activities:
+            start_time = activity.start_time_local
+            if isinstance(start_time, str):
+                start_time = datetime.fromisoformat(start_time)
+            if start_time is None:
+                continue
+            for model, key_func in ROLLUPS:
+                delta = deltas.setdefault((model, activity.user_id, key_func(start_time)), [0, 0.0, 0.0])
+                delta[0] += sign
+                delta[1] += sign * (activity.distance or 0)
+                delta[2] += sign * (activity.duration or 0)
+        return deltas
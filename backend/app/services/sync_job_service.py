@@ -0,0 +1,134 @@
+from typing import Dict, Any, Optional
+from celery.result import AsyncResult
+from fastapi import HTTPException
+from redis.exceptions import WatchError
+import logging
+import os
+import uuid
+
+from app.redis_client import get_redis
+from app.services.garmin_token_store import GarminTokenStore
+from tasks.celery_app import celery_app
+from tasks.garmin_sync import SYNC_LOCK_KEY, release_sync_lock, sync_garmin_activities
+
+logger = logging.getLogger(__name__)
+
+# 동기화 잠금 유지 시간 (초). 워커가 비정상 종료되어도 이 시간이 지나면 다시 동기화 가능
+GARMIN_SYNC_LOCK_TTL = int(os.getenv("GARMIN_SYNC_LOCK_TTL", "3600"))
+
+class SyncJobService:
+    """
+    Garmin 동기화 백그라운드 작업(Celery)을 등록하고 상태를 조회하는 서비스 클래스
+    
+    사용자별로 진행 중인 동기화는 하나만 유지하며,
+    이미 진행 중이면 새 작업 대신 기존 작업 ID를 반환합니다.
+    요청으로 받은 로그인 정보는 암호화된 토큰 저장소에 보관하고, 작업 인자에는 사용자 ID만 넣습니다.
+    (브로커 메시지와 결과 저장소에 비밀번호가 평문으로 남지 않도록 함)
+    """
+
+    def start_sync(self, user_id: int, garmin_email: str = None, garmin_password: str = None, countdown: float = 0) -> Dict[str, Any]:
+        """
+        사용자의 Garmin 동기화 작업을 큐에 등록합니다.
+        
+        Args:
+            user_id (int): 사용자 ID
+            garmin_email (str, optional): Garmin Connect 이메일
+            garmin_password (str, optional): Garmin Connect 비밀번호
+            countdown (float): 작업 시작까지 지연 시간 (초)
+            
+        Returns:
+            dict: 작업 정보
+                - job_id: 작업 ID
+                - status: 작업 상태
+                - deduplicated: 이미 진행 중인 작업을 반환한 경우 True
+                
+        Raises:
+            HTTPException: 작업 큐(Redis)에 연결할 수 없는 경우
+        """
+        client = get_redis()
+        key = SYNC_LOCK_KEY.format(user_id=user_id)
+        job_id = str(uuid.uuid4())
+        lock_ttl = GARMIN_SYNC_LOCK_TTL + int(countdown)
+        try:
+            existing_id = self._acquire_lock(client, key, job_id, lock_ttl)
+        except Exception as e:
+            logger.error(f"Failed to take the Garmin sync lock for user {user_id}: {str(e)}")
+            raise HTTPException(status_code=503, detail="Sync queue is unavailable")
+        if existing_id is not None:
+            # 잠금은 진행 중인 다른 작업의 것이므로, 조회가 실패해도 지우지 않음
+            logger.info(f"Garmin sync already in progress for user {user_id}: {existing_id}")
+            return {**self.get_job(existing_id), "deduplicated": True}
+
+        try:
+            if garmin_email and garmin_password and not GarminTokenStore().save_credentials(user_id, garmin_email, garmin_password):
+                logger.warning(f"Garmin credentials for user {user_id} were not stored, the sync will use the connected account")
+            sync_garmin_activities.apply_async(args=[user_id], task_id=job_id, countdown=countdown)
+        except Exception as e:
+            logger.error(f"Failed to enqueue Garmin sync for user {user_id}: {str(e)}")
+            self._release_lock(user_id, job_id)
+            raise HTTPException(status_code=503, detail="Sync queue is unavailable")
+
+        logger.info(f"Queued Garmin sync for user {user_id}: {job_id}")
+        return {"job_id": job_id, "status": "pending", "deduplicated": False}
+
+    def _acquire_lock(self, client, key: str, job_id: str, lock_ttl: int) -> Optional[str]:
+        """
+        사용자의 동기화 잠금을 잡습니다. 남아 있는 잠금의 작업이 이미 끝났으면 WATCH/MULTI로 원자적으로 넘겨받습니다.
+
+        Returns:
+            str | None: 진행 중인 다른 작업이 있으면 그 작업 ID, 잠금을 잡았으면 None
+        """
+        if client.set(key, job_id, nx=True, ex=lock_ttl):
+            return None
+        with client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    existing_id = pipe.get(key)
+                    if existing_id is not None and not AsyncResult(existing_id.decode(), app=celery_app).ready():
+                        pipe.unwatch()
+                        return existing_id.decode()
+                    # 잠금이 만료됐거나 종료된 작업의 잠금이 남아 있는 경우.
+                    # 확인한 뒤 다른 요청이 먼저 잠금을 바꿨으면 WatchError로 다시 확인
+                    pipe.multi()
+                    pipe.set(key, job_id, ex=lock_ttl)
+                    pipe.execute()
+                    return None
+                except WatchError:
+                    continue
+
+    def _release_lock(self, user_id: int, job_id: str) -> None:
+        """
+        등록에 실패한 작업의 잠금을 해제합니다. 그사이 다른 작업이 잠금을 넘겨받았으면 그대로 둡니다. (비교 후 삭제)
+        Redis 자체가 응답하지 않는 경우에도 호출한 쪽이 503을 반환할 수 있도록 오류는 로그만 남깁니다.
+        (남은 잠금은 GARMIN_SYNC_LOCK_TTL이 지나거나, 다음 요청이 작업 종료를 확인하면 넘겨받음)
+        """
+        try:
+            release_sync_lock(user_id, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to release the Garmin sync lock for user {user_id}: {str(e)}")
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        동기화 작업의 상태와 진행 상황을 조회합니다.
+        
+        Args:
+            job_id (str): 작업 ID
+            
+        Returns:
+            dict: 작업 상태
+                - job_id: 작업 ID
+                - status: pending, started, progress, retry, success, failure 중 하나
+                - progress: 진행 중인 단계 정보 (progress 상태일 때)
+                - result: 동기화 결과 (success 상태일 때)
+                - error: 오류 메시지 (retry, failure 상태일 때)
+        """
+        result = AsyncResult(job_id, app=celery_app)
+        job = {"job_id": job_id, "status": result.state.lower()}
+        if result.state == "PROGRESS":
+            job["progress"] = result.info
+        elif result.state == "SUCCESS":
+            job["result"] = result.result
+        elif result.state in ("FAILURE", "RETRY"):
+            job["error"] = str(result.info)
+        return job
@@ -0,0 +1,403 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+import os
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from fastapi import HTTPException
+
+from ..models.activity import Activity
+from ..models.stats import UserTrainingLoad
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 훈련 부하(CTL/ATL/TSB) 설정 ───────────────────
+TRAINING_LOAD_CTL_DAYS = float(os.getenv("TRAINING_LOAD_CTL_DAYS", "42"))  # 체력(CTL) 시간 상수 (일)
+TRAINING_LOAD_ATL_DAYS = float(os.getenv("TRAINING_LOAD_ATL_DAYS", "7"))  # 피로(ATL) 시간 상수 (일)
+TRAINING_LOAD_REST_HR = float(os.getenv("TRAINING_LOAD_REST_HR", "60"))  # 평균 심박 TRIMP에 쓰는 안정시 심박수
+TRAINING_LOAD_THRESHOLD_HR_RATIO = float(os.getenv("TRAINING_LOAD_THRESHOLD_HR_RATIO", "0.9"))  # 역치 심박 / 최대 심박
+TRAINING_LOAD_MAX_HR_PERCENTILE = float(os.getenv("TRAINING_LOAD_MAX_HR_PERCENTILE", "95"))  # 나이가 없을 때 활동별 최대 심박에서 쓰는 백분위
+TRAINING_LOAD_MAX_HR_LIMIT = float(os.getenv("TRAINING_LOAD_MAX_HR_LIMIT", "220"))  # 이보다 큰 활동 최대 심박은 센서 오류로 보고 제외
+TRAINING_LOAD_GARMIN_SCALE = float(os.getenv("TRAINING_LOAD_GARMIN_SCALE", "1.0"))  # 보정할 활동이 부족할 때 Garmin Training Load에 곱하는 배율
+TRAINING_LOAD_CALIBRATION_ACTIVITIES = int(os.getenv("TRAINING_LOAD_CALIBRATION_ACTIVITIES", "5"))  # Garmin 배율 보정에 필요한 최소 활동 수
+
+# 최대 심박수를 알 수 없을 때 (나이도, 기록된 max_hr도 없는 경우) 사용하는 값
+DEFAULT_MAX_HR = 190
+
+# 조회 기간을 지정하지 않았을 때 반환하는 일수
+DEFAULT_DAYS = 90
+
+# 심박 영역별 가중치 (Edwards TRIMP = Σ 영역 번호 × 영역 시간(분))
+ZONE_KEYS = [f"zone_{zone}" for zone in range(1, 6)]
+ZONE_WEIGHTS = np.arange(1, 6, dtype=np.float64)
+
+# 공통 척도의 기준: 역치 심박으로 1시간 달린 부하 = 100 (hrTSS와 같은 기준)
+THRESHOLD_HOUR_LOAD = 100.0
+# 역치 심박(영역 4)으로 1시간 달린 Edwards TRIMP
+EDWARDS_THRESHOLD_HOUR = 4 * 60.0
+
+def banister_trimp(duration, average_hr, max_hr: float, rest_hr: float = TRAINING_LOAD_REST_HR):
+    """
+    평균 심박과 시간으로 Banister TRIMP를 계산합니다. (시간(분) × 심박 예비율 × 0.64 × e^(1.92 × 심박 예비율))
+    """
+    reserve = np.clip((average_hr - rest_hr) / max(max_hr - rest_hr, 1), 0, 1)
+    return duration / 60 * reserve * 0.64 * np.exp(1.92 * reserve)
+
+def compute_activity_loads(
+    training_load: np.ndarray,
+    zone_seconds: np.ndarray,
+    average_hr: np.ndarray,
+    duration: np.ndarray,
+    max_hr: float,
+    garmin_scale: float = TRAINING_LOAD_GARMIN_SCALE,
+    rest_hr: float = TRAINING_LOAD_REST_HR
+) -> np.ndarray:
+    """
+    활동별 훈련 부하를 한 번에 계산합니다.
+    Garmin Training Load가 있으면 그것을, 없으면 심박 영역 시간(Edwards TRIMP),
+    그것도 없으면 평균 심박과 시간(Banister TRIMP)을 쓰고,
+    세 방식 모두 역치 심박으로 1시간 달린 부하가 100인 공통 척도로 바꿔 한 시계열에서 섞일 수 있게 합니다.
+
+    Args:
+        training_load (ndarray): activity_training_load (없으면 NaN)
+        zone_seconds (ndarray): (활동 수, 5) 심박 영역별 시간 (초)
+        average_hr (ndarray): 평균 심박수 (없으면 NaN)
+        duration (ndarray): 활동 시간 (초)
+        max_hr (float): 최대 심박수
+        garmin_scale (float): Garmin Training Load를 공통 척도로 바꾸는 배율 (estimate_garmin_scale 참고)
+        rest_hr (float): 안정시 심박수
+
+    Returns:
+        ndarray: 활동별 부하. 계산할 수 없으면 0
+    """
+    garmin = training_load * garmin_scale
+    edwards = np.nan_to_num(zone_seconds) @ ZONE_WEIGHTS / 60 * (THRESHOLD_HOUR_LOAD / EDWARDS_THRESHOLD_HOUR)
+    banister = _normalized_banister(duration, average_hr, max_hr, rest_hr)
+    loads = np.where(training_load > 0, garmin, np.where(edwards > 0, edwards, banister))
+    return np.nan_to_num(loads)
+
+def estimate_garmin_scale(
+    training_load: np.ndarray,
+    average_hr: np.ndarray,
+    duration: np.ndarray,
+    max_hr: float,
+    rest_hr: float = TRAINING_LOAD_REST_HR
+) -> float:
+    """
+    Garmin Training Load와 평균 심박이 함께 있는 활동들로 Garmin 부하를 공통 척도로 바꾸는 배율을 구합니다.
+    (활동별 공통 척도 Banister 부하 / Garmin 부하의 중앙값. 활동이 부족하면 TRAINING_LOAD_GARMIN_SCALE)
+    """
+    paired = (training_load > 0) & (average_hr > 0) & (duration > 0)
+    if paired.sum() < TRAINING_LOAD_CALIBRATION_ACTIVITIES:
+        return TRAINING_LOAD_GARMIN_SCALE
+    ratios = _normalized_banister(duration[paired], average_hr[paired], max_hr, rest_hr) / training_load[paired]
+    return float(np.median(ratios))
+
+def _normalized_banister(duration, average_hr, max_hr: float, rest_hr: float):
+    threshold_hour = banister_trimp(3600.0, max_hr * TRAINING_LOAD_THRESHOLD_HR_RATIO, max_hr, rest_hr)
+    return banister_trimp(duration, average_hr, max_hr, rest_hr) * (THRESHOLD_HOUR_LOAD / max(threshold_hour, 1e-9))
+
+def exponential_average(loads: np.ndarray, initial: float, days: float) -> np.ndarray:
+    """
+    일별 부하의 지수 이동 평균을 계산합니다. (y[t] = y[t-1] + (x[t] - y[t-1]) × (1 - e^(-1/days)))
+
+    Args:
+        loads (ndarray): 일별 부하
+        initial (float): 첫날 전날의 값 (증분 계산 시 마지막 저장값)
+        days (float): 시간 상수 (일)
+
+    Returns:
+        ndarray: loads와 같은 길이의 이동 평균
+    """
+    alpha = 1 - np.exp(-1 / days)
+    series = pd.Series(np.concatenate(([initial], loads)))
+    return series.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+class TrainingLoadService:
+    """
+    사용자별 일별 훈련 부하와 체력(CTL)/피로(ATL)/컨디션(TSB)을 계산해 user_training_load 테이블에 저장하는 서비스 클래스
+
+    - 하루 단위로 활동 부하를 합산하고 쉬는 날은 부하 0으로 채운 뒤, 전체 기간을 pandas로 한 번에 계산합니다.
+    - 동기화/활동 추가/삭제 시에는 바뀐 날짜부터 오늘까지만 이전 날의 CTL/ATL에 이어서 다시 계산합니다.
+    이 클래스의 쓰기 메서드 중 update는 commit 하지 않으므로 호출한 쪽에서 commit 해야 합니다.
+    """
+
+    def __init__(self, db: Session):
+        """
+        TrainingLoadService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+        """
+        self.db = db
+
+    def update(self, user_id: int, since: date = None, today: date = None) -> int:
+        """
+        since 이후(저장된 마지막 날 다음 날이 더 이르면 그날부터) 오늘까지의 부하와 CTL/ATL/TSB를 다시 계산해 저장합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            since (date, optional): 활동이 추가/삭제된 가장 이른 날짜. None이면 저장된 마지막 날 이후만 추가
+            today (date, optional): 계산할 마지막 날짜
+
+        Returns:
+            int: 저장한 일수
+        """
+        today = today or date.today()
+        # 세션이 autoflush=False이므로 같은 트랜잭션에서 추가/삭제한 활동이 조회되도록 먼저 flush
+        self.db.flush()
+        max_hr, garmin_scale, created = self._load_profile(user_id)
+        # 최대 심박/배율을 새로 정했으면 이전 값으로 저장된 날들과 척도가 다르므로 전체 계산
+        last_period = None if created else self.db.query(
+            func.max(UserTrainingLoad.period)
+        ).filter(UserTrainingLoad.user_id == user_id).scalar()
+        if last_period is not None:
+            start = last_period + timedelta(days=1)
+            if since is not None:
+                start = min(start, since)
+        else:
+            # 저장된 값이 없으면 첫 활동부터 전체 계산
+            first_start = self.db.query(func.min(Activity.start_time_local)).filter(Activity.user_id == user_id).scalar()
+            if first_start is None:
+                return 0
+            start = _to_datetime(first_start).date()
+
+        activities = self.db.query(
+            Activity.start_time_local,
+            Activity.duration,
+            Activity.average_hr,
+            Activity.activity_training_load,
+            Activity.hr_time_in_zones
+        ).filter(
+            Activity.user_id == user_id,
+            Activity.start_time_local >= datetime.combine(start, time.min)
+        ).all()
+        end = max([today] + [_to_datetime(activity.start_time_local).date() for activity in activities])
+        if end < start:
+            return 0
+
+        previous = self.db.query(UserTrainingLoad).filter(
+            UserTrainingLoad.user_id == user_id,
+            UserTrainingLoad.period < start
+        ).order_by(UserTrainingLoad.period.desc()).first()
+        initial_ctl = previous.ctl if previous else 0.0
+        initial_atl = previous.atl if previous else 0.0
+
+        days = pd.date_range(start, end, freq="D")
+        loads = self._daily_loads(activities, days, max_hr, garmin_scale)
+        ctl = exponential_average(loads, initial_ctl, TRAINING_LOAD_CTL_DAYS)
+        atl = exponential_average(loads, initial_atl, TRAINING_LOAD_ATL_DAYS)
+        # TSB는 그날 훈련 전의 컨디션이므로 전날의 CTL - ATL
+        tsb = np.concatenate(([initial_ctl - initial_atl], (ctl - atl)[:-1]))
+
+        self.db.query(UserTrainingLoad).filter(
+            UserTrainingLoad.user_id == user_id,
+            UserTrainingLoad.period >= start
+        ).delete(synchronize_session=False)
+        self.db.execute(insert(UserTrainingLoad), [
+            {"user_id": user_id, "period": period, "load": day_load, "ctl": day_ctl, "atl": day_atl, "tsb": day_tsb}
+            for period, day_load, day_ctl, day_atl, day_tsb in zip(
+                days.date, loads.tolist(), ctl.tolist(), atl.tolist(), tsb.tolist()
+            )
+        ])
+        self.db.flush()
+        return len(days)
+
+    def rebuild(self, user_id: Optional[int] = None, refresh_profile: bool = False) -> Dict[str, Any]:
+        """
+        원본 activities 데이터로부터 훈련 부하 테이블을 다시 계산합니다.
+        저장된 최대 심박수/Garmin 배율을 그대로 쓰므로 증분 계산으로 쌓인 값과 같은 결과가 나옵니다.
+
+        Args:
+            user_id (int, optional): 특정 사용자만 재계산. None이면 전체 사용자
+            refresh_profile (bool): True이면 최대 심박수/Garmin 배율도 현재 데이터로 다시 정함
+
+        Returns:
+            dict: 재계산 결과
+                - users: 재계산된 사용자 수
+                - days: 저장된 일수
+        """
+        try:
+            query = self.db.query(UserTrainingLoad)
+            if user_id is not None:
+                query = query.filter(UserTrainingLoad.user_id == user_id)
+            query.delete(synchronize_session=False)
+            if refresh_profile:
+                users = self.db.query(User)
+                if user_id is not None:
+                    users = users.filter(User.id == user_id)
+                users.update({User.training_max_hr: None, User.training_garmin_scale: None}, synchronize_session="fetch")
+
+            user_ids = [user_id] if user_id is not None else [
+                row_user_id for (row_user_id,) in self.db.query(Activity.user_id).distinct()
+            ]
+            day_count = sum(self.update(row_user_id) for row_user_id in user_ids)
+            self.db.commit()
+
+            logger.info(f"Rebuilt training load for {len(user_ids)} users ({day_count} days)")
+            return {"users": len(user_ids), "days": day_count}
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error rebuilding training load: {str(e)}")
+            raise
+
+    def is_empty(self) -> bool:
+        """
+        훈련 부하 테이블이 비어 있는데 원본 활동은 존재하는지 확인합니다.
+
+        Returns:
+            bool: 재계산이 필요한 경우 True
+        """
+        has_loads = self.db.query(UserTrainingLoad.id).first() is not None
+        has_activities = self.db.query(Activity.id).first() is not None
+        return has_activities and not has_loads
+
+    def get_max_hr(self, user_id: int) -> float:
+        """
+        TRIMP 계산에 쓸 최대 심박수를 추정합니다. (220 - 나이 > 활동별 최대 심박의 백분위 > 기본값)
+        한 번 튄 심박 값이 전체 부하를 바꾸지 않도록 최댓값 대신 TRAINING_LOAD_MAX_HR_PERCENTILE 백분위를 쓰고,
+        TRAINING_LOAD_MAX_HR_LIMIT보다 큰 값은 센서 오류로 보고 제외합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+        """
+        age = self.db.query(User.age).filter(User.id == user_id).scalar()
+        if age:
+            return float(220 - age)
+        max_hrs = [
+            max_hr for (max_hr,) in self.db.query(Activity.max_hr).filter(
+                Activity.user_id == user_id,
+                Activity.max_hr > 0,
+                Activity.max_hr <= TRAINING_LOAD_MAX_HR_LIMIT
+            )
+        ]
+        if not max_hrs:
+            return float(DEFAULT_MAX_HR)
+        return float(np.percentile(np.array(max_hrs, dtype=np.float64), TRAINING_LOAD_MAX_HR_PERCENTILE))
+
+    def get_load_profile(self, user_id: int) -> Tuple[float, float]:
+        """
+        부하 계산에 쓰는 (최대 심박수, Garmin 배율)을 반환합니다.
+        사용자에 저장된 값이 있으면 그대로 쓰고, 없으면 지금까지의 활동으로 정해 저장합니다. (commit 하지 않음)
+
+        Args:
+            user_id (int): 사용자 ID
+        """
+        max_hr, garmin_scale, _ = self._load_profile(user_id)
+        return max_hr, garmin_scale
+
+    def _load_profile(self, user_id: int) -> Tuple[float, float, bool]:
+        """
+        get_load_profile과 같고, 이번에 새로 정해 저장했는지 여부를 함께 반환합니다.
+        """
+        user = self.db.get(User, user_id)
+        if user is not None and user.training_max_hr and user.training_garmin_scale:
+            return user.training_max_hr, user.training_garmin_scale, False
+
+        max_hr = self.get_max_hr(user_id)
+        rows = self.db.query(
+            Activity.activity_training_load,
+            Activity.average_hr,
+            Activity.duration
+        ).filter(
+            Activity.user_id == user_id,
+            Activity.activity_training_load > 0
+        ).all()
+        columns = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 3)
+        garmin_scale = estimate_garmin_scale(columns[:, 0], columns[:, 1], columns[:, 2], max_hr)
+        if user is None:
+            # 사용자 행이 없으면 저장하지 않고 매번 같은 방식으로 계산
+            return max_hr, garmin_scale, False
+        user.training_max_hr = max_hr
+        user.training_garmin_scale = garmin_scale
+        self.db.flush()
+        logger.info(f"Training load profile for user {user_id}: max HR {max_hr:.0f}, Garmin scale {garmin_scale:.3f}")
+        return max_hr, garmin_scale, True
+
+    def get_training_load(self, user_id: int, start_date: date = None, end_date: date = None) -> Dict[str, Any]:
+        """
+        기간 내 일별 부하와 CTL/ATL/TSB를 조회합니다.
+        마지막 저장일 이후 활동이 없는 날은 부하 0으로 이어서 계산해 채웁니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            start_date (date, optional): 조회 시작일. 기본값은 종료일 90일 전
+            end_date (date, optional): 조회 종료일. 기본값은 오늘
+
+        Returns:
+            dict: 훈련 부하 정보
+                - current: 종료일의 {date, load, ctl, atl, tsb}. 데이터가 없으면 None
+                - days: 일별 {date, load, ctl, atl, tsb} 목록
+
+        Raises:
+            HTTPException: 시작일이 종료일보다 늦으면 400 에러
+        """
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=DEFAULT_DAYS - 1)
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="from must not be later than to")
+        rows = self.db.query(UserTrainingLoad).filter(
+            UserTrainingLoad.user_id == user_id,
+            UserTrainingLoad.period >= start_date,
+            UserTrainingLoad.period <= end_date
+        ).order_by(UserTrainingLoad.period).all()
+        days = [_day_to_dict(row.period, row.load, row.ctl, row.atl, row.tsb) for row in rows]
+
+        last = rows[-1] if rows else self.db.query(UserTrainingLoad).filter(
+            UserTrainingLoad.user_id == user_id,
+            UserTrainingLoad.period < start_date
+        ).order_by(UserTrainingLoad.period.desc()).first()
+        if last is not None and last.period < end_date:
+            # 동기화 이후 지난 날은 쉬는 날로 보고 감소만 반영
+            periods = pd.date_range(max(last.period + timedelta(days=1), start_date), end_date, freq="D")
+            gap = (periods[0].date() - last.period).days
+            rest = np.zeros(gap - 1 + len(periods))
+            ctl = exponential_average(rest, last.ctl, TRAINING_LOAD_CTL_DAYS)
+            atl = exponential_average(rest, last.atl, TRAINING_LOAD_ATL_DAYS)
+            tsb = np.concatenate(([last.ctl - last.atl], (ctl - atl)[:-1]))
+            offset = gap - 1
+            days.extend(
+                _day_to_dict(period, 0.0, ctl[offset + index], atl[offset + index], tsb[offset + index])
+                for index, period in enumerate(periods.date)
+            )
+
+        return {"current": days[-1] if days else None, "days": days}
+
+    def _daily_loads(self, activities: Iterable[Any], days: pd.DatetimeIndex, max_hr: float, garmin_scale: float) -> np.ndarray:
+        """
+        활동 목록을 날짜별 부하 합계 배열로 변환합니다. (활동이 없는 날은 0)
+        """
+        activities = list(activities)
+        if not activities:
+            return np.zeros(len(days))
+        # None은 float 배열로 변환할 때 NaN이 됨
+        zone_seconds = np.array([
+            [(activity.hr_time_in_zones or {}).get(key) for key in ZONE_KEYS]
+            for activity in activities
+        ], dtype=np.float64)
+        loads = compute_activity_loads(
+            np.array([activity.activity_training_load for activity in activities], dtype=np.float64),
+            zone_seconds,
+            np.array([activity.average_hr for activity in activities], dtype=np.float64),
+            np.array([activity.duration for activity in activities], dtype=np.float64),
+            max_hr,
+            garmin_scale
+        )
+        activity_days = pd.to_datetime([_to_datetime(activity.start_time_local).date() for activity in activities])
+        daily = pd.Series(loads, index=activity_days).groupby(level=0).sum()
+        return daily.reindex(days, fill_value=0.0).to_numpy()
+
+def _to_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def _day_to_dict(period: date, load: float, ctl: float, atl: float, tsb: float) -> Dict[str, Any]:
+    return {
+        "date": period.isoformat(),
+        "load": round(float(load), 1),
+        "ctl": round(float(ctl), 1),
+        "atl": round(float(atl), 1),
+        "tsb": round(float(tsb), 1)
+    }
@@ -0,0 +1,184 @@
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Any, Dict, List, Tuple
+import logging
+import os
+import numpy as np
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+
+from ..models.activity import Activity
+from .data_version import LocalCache, get_data_version
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────── 영역 분석 캐시 설정 ───────────────────
+ZONE_ANALYTICS_CACHE_SIZE = int(os.getenv("ZONE_ANALYTICS_CACHE_SIZE", "256"))  # 프로세스당 캐시할 결과 수
+ZONE_ANALYTICS_CACHE_TTL = int(os.getenv("ZONE_ANALYTICS_CACHE_TTL", "3600"))  # 결과 캐시 유지 시간 (초)
+
+# 조회 기간을 지정하지 않았을 때 종료일로부터의 일수 (약 6개월)
+DEFAULT_DAYS = 182
+
+# 영역 종류별 Activity 컬럼 (값은 {"zone_1": 초, ..., "zone_5": 초})
+ZONE_COLUMNS = {
+    "hr": Activity.hr_time_in_zones,
+    "power": Activity.power_time_in_zones,
+}
+ZONE_KEYS = [f"zone_{zone}" for zone in range(1, 6)]
+PERIODS = ("week", "month")
+
+_cache = LocalCache(ZONE_ANALYTICS_CACHE_SIZE, ZONE_ANALYTICS_CACHE_TTL)
+
+def load_zone_matrix(rows: List[Tuple[Any, Dict[str, Any]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (시작 시간, 영역 JSON) 목록을 날짜 배열과 (활동 수 × 5) 영역 시간 행렬로 변환합니다.
+
+    Returns:
+        tuple: (datetime64[D] 날짜 배열, float64 영역별 시간(초) 행렬). 값이 없는 영역은 0
+    """
+    days = np.array([_to_datetime(start_time).date() for start_time, _ in rows], dtype="datetime64[D]")
+    # None은 float 배열로 변환할 때 NaN이 됨
+    matrix = np.array([[(zones or {}).get(key) for key in ZONE_KEYS] for _, zones in rows], dtype=np.float64).reshape(-1, 5)
+    return days, np.nan_to_num(matrix)
+
+def summarize_zones(days: np.ndarray, matrix: np.ndarray, period: str) -> Dict[str, Any]:
+    """
+    영역 시간 행렬을 주/월 단위로 한 번에 합산하고 영역 비율과 양극화 지표를 계산합니다.
+
+    - low(영역 1~2), moderate(영역 3), high(영역 4~5) 3영역 비율
+    - 양극화 지수(Treff et al., 2019): log10(low / moderate × high × 100). high가 0이면 None, 2보다 크면 양극화 훈련
+
+    Args:
+        days (ndarray): 활동 날짜 (datetime64[D])
+        matrix (ndarray): (활동 수 × 5) 영역별 시간 (초)
+        period (str): week(월요일 시작) 또는 month
+
+    Returns:
+        dict: {"total": 전체 기간 요약, "periods": 기간별 요약 목록}
+    """
+    if period == "week":
+        # 1970-01-01은 목요일이므로 +3 하면 월요일이 0
+        keys = days - (days.astype(np.int64) + 3) % 7
+    else:
+        keys = days.astype("datetime64[M]")
+    periods, inverse = np.unique(keys, return_inverse=True)
+    sums = np.zeros((len(periods), 5))
+    np.add.at(sums, inverse, matrix)
+    counts = np.bincount(inverse, minlength=len(periods))
+
+    summaries = _describe(np.vstack([sums, matrix.sum(axis=0, keepdims=True)]))
+    total = summaries.pop()
+    total["activity_count"] = int(len(days))
+    for summary, key, count in zip(summaries, periods, counts.tolist()):
+        summary["period"] = str(key)
+        summary["activity_count"] = count
+    return {"total": total, "periods": summaries}
+
+def _describe(sums: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    (행 수 × 5) 영역 시간 합계의 행별 비율과 3영역 분포, 양극화 지수를 계산합니다.
+    """
+    totals = sums.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.where(totals[:, None] > 0, sums / totals[:, None] * 100, 0.0)
+        low = percent[:, 0] + percent[:, 1]
+        moderate = percent[:, 2]
+        high = percent[:, 3] + percent[:, 4]
+        # moderate가 0이면 1%(0.01)로 보고 계산 (원 논문의 처리 방식)
+        index = np.log10(low / 100 / np.maximum(moderate / 100, 0.01) * (high / 100) * 100)
+    index_valid = (high > 0) & (low > 0)
+    return [
+        {
+            "seconds": [round(value) for value in row_seconds],
+            "percent": [round(value, 1) for value in row_percent],
+            "low": round(row_low, 1),
+            "moderate": round(row_moderate, 1),
+            "high": round(row_high, 1),
+            "polarization_index": round(row_index, 2) if row_valid else None,
+        }
+        for row_seconds, row_percent, row_low, row_moderate, row_high, row_index, row_valid in zip(
+            sums.tolist(), percent.tolist(), low.tolist(), moderate.tolist(), high.tolist(), index.tolist(), index_valid.tolist()
+        )
+    ]
+
+class ZoneAnalyticsService:
+    """
+    사용자의 심박/파워 영역별 훈련 시간을 주/월 단위로 집계하는 서비스 클래스
+
+    기간 내 활동의 영역 JSON만 읽어 (활동 수 × 5) NumPy 행렬로 만든 뒤 한 번에 합산합니다.
+    결과는 사용자 데이터 버전(동기화/활동 추가/삭제 시 증가)을 키에 포함해 프로세스 메모리에 캐시하므로,
+    새 활동이 들어오면 이전 결과는 자동으로 사용되지 않습니다.
+    """
+
+    def __init__(self, db: Session):
+        """
+        ZoneAnalyticsService 초기화
+
+        Args:
+            db (Session): SQLAlchemy 데이터베이스 세션
+        """
+        self.db = db
+
+    def get_zone_distribution(
+        self,
+        user_id: int,
+        kind: str = "hr",
+        period: str = "week",
+        start_date: date = None,
+        end_date: date = None
+    ) -> Dict[str, Any]:
+        """
+        기간 내 영역별 훈련 시간과 주/월별 양극화 분포를 조회합니다.
+
+        Args:
+            user_id (int): 사용자 ID
+            kind (str): hr(심박 영역) 또는 power(파워 영역)
+            period (str): week 또는 month
+            start_date (date, optional): 조회 시작일. 기본값은 종료일 182일 전
+            end_date (date, optional): 조회 종료일. 기본값은 오늘
+
+        Returns:
+            dict: 영역 분석 결과
+                - kind, period, from, to: 조회 조건
+                - total: 전체 기간의 {activity_count, seconds[5], percent[5], low, moderate, high, polarization_index}
+                - periods: 기간별 같은 형식의 요약과 period(주 시작일 또는 YYYY-MM) 목록
+
+        Raises:
+            HTTPException: 알 수 없는 영역 종류/기간 단위이거나 시작일이 종료일보다 늦으면 400 에러
+        """
+        if kind not in ZONE_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"Unknown zone kind: {kind}")
+        if period not in PERIODS:
+            raise HTTPException(status_code=400, detail=f"Unknown period: {period}")
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=DEFAULT_DAYS - 1)
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="from must not be later than to")
+
+        version = get_data_version(user_id)
+        cache_key = (user_id, version, kind, period, start_date, end_date)
+        if version is not None:
+            cached = _cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        column = ZONE_COLUMNS[kind]
+        rows = self.db.query(Activity.start_time_local, column).filter(
+            Activity.user_id == user_id,
+            Activity.start_time_local >= datetime.combine(start_date, day_time.min),
+            Activity.start_time_local < datetime.combine(end_date + timedelta(days=1), day_time.min)
+        ).all()
+        # 영역 정보가 없는 활동(수동 입력, 파워 미측정 등)은 제외
+        days, matrix = load_zone_matrix([row for row in rows if row[1]])
+        result = {
+            "kind": kind,
+            "period": period,
+            "from": start_date.isoformat(),
+            "to": end_date.isoformat(),
+            **summarize_zones(days, matrix, period)
+        }
+        if version is not None:
+            _cache.put(cache_key, result)
+        return result
+
+def _to_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
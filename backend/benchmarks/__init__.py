@@ -0,0 +1,6 @@
+"""
+성능 측정 명령 모음 (app 패키지와 운영 이미지에 포함하지 않음)
+
+backend 디렉터리에서 python -m benchmarks.<모듈 이름>으로 실행합니다.
+공통 DB 인자/임시 DB 초기화/환경 변수 설정은 benchmarks.common을 사용합니다.
+"""
@@ -0,0 +1,171 @@
+"""
+다른 클라이언트가 무거운 요청을 보내는 동안 /activities/summary 응답 지연(p50/p99)을 측정하는 명령
+
+사용법:
+    python -m benchmarks.async_routes [--activities 5000] [--seconds 5] [--database-url sqlite:///./async_route_benchmark.db]
+
+별도 SQLite 파일을 새로 만들어 사용하므로 운영 DB에 쓰지 않습니다.
+시작할 때 모든 테이블을 지우므로, 이름에 benchmark/scratch가 없는 기존 DB를 쓰려면 --reset을 지정해야 합니다.
+앱을 uvicorn 워커 하나로 띄우고, 요약 조회를 반복하면서 다음 세 경우의 지연을 비교합니다.
+- idle: 다른 요청 없음
+- heavy: 무거운 클라이언트가 /activities/user/{id}로 전체 활동 목록을 조회 (스레드풀에서 조회/직렬화)
+- blocking: 같은 조회를 async 라우트에서 동기 세션으로 직접 실행 (비동기 세션 도입 전 방식, 조회 동안 이벤트 루프가 멈춤)
+- write: 다른 클라이언트가 활동 추가/삭제를 반복 (def 라우트, 롤업/훈련 부하/최고 기록 재계산과 Redis/파일 정리를 스레드풀에서 수행)
+- async write: 같은 추가/삭제를 async 라우트에서 AsyncSession.run_sync로 실행 (재계산이 이벤트 루프 스레드에서 실행됨)
+응답 캐시는 끄고 측정하므로 요약 조회도 매번 DB를 읽습니다.
+"""
+from datetime import datetime, timedelta
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+
+from benchmarks.common import parse_database_args, percentile, reset_database
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /activities/summary latency while another client runs a heavy request")
+    parser.add_argument("--activities", type=int, default=5000, help="activities returned by the heavy request")
+    parser.add_argument("--heavy-clients", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5, help="measurement time per scenario")
+    args = parse_database_args(parser, "sqlite:///./async_route_benchmark.db")
+
+    # 설정값은 모듈 import 시점에 읽히므로 import 전에 환경 변수를 지정
+    os.environ["GARMIN_TOKEN_STORE"] = "none"
+    # 응답 캐시를 쓰지 않도록 Redis 대신 바로 만료되는 프로세스 내 캐시를 사용
+    os.environ["REDIS_URL"] = "redis://127.0.0.1:1/0"
+    os.environ["RESPONSE_CACHE_LOCAL_TTL"] = "0"
+
+    import requests
+    import uvicorn
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.activity import Activity
+    from app.models.user import User
+    from app.database import AsyncSessionLocal
+    from app.services.activity_service import ActivityService
+    from app.services.stats_service import StatsService
+    logging.getLogger().setLevel(logging.ERROR)
+
+    reset_database()
+    db = SessionLocal()
+    try:
+        db.add_all([User(id=1, email="light@example.com"), User(id=2, email="heavy@example.com")])
+        db.flush()
+        start = datetime(2020, 1, 1, 7)
+        rows = []
+        for user_id, count in ((1, 500), (2, args.activities)):
+            rows.extend({
+                "user_id": user_id,
+                "activity_id": user_id * 10 ** 7 + index,
+                "activity_name": "Running",
+                "start_time_local": start + timedelta(hours=index * 6),
+                "distance": 10000.0,
+                "duration": 3000.0,
+                "average_hr": 150,
+            } for index in range(count))
+        db.bulk_insert_mappings(Activity, rows)
+        db.commit()
+        StatsService(db).rebuild()
+    finally:
+        db.close()
+
+    @app.get("/_benchmark/blocking/activities/user/{user_id}")
+    async def get_activities_blocking(user_id: int):
+        # 비동기 세션 도입 전 방식: async 라우트에서 동기 세션을 직접 사용
+        db = SessionLocal()
+        try:
+            return ActivityService(db).get_activities(user_id)
+        finally:
+            db.close()
+
+    @app.post("/_benchmark/async/activities/user/{user_id}")
+    async def create_activity_on_loop(user_id: int, activity_data: dict):
+        # def 라우트로 옮기기 전 방식: run_sync로 쓰기 메서드 전체를 이벤트 루프 스레드에서 실행
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(lambda sync_session: ActivityService(sync_session).create_activity(user_id, activity_data).id)
+
+    @app.delete("/_benchmark/async/activities/user/{user_id}/{activity_id}")
+    async def delete_activity_on_loop(user_id: int, activity_id: int):
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(lambda sync_session: ActivityService(sync_session).delete_activity(user_id, activity_id))
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    base_url = f"http://127.0.0.1:{port}"
+
+    def heavy_client(path: str, stop: threading.Event, counts: list):
+        session = requests.Session()
+        while not stop.is_set():
+            session.get(f"{base_url}{path}").raise_for_status()
+            counts.append(1)
+
+    def write_client(prefix: str, client_index: int, stop: threading.Event, counts: list):
+        # 무거운 사용자의 1년 전 활동을 수동으로 추가하고 다시 삭제 (추가/삭제마다 롤업, 최고 기록과 1년치 훈련 부하를 다시 계산)
+        session = requests.Session()
+        activity_id = 9 * 10 ** 7 + client_index * 10 ** 6
+        while not stop.is_set():
+            activity_id += 1
+            session.post(f"{base_url}{prefix}/activities/user/2", json={
+                "activity_id": activity_id,
+                "activity_name": "Running",
+                "start_time_local": (datetime.now().replace(microsecond=0) - timedelta(days=365)).isoformat(),
+                "distance": 10000.0,
+                "duration": 3000.0,
+                "average_hr": 150,
+            }).raise_for_status()
+            session.delete(f"{base_url}{prefix}/activities/user/2/{activity_id}").raise_for_status()
+            counts.append(1)
+
+    try:
+        summary = requests.Session()
+        summary.get(f"{base_url}/activities/summary/user/1").raise_for_status()
+        scenarios = (
+            ("idle", None, None),
+            ("heavy", heavy_client, "/activities/user/2"),
+            ("blocking", heavy_client, "/_benchmark/blocking/activities/user/2"),
+            ("write", write_client, ""),
+            ("async write", write_client, "/_benchmark/async"),
+        )
+        for label, client, path in scenarios:
+            stop = threading.Event()
+            counts = []
+            heavy_threads = [
+                threading.Thread(
+                    target=client,
+                    args=(path, stop, counts) if client is heavy_client else (path, index, stop, counts),
+                    daemon=True
+                )
+                for index in range(args.heavy_clients if client else 0)
+            ]
+            for heavy_thread in heavy_threads:
+                heavy_thread.start()
+            durations = []
+            deadline = time.perf_counter() + args.seconds
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                summary.get(f"{base_url}/activities/summary/user/1").raise_for_status()
+                durations.append(time.perf_counter() - started)
+            stop.set()
+            for heavy_thread in heavy_threads:
+                heavy_thread.join()
+            durations.sort()
+            print(
+                f"{label}: {len(durations)} summary requests, p50 {percentile(durations, 0.5) * 1000:.1f}ms, "
+                f"p99 {percentile(durations, 0.99) * 1000:.1f}ms, max {durations[-1] * 1000:.1f}ms"
+                + (f", {len(counts)} heavy requests of {args.activities} activities" if client is heavy_client else "")
+                + (f", {len(counts)} activity create+delete pairs" if client is write_client else "")
+            )
+    finally:
+        server.should_exit = True
+        thread.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+벤치마크 명령이 함께 쓰는 설정
+
+벤치마크는 시작할 때 모든 테이블을 지우고 다시 만들므로, --database-url이 벤치마크용 임시 DB로 보이지 않으면
+--reset을 함께 지정해야만 실행합니다. (운영 DB 주소를 잘못 넘겨 데이터를 지우지 않도록 함)
+app의 설정값은 모듈 import 시점에 읽히므로, 아래 use_* 함수로 환경 변수를 지정한 뒤에 app 모듈을 import 합니다.
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+# DB 이름(SQLite는 파일 이름)에 이 단어가 있으면 벤치마크용 임시 DB로 봄
+SCRATCH_DATABASE_MARKERS = ("benchmark", "scratch")
+
+def add_database_arguments(parser: argparse.ArgumentParser, default_url: str) -> None:
+    """
+    --database-url, --reset 인자를 추가합니다.
+    """
+    parser.add_argument("--database-url", default=default_url)
+    parser.add_argument("--reset", action="store_true", help="drop all tables even if the database does not look like a scratch database")
+
+def is_scratch_database(database_url: str) -> bool:
+    """
+    지워도 되는 DB인지 확인합니다. (메모리/아직 없는 SQLite 파일, 또는 이름에 SCRATCH_DATABASE_MARKERS가 있는 DB)
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if not url.database or url.database == ":memory:" or not os.path.exists(url.database):
+            return True
+        name = os.path.basename(url.database)
+    else:
+        name = url.database or ""
+    return any(marker in name.lower() for marker in SCRATCH_DATABASE_MARKERS)
+
+def require_scratch_database(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    --reset 없이 임시 DB가 아닌 주소가 주어지면 사용법 오류로 종료합니다.
+    """
+    if not args.reset and not is_scratch_database(args.database_url):
+        url = make_url(args.database_url).render_as_string(hide_password=True)
+        parser.error(f"{url} does not look like a scratch database; pass --reset to drop and recreate all of its tables")
+
+def parse_database_args(parser: argparse.ArgumentParser, default_url: str) -> argparse.Namespace:
+    """
+    DB 인자를 추가해 명령행을 읽고, 임시 DB인지 확인한 뒤 DATABASE_URL로 지정합니다.
+
+    Returns:
+        argparse.Namespace: 읽은 인자
+    """
+    add_database_arguments(parser, default_url)
+    args = parser.parse_args()
+    require_scratch_database(parser, args)
+    os.environ["DATABASE_URL"] = args.database_url
+    return args
+
+def use_temporary_token_store() -> None:
+    """
+    Garmin 토큰을 임시 디렉터리에 새 키로 저장하도록 지정합니다. (운영 토큰 저장소를 쓰지 않음)
+    """
+    from cryptography.fernet import Fernet
+    os.environ["GARMIN_TOKEN_STORE"] = "disk"
+    os.environ["GARMIN_TOKEN_DIR"] = tempfile.mkdtemp(prefix="garmin-token-benchmark-")
+    os.environ["GARMIN_TOKEN_KEY"] = Fernet.generate_key().decode()
+
+def use_temporary_sample_store() -> None:
+    """
+    초 단위 샘플과 메모리 맵 캐시를 임시 디렉터리에 저장하도록 지정합니다. (운영 샘플 저장소를 쓰지 않음)
+    """
+    root = tempfile.mkdtemp(prefix="garmin-samples-benchmark-")
+    os.environ["GARMIN_SAMPLES_DIR"] = os.path.join(root, "activity_samples")
+    os.environ["GARMIN_SERIES_DIR"] = os.path.join(root, "activity_series")
+
+def use_unlimited_garmin_rate() -> None:
+    """
+    호출 제한 대기 시간이 측정에 섞이지 않도록 Garmin 호출 제한을 풀어 둡니다.
+    """
+    os.environ.setdefault("GARMIN_RATE_PER_MINUTE", "100000")
+    os.environ.setdefault("GARMIN_RATE_BURST", "1000")
+
+def reset_database(bind=None) -> None:
+    """
+    모든 모델을 등록한 뒤 테이블을 지우고 다시 만듭니다. (parse_database_args 이후에 호출)
+
+    Args:
+        bind (Engine, optional): 대상 엔진. None이면 app.database의 엔진에 init_db로 생성
+    """
+    from app.database import Base, engine, init_db
+    import app.models.activity, app.models.schedule, app.models.stats, app.models.training, app.models.user  # noqa: F401 (테이블/관계 등록)
+    Base.metadata.drop_all(bind=bind or engine)
+    if bind is None:
+        init_db()
+    else:
+        Base.metadata.create_all(bind=bind)
+
+def percentile(durations: list, fraction: float) -> float:
+    """
+    정렬된 소요 시간 목록의 백분위 값을 반환합니다. (비어 있으면 0)
+    """
+    return durations[min(len(durations) - 1, int(len(durations) * fraction))] if durations else 0.0
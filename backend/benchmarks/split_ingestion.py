@@ -0,0 +1,121 @@
+"""
+랩(스플릿) 저장 방식별 소요 시간과 SQL 실행 수를 비교하는 명령
+
+사용법:
+    python -m benchmarks.split_ingestion [--activities 100] [--laps 20] [--database-url sqlite:///./split_ingestion_benchmark.db]
+
+별도 SQLite 파일을 새로 만들어 사용하므로 운영 DB에 쓰지 않습니다.
+시작할 때 모든 테이블을 지우므로, 이름에 benchmark/scratch가 없는 기존 DB를 쓰려면 --reset을 지정해야 합니다.
+- per-lap: 이전 방식. 랩마다 존재 여부를 SELECT 하고 INSERT 후 commit
+- bulk: 현재 방식. build_split_rows + save_activity_splits로 한 번의 INSERT 후 한 번 commit
+각 방식마다 첫 동기화(랩 없음)와 재동기화(모든 랩이 이미 있음)를 측정합니다.
+"""
+from datetime import datetime, timedelta
+import argparse
+import logging
+import random
+import time
+
+from benchmarks.common import parse_database_args, reset_database
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-lap vs bulk lap ingestion")
+    parser.add_argument("--activities", type=int, default=100)
+    parser.add_argument("--laps", type=int, default=20, help="laps per activity")
+    args = parse_database_args(parser, "sqlite:///./split_ingestion_benchmark.db")
+
+    from sqlalchemy import event
+    from app.database import SessionLocal, engine
+    from app.models.activity import Activity, ActivitySplit
+    from app.models.user import User
+    from app.services.activity_service import ActivityService
+    # 이전 방식의 랩별 로그가 측정 시간에 섞이지 않도록 함
+    logging.getLogger().setLevel(logging.ERROR)
+
+    user_id = 1
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1, 7)
+    activity_ids = list(range(1, args.activities + 1))
+    splits_by_activity = {
+        activity_id: {
+            "activityId": activity_id,
+            "lapDTOs": [{
+                "lapIndex": lap_index,
+                "startTimeGMT": (start + timedelta(days=activity_id, seconds=300 * lap_index)).strftime("%Y-%m-%dT%H:%M:%S.0"),
+                "distance": 1000.0,
+                "duration": rng.uniform(270, 330),
+                "movingDuration": rng.uniform(265, 325),
+                "averageSpeed": rng.uniform(3.0, 3.7),
+                "maxSpeed": rng.uniform(3.8, 4.5),
+                "averageHR": rng.randint(130, 170),
+                "maxHR": rng.randint(170, 185),
+                "averageRunCadence": rng.uniform(170, 185),
+                "calories": rng.randint(60, 80),
+            } for lap_index in range(1, args.laps + 1)],
+        }
+        for activity_id in activity_ids
+    }
+
+    def ingest_per_lap(db):
+        # 일괄 저장 도입 전 ActivityService.process_activity_splits의 저장 부분
+        for activity_id, splits_data in splits_by_activity.items():
+            for lap in splits_data["lapDTOs"]:
+                existing_split = db.query(ActivitySplit).filter(
+                    ActivitySplit.user_id == user_id,
+                    ActivitySplit.activity_id == activity_id,
+                    ActivitySplit.lap_index == lap.get("lapIndex")
+                ).first()
+                if existing_split:
+                    continue
+                db.add(ActivitySplit(**ActivityService(db).build_split_rows(user_id, activity_id, {"lapDTOs": [lap]})[0]))
+                db.commit()
+
+    def ingest_bulk(db):
+        service = ActivityService(db)
+        rows = []
+        for activity_id, splits_data in splits_by_activity.items():
+            rows.extend(service.build_split_rows(user_id, activity_id, splits_data))
+        service.save_activity_splits(rows)
+        db.commit()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    reset_database()
+    db = SessionLocal()
+    try:
+        db.add(User(id=user_id, email="laps@example.com"))
+        db.flush()
+        db.bulk_insert_mappings(Activity, [{
+            "user_id": user_id,
+            "activity_id": activity_id,
+            "activity_name": "Running",
+            "start_time_local": start + timedelta(days=activity_id),
+            "distance": args.laps * 1000.0,
+            "duration": args.laps * 300.0,
+        } for activity_id in activity_ids])
+        db.commit()
+
+        total_laps = args.activities * args.laps
+        for label, ingest in (("per-lap", ingest_per_lap), ("bulk", ingest_bulk)):
+            db.query(ActivitySplit).delete()
+            db.commit()
+            for phase in ("first sync", "re-sync"):
+                del statements[:]
+                started = time.perf_counter()
+                ingest(db)
+                elapsed = time.perf_counter() - started
+                executed = len(statements)
+                stored = db.query(ActivitySplit).count()
+                print(
+                    f"{label} {phase}: {elapsed:.3f}s, {executed} statements, "
+                    f"{stored}/{total_laps} laps stored ({args.activities} activities x {args.laps} laps)"
+                )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Garmin 동기화가 쓰는 동안의 SQLite 읽기 처리량을 저널 모드별(WAL / 기본 DELETE)로 비교하는 명령
+
+사용법:
+    python -m benchmarks.sqlite_concurrency [--seconds 5] [--readers 4] [--database-url sqlite:///./sqlite_concurrency_benchmark.db]
+
+별도 SQLite 파일을 새로 만들어 사용하므로 운영 DB에 쓰지 않습니다.
+시작할 때 모든 테이블을 지우므로, 이름에 benchmark/scratch가 없는 기존 DB를 쓰려면 --reset을 지정해야 합니다.
+쓰기 프로세스는 동기화와 같은 트랜잭션(활동 bulk INSERT + 롤업 반영 + 랩 bulk INSERT + commit)을 반복하고,
+읽기 프로세스들은 대시보드 조회(누적 요약 + 최근 활동 50개)를 반복합니다. 쓰기가 없을 때의 읽기 처리량도 함께 출력합니다.
+"""
+from datetime import datetime, timedelta
+import argparse
+import multiprocessing
+import random
+import time
+
+from benchmarks.common import parse_database_args, percentile, reset_database
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite read throughput while a Garmin sync writes, WAL vs the default journal")
+    parser.add_argument("--seconds", type=float, default=5, help="measurement time per scenario")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent dashboard readers")
+    parser.add_argument("--activities", type=int, default=2000, help="activities of the reading user")
+    parser.add_argument("--batch", type=int, default=20, help="activities per sync transaction (20 laps each)")
+    args = parse_database_args(parser, "sqlite:///./sqlite_concurrency_benchmark.db")
+
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+    import app.database as database
+    from app.database import create_db_engine, insert_ignore, is_sqlite
+    from app.models.activity import Activity
+    from app.services.activity_service import ActivityService
+    from app.services.stats_service import StatsService
+
+    if not is_sqlite(args.database_url):
+        parser.error("this benchmark compares SQLite journal modes; pass a sqlite:/// URL")
+
+    def activity_rows(user_id: int, first_id: int, count: int, start: datetime):
+        rng = random.Random(first_id)
+        activities, splits = [], []
+        for index in range(count):
+            activity_id = first_id + index
+            start_time = start + timedelta(days=index)
+            activities.append({
+                "user_id": user_id,
+                "activity_id": activity_id,
+                "activity_name": "Running",
+                "start_time_local": start_time,
+                "distance": 20000.0,
+                "duration": 6000.0,
+                "average_hr": rng.randint(130, 170),
+            })
+            splits.extend({
+                "user_id": user_id,
+                "activity_id": activity_id,
+                "lap_index": lap_index,
+                "start_time_gmt": start_time + timedelta(seconds=300 * lap_index),
+                "distance": 1000.0,
+                "duration": rng.uniform(270, 330),
+                "average_hr": rng.randint(130, 170),
+            } for lap_index in range(1, 21))
+        return activities, splits
+
+    def write_sync_batch(session_factory, batch: int):
+        # 동기화와 같은 트랜잭션: 활동 bulk INSERT, 롤업 반영, 랩 bulk INSERT 후 한 번 commit
+        db = session_factory()
+        try:
+            activities, splits = activity_rows(2, batch * args.batch + 1, args.batch, datetime(1990, 1, 1) + timedelta(days=batch * args.batch))
+            db.execute(insert_ignore(db, Activity, ["user_id", "activity_id"]), activities)
+            StatsService(db).apply_activities([Activity(**row) for row in activities])
+            ActivityService(db).save_activity_splits(splits)
+            db.commit()
+        finally:
+            db.close()
+
+    def read_dashboard(session_factory):
+        db = session_factory()
+        try:
+            ActivityService(db).get_activity_summary(1)
+            ActivityService(db).get_activities(1, limit=50)
+        finally:
+            db.close()
+
+    # 운영 환경처럼 API 워커(읽기)와 Celery 워커(쓰기)를 별도 프로세스로 실행 (스레드는 GIL 때문에 DB 잠금 영향이 가려짐)
+    context = multiprocessing.get_context("fork")
+    for journal_mode in ("DELETE", "WAL"):
+        # 커넥션마다 적용되는 PRAGMA journal_mode를 바꿔 같은 설정의 엔진을 새로 만듦
+        database.SQLITE_JOURNAL_MODE = journal_mode
+        engine = create_db_engine(args.database_url)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with engine.connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar().upper()
+        reset_database(engine)
+        db = session_factory()
+        try:
+            activities, splits = activity_rows(1, 1, args.activities, datetime(2015, 1, 1))
+            db.execute(insert_ignore(db, Activity, ["user_id", "activity_id"]), activities)
+            ActivityService(db).save_activity_splits(splits)
+            db.commit()
+            StatsService(db).rebuild()
+        finally:
+            db.close()
+
+        # 부모 프로세스의 커넥션을 자식 프로세스가 물려받지 않도록 정리
+        engine.dispose()
+
+        for label, with_writer in (("reads only", False), ("reads during sync", True)):
+            stop = context.Event()
+            results = context.Queue()
+
+            def reader():
+                reader_engine = create_db_engine(args.database_url)
+                reader_sessions = sessionmaker(autocommit=False, autoflush=False, bind=reader_engine)
+                durations, errors = [], 0
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        read_dashboard(reader_sessions)
+                    except OperationalError:
+                        errors += 1
+                        continue
+                    durations.append(time.perf_counter() - started)
+                results.put(("reader", durations, errors))
+
+            def writer():
+                writer_engine = create_db_engine(args.database_url)
+                writer_sessions = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine)
+                batch, errors = 0, 0
+                while not stop.is_set():
+                    try:
+                        write_sync_batch(writer_sessions, batch)
+                        batch += 1
+                    except OperationalError:
+                        errors += 1
+                results.put(("writer", batch, errors))
+
+            processes = [context.Process(target=reader) for _ in range(args.readers)]
+            if with_writer:
+                processes.append(context.Process(target=writer))
+            for process in processes:
+                process.start()
+            time.sleep(args.seconds)
+            stop.set()
+            durations, errors, batches = [], 0, 0
+            for _ in processes:
+                kind, value, process_errors = results.get()
+                errors += process_errors
+                if kind == "reader":
+                    durations.extend(value)
+                else:
+                    batches = value
+            for process in processes:
+                process.join()
+
+            durations.sort()
+            print(
+                f"{journal_mode} {label}: {len(durations) / args.seconds:.0f} reads/s, "
+                f"p50 {percentile(durations, 0.5) * 1000:.1f}ms, p99 {percentile(durations, 0.99) * 1000:.1f}ms"
+                + (f", {batches / args.seconds:.1f} sync batches/s ({args.batch} activities x 20 laps)" if with_writer else "")
+                + f", {errors} lock errors"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Garmin Connect 스탠드인 서버를 상대로 랩 데이터 조회 방식을 비교하는 명령
+
+먼저 스탠드인 서버를 실행한 뒤:
+    uvicorn app.garmin_standin.server:app --port 8002
+    python -m benchmarks.standin_fetch --activities 100
+
+DB와 토큰 저장소를 사용하지 않습니다. 다음 세 가지를 측정합니다.
+- serial: 한 사용자의 활동 랩을 하나씩 순서대로 조회 (기존 방식)
+- pooled: GarminService.fetch_activity_splits로 공유 스레드 풀에서 동시 조회
+- fairness: 한 사용자의 대량 백필이 진행되는 동안 다른 사용자가 소수 활동을 조회하는 데 걸리는 시간
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.common import use_unlimited_garmin_rate
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pooled lap fetching against the stand-in server")
+    parser.add_argument("--standin-url", default="http://localhost:8002")
+    parser.add_argument("--activities", type=int, default=100, help="activities fetched by the backfilling user")
+    parser.add_argument("--light-activities", type=int, default=5, help="activities fetched by the other user during the backfill")
+    args = parser.parse_args()
+
+    # 설정값은 모듈 import 시점에 읽히므로 import 전에 환경 변수를 지정
+    os.environ["GARMIN_STANDIN_URL"] = args.standin_url
+    os.environ["GARMIN_TOKEN_STORE"] = "none"
+    os.environ.setdefault("GARMIN_ARCHIVE_ENABLED", "false")
+    use_unlimited_garmin_rate()
+    logging.basicConfig(level=logging.ERROR)
+
+    import requests
+    from app.garmin_standin.client import GarminStandInClient
+    from app.services.garmin_service import GARMIN_FETCH_MAX_WORKERS, GARMIN_FETCH_PER_USER, GarminService
+
+    requests.post(f"{args.standin_url}/_standin/reset").raise_for_status()
+    config = requests.get(f"{args.standin_url}/_standin/config").json()
+    config["activities_per_account"] = max(config["activities_per_account"], args.activities, args.light_activities)
+    requests.put(f"{args.standin_url}/_standin/config", json=config).raise_for_status()
+    print(f"stand-in config: {config}")
+    print(f"pool: {GARMIN_FETCH_MAX_WORKERS} workers, {GARMIN_FETCH_PER_USER} per user")
+
+    def connect(user_id: int, count: int):
+        client = GarminStandInClient(f"bench{user_id}@example.com", "password", args.standin_url)
+        client.login()
+        activity_ids = [activity["activityId"] for activity in client.get_activities(0, count)]
+        return client, activity_ids
+
+    service = GarminService(None)
+    heavy_client, heavy_ids = connect(1, args.activities)
+    light_client, light_ids = connect(2, args.light_activities)
+
+    started = time.perf_counter()
+    for activity_id in heavy_ids:
+        heavy_client.get_activity_splits(activity_id)
+    serial = time.perf_counter() - started
+    print(f"serial: {len(heavy_ids)} activities in {serial:.2f}s")
+
+    started = time.perf_counter()
+    service.fetch_activity_splits(heavy_client, 1, heavy_ids)
+    pooled = time.perf_counter() - started
+    print(f"pooled: {len(heavy_ids)} activities in {pooled:.2f}s ({serial / pooled:.1f}x)")
+
+    started = time.perf_counter()
+    service.fetch_activity_splits(light_client, 2, light_ids)
+    alone = time.perf_counter() - started
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        backfill = executor.submit(service.fetch_activity_splits, heavy_client, 1, heavy_ids)
+        time.sleep(config["latency_ms"] / 1000)
+        started = time.perf_counter()
+        service.fetch_activity_splits(light_client, 2, light_ids)
+        during_backfill = time.perf_counter() - started
+        backfill.result()
+    print(f"fairness: {len(light_ids)} activities in {alone:.2f}s alone, {during_backfill:.2f}s during a {len(heavy_ids)}-activity backfill")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Garmin Connect 스탠드인 서버를 상대로 저장된 토큰 재사용(warm)과 전체 로그인(cold)의 지연 시간을 비교하는 명령
+
+먼저 스탠드인 서버를 실행한 뒤:
+    uvicorn app.garmin_standin.server:app --port 8002
+    python -m benchmarks.standin_login --users 20
+
+임시 디렉터리에 새 키로 토큰을 저장하므로 운영 토큰 저장소와 DB를 사용하지 않습니다.
+cold는 저장된 토큰이 없어 전체 로그인(SSO)하는 경우, warm은 저장된 토큰을 복호화해 세션을 재개하는 경우입니다.
+"""
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.common import percentile, use_temporary_token_store, use_unlimited_garmin_rate
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark warm (stored token) vs cold (full login) Garmin sessions against the stand-in server")
+    parser.add_argument("--standin-url", default="http://localhost:8002")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5, help="warm logins per user")
+    args = parser.parse_args()
+
+    # 설정값은 모듈 import 시점에 읽히므로 import 전에 환경 변수를 지정
+    os.environ["GARMIN_STANDIN_URL"] = args.standin_url
+    os.environ.setdefault("GARMIN_ARCHIVE_ENABLED", "false")
+    use_temporary_token_store()
+    use_unlimited_garmin_rate()
+    logging.basicConfig(level=logging.ERROR)
+
+    import requests
+    from app.services.garmin_service import GarminService
+
+    requests.post(f"{args.standin_url}/_standin/reset").raise_for_status()
+    print(f"stand-in config: {requests.get(f'{args.standin_url}/_standin/config').json()}")
+    # 로그인에는 DB를 사용하지 않음
+    service = GarminService(None)
+
+    def login(user_id: int) -> float:
+        started = time.perf_counter()
+        service.login_client(user_id, f"bench{user_id}@example.com", "password")
+        return time.perf_counter() - started
+
+    users = range(1, args.users + 1)
+    for label, user_ids in (("cold", list(users)), ("warm", [user_id for user_id in users for _ in range(args.rounds)])):
+        logins_before = requests.get(f"{args.standin_url}/_standin/stats").json()["logins"]
+        durations = sorted(login(user_id) for user_id in user_ids)
+        logins = requests.get(f"{args.standin_url}/_standin/stats").json()["logins"] - logins_before
+        print(
+            f"{label}: {len(durations)} logins, p50 {percentile(durations, 0.5) * 1000:.1f}ms, "
+            f"p99 {percentile(durations, 0.99) * 1000:.1f}ms, max {durations[-1] * 1000:.1f}ms, full SSO logins {logins}"
+        )
+
+if __name__ == "__main__":
+    main()
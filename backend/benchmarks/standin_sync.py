@@ -0,0 +1,71 @@
+"""
+Garmin Connect 스탠드인 서버를 상대로 동기화 처리량을 측정하는 명령
+
+먼저 스탠드인 서버를 실행한 뒤:
+    uvicorn app.garmin_standin.server:app --port 8002
+    python -m benchmarks.standin_sync --users 10 --concurrency 4
+
+별도 SQLite 파일(기본값 ./standin_benchmark.db)과 임시 토큰/샘플 디렉터리를 사용하므로 운영 DB와 저장소에 쓰지 않습니다.
+시작할 때 모든 테이블을 지우므로, 이름에 benchmark/scratch가 없는 기존 DB를 쓰려면 --reset을 지정해야 합니다.
+첫 번째 패스는 전체 로그인 + 백필(cold), 두 번째 패스는 저장된 토큰 + 증분 동기화(warm)입니다.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.common import parse_database_args, reset_database, use_temporary_sample_store, use_temporary_token_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Garmin sync against the stand-in server")
+    parser.add_argument("--standin-url", default="http://localhost:8002")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="users synced at the same time")
+    args = parse_database_args(parser, "sqlite:///./standin_benchmark.db")
+
+    # 설정값은 모듈 import 시점에 읽히므로 import 전에 환경 변수를 지정
+    os.environ["GARMIN_STANDIN_URL"] = args.standin_url
+    os.environ.setdefault("GARMIN_ARCHIVE_ENABLED", "false")
+    # warm 패스가 재사용할 토큰은 임시 디렉터리에 새 키로 저장
+    use_temporary_token_store()
+    use_temporary_sample_store()
+    logging.basicConfig(level=logging.WARNING)
+
+    import requests
+    from app.database import SessionLocal
+    from app.models.activity import Activity, ActivitySplit
+    from app.services.garmin_service import GarminService
+
+    reset_database()
+    requests.post(f"{args.standin_url}/_standin/reset").raise_for_status()
+
+    def sync(user_id: int):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            GarminService(db).sync_activities(user_id, f"bench{user_id}@example.com", "password")
+            return time.perf_counter() - started
+        finally:
+            db.close()
+
+    for label in ("cold", "warm"):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            durations = sorted(executor.map(sync, range(1, args.users + 1)))
+        elapsed = time.perf_counter() - started
+        stats = requests.get(f"{args.standin_url}/_standin/stats").json()
+        print(
+            f"{label}: {args.users} users in {elapsed:.2f}s "
+            f"({args.users / elapsed:.2f} users/s, p50 {durations[len(durations) // 2]:.2f}s, max {durations[-1]:.2f}s) "
+            f"stand-in totals: {stats}"
+        )
+
+    db = SessionLocal()
+    try:
+        print(f"stored: {db.query(Activity).count()} activities, {db.query(ActivitySplit).count()} splits")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
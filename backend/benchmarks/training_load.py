@@ -0,0 +1,114 @@
+"""
+10년치 일별 활동으로 훈련 부하(CTL/ATL/TSB) 계산 시간을 측정하는 명령
+
+사용법:
+    python -m benchmarks.training_load [--years 10] [--database-url sqlite:///./training_load_benchmark.db]
+
+별도 SQLite 파일을 새로 만들어 사용하므로 운영 DB에 쓰지 않습니다.
+시작할 때 모든 테이블을 지우므로, 이름에 benchmark/scratch가 없는 기존 DB를 쓰려면 --reset을 지정해야 합니다.
+전체 재계산, 하루 추가 후 증분 계산, 최근 90일 조회, 그리고 계산 부분만의 벡터 연산과 파이썬 반복문 시간을 비교합니다.
+"""
+from datetime import date, datetime, time as day_time, timedelta
+import argparse
+import math
+import random
+import time
+
+from benchmarks.common import parse_database_args, reset_database
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CTL/ATL/TSB training load engine")
+    parser.add_argument("--years", type=int, default=10)
+    args = parse_database_args(parser, "sqlite:///./training_load_benchmark.db")
+
+    import numpy as np
+    from app.database import SessionLocal
+    from app.models.activity import Activity
+    from app.services.training_load_service import (
+        EDWARDS_THRESHOLD_HOUR, THRESHOLD_HOUR_LOAD, TRAINING_LOAD_ATL_DAYS, TRAINING_LOAD_CTL_DAYS, TRAINING_LOAD_GARMIN_SCALE,
+        TRAINING_LOAD_THRESHOLD_HR_RATIO, TrainingLoadService, compute_activity_loads, exponential_average
+    )
+
+    reset_database()
+
+    # 하루 한 번(쉬는 날 약 20%) 달리는 사용자. 부하 정보는 Garmin 부하/심박 영역/평균 심박이 섞여 있음
+    user_id = 1
+    today = date.today()
+    first_day = today - timedelta(days=365 * args.years)
+    rng = random.Random(0)
+    rows = []
+    for offset in range((today - first_day).days):
+        if rng.random() < 0.2:
+            continue
+        duration = rng.uniform(1800, 7200)
+        source = rng.random()
+        rows.append({
+            "user_id": user_id,
+            "activity_id": offset + 1,
+            "start_time_local": datetime.combine(first_day + timedelta(days=offset), day_time(7)),
+            "duration": duration,
+            "average_hr": rng.uniform(130, 170),
+            "max_hr": 185,
+            "activity_training_load": rng.uniform(40, 250) if source < 0.6 else None,
+            "hr_time_in_zones": {f"zone_{zone}": duration / 5 for zone in range(1, 6)} if 0.6 <= source < 0.8 else None,
+        })
+
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Activity, rows)
+        db.commit()
+        service = TrainingLoadService(db)
+
+        started = time.perf_counter()
+        result = service.rebuild(user_id)
+        print(f"full rebuild: {len(rows)} activities, {result['days']} days in {time.perf_counter() - started:.3f}s")
+
+        db.add(Activity(user_id=user_id, activity_id=len(rows) + 10 ** 6, start_time_local=datetime.combine(today, day_time(18)),
+                        duration=3600, average_hr=150, activity_training_load=120))
+        started = time.perf_counter()
+        days = service.update(user_id, today)
+        db.commit()
+        print(f"incremental update: {days} day(s) in {time.perf_counter() - started:.3f}s")
+
+        started = time.perf_counter()
+        current = service.get_training_load(user_id)["current"]
+        print(f"read last 90 days in {time.perf_counter() - started:.3f}s, today: {current}")
+    finally:
+        db.close()
+
+    # DB 입출력을 뺀 계산 부분만 비교 (같은 입력으로 벡터 연산 vs 파이썬 반복문)
+    count = len(rows)
+    training_load = np.array([row["activity_training_load"] for row in rows], dtype=np.float64)
+    zone_seconds = np.array([[(row["hr_time_in_zones"] or {}).get(f"zone_{zone}") for zone in range(1, 6)] for row in rows], dtype=np.float64)
+    average_hr = np.array([row["average_hr"] for row in rows])
+    duration = np.array([row["duration"] for row in rows])
+
+    started = time.perf_counter()
+    loads = compute_activity_loads(training_load, zone_seconds, average_hr, duration, 185)
+    ctl = exponential_average(loads, 0.0, TRAINING_LOAD_CTL_DAYS)
+    atl = exponential_average(loads, 0.0, TRAINING_LOAD_ATL_DAYS)
+    vectorized = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ctl_alpha = 1 - math.exp(-1 / TRAINING_LOAD_CTL_DAYS)
+    atl_alpha = 1 - math.exp(-1 / TRAINING_LOAD_ATL_DAYS)
+    threshold_reserve = (185 * TRAINING_LOAD_THRESHOLD_HR_RATIO - 60) / (185 - 60)
+    banister_threshold_hour = 60 * threshold_reserve * 0.64 * math.exp(1.92 * threshold_reserve)
+    loop_ctl = loop_atl = 0.0
+    for row in rows:
+        zones = row["hr_time_in_zones"]
+        reserve = min(max((row["average_hr"] - 60) / (185 - 60), 0), 1)
+        if row["activity_training_load"]:
+            load = row["activity_training_load"] * TRAINING_LOAD_GARMIN_SCALE
+        elif zones:
+            load = sum(zone * zones[f"zone_{zone}"] for zone in range(1, 6)) / 60 * THRESHOLD_HOUR_LOAD / EDWARDS_THRESHOLD_HOUR
+        else:
+            load = row["duration"] / 60 * reserve * 0.64 * math.exp(1.92 * reserve) * THRESHOLD_HOUR_LOAD / banister_threshold_hour
+        loop_ctl += (load - loop_ctl) * ctl_alpha
+        loop_atl += (load - loop_atl) * atl_alpha
+    loop = time.perf_counter() - started
+    assert abs(loop_ctl - ctl[-1]) < 1e-6 and abs(loop_atl - atl[-1]) < 1e-6
+    print(f"compute only ({count} activities): vectorized {vectorized * 1000:.2f}ms, python loop {loop * 1000:.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from celery import Celery
+from app.redis_client import REDIS_URL
+from app.services.fleet_sync_service import GARMIN_FLEET_SYNC_TICK
+import os
+
+# 연동 사용자 전체를 주기적으로 동기화할지 여부 (celery beat 필요)
+GARMIN_FLEET_SYNC_ENABLED = os.getenv("GARMIN_FLEET_SYNC_ENABLED", "true").lower() == "true"
+
+# Celery 설정 (브로커/결과 저장소 모두 Redis 사용)
+celery_app = Celery(
+    'marathon',
+    broker=REDIS_URL,
+    backend=REDIS_URL,
+    include=['tasks.garmin_sync', 'tasks.fleet_sync']
+)
+
+celery_app.conf.update(
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    result_expires=24 * 60 * 60,  # 작업 결과 보관 기간 (초)
+    task_track_started=True,  # 대기(PENDING)와 실행 중(STARTED)을 구분
+    task_acks_late=True,  # 워커가 죽으면 다른 워커가 작업을 다시 가져감
+    worker_prefetch_multiplier=1,  # 오래 걸리는 동기화 작업을 한 워커가 몰아 가져가지 않도록 함
+)
+
+if GARMIN_FLEET_SYNC_ENABLED:
+    celery_app.conf.beat_schedule = {
+        'garmin-fleet-sync': {
+            'task': 'tasks.fleet_sync.schedule_fleet_sync',
+            'schedule': GARMIN_FLEET_SYNC_TICK,
+        },
+    }
@@ -0,0 +1,59 @@
+import logging
+import time
+from app.database import SessionLocal
+from app.redis_client import get_redis
+from app.services.fleet_sync_service import FleetSyncService, GARMIN_FLEET_SHARDS, GARMIN_FLEET_SYNC_TICK, GARMIN_FLEET_SYNC_INTERVAL
+from app.services.sync_job_service import SyncJobService
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# 샤드별 계획 작업이 겹쳐 실행되지 않도록 하는 잠금
+SHARD_LOCK_KEY = "garmin_fleet:lock:{shard}"
+# 샤드별로 스케줄러가 최근 동기화를 등록한 사용자 (score: 만료 시각)
+# 동기화가 실패해 garmin_sync_date가 갱신되지 않은 사용자를 매 tick 다시 등록하지 않도록 함
+QUEUED_KEY = "garmin_fleet:queued:{shard}"
+
+@celery_app.task(name="tasks.fleet_sync.schedule_fleet_sync")
+def schedule_fleet_sync():
+    """
+    Celery beat가 tick마다 실행하며, 샤드별 계획 작업을 여러 워커에 나누어 등록합니다.
+    """
+    for shard in range(GARMIN_FLEET_SHARDS):
+        plan_fleet_shard.delay(shard)
+
+@celery_app.task(name="tasks.fleet_sync.plan_fleet_shard")
+def plan_fleet_shard(shard: int):
+    """
+    한 샤드의 사용자 중 이번 tick에 동기화할 사용자를 골라 tick 안에 고르게 나누어 등록합니다.
+
+    Args:
+        shard (int): 샤드 번호
+
+    Returns:
+        int: 새로 등록한 동기화 작업 수
+    """
+    client = get_redis()
+    if not client.set(SHARD_LOCK_KEY.format(shard=shard), 1, nx=True, ex=GARMIN_FLEET_SYNC_TICK):
+        logger.info(f"Fleet sync shard {shard} is already planned for this tick")
+        return 0
+
+    queued_key = QUEUED_KEY.format(shard=shard)
+    now = time.time()
+    client.zremrangebyscore(queued_key, "-inf", now)
+    recently_queued = {int(user_id) for user_id in client.zrange(queued_key, 0, -1)}
+
+    db = SessionLocal()
+    try:
+        plan = FleetSyncService(db).plan_shard(shard, recently_queued=recently_queued)
+    finally:
+        db.close()
+
+    job_service = SyncJobService()
+    queued = 0
+    for user_id, countdown in plan:
+        job = job_service.start_sync(user_id, countdown=countdown)
+        client.zadd(queued_key, {str(user_id): now + GARMIN_FLEET_SYNC_INTERVAL})
+        if not job["deduplicated"]:
+            queued += 1
+    return queued
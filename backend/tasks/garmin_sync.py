@@ -0,0 +1,86 @@
+import logging
+import os
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.models.user import User
+from app.redis_client import get_redis
+from app.services.garmin_service import GarminService
+from app.services.garmin_token_store import GarminTokenStore
+from redis.exceptions import WatchError
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# 재시도 설정
+GARMIN_SYNC_MAX_RETRIES = int(os.getenv("GARMIN_SYNC_MAX_RETRIES", "3"))
+GARMIN_SYNC_RETRY_BACKOFF = int(os.getenv("GARMIN_SYNC_RETRY_BACKOFF", "30"))  # 첫 재시도 대기 시간 (초), 재시도마다 2배
+
+# 사용자별 진행 중인 동기화 작업 ID를 저장하는 키 (중복 실행 방지)
+SYNC_LOCK_KEY = "garmin_sync:lock:{user_id}"
+
+class GarminSyncError(Exception):
+    """재시도 후에도 실패한 Garmin 동기화 작업의 오류"""
+
+def release_sync_lock(user_id: int, job_id: str):
+    """
+    사용자의 동기화 잠금이 해당 작업의 것일 때만 해제합니다.
+    """
+    client = get_redis()
+    key = SYNC_LOCK_KEY.format(user_id=user_id)
+    with client.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            current = pipe.get(key)
+            if current is None or current.decode() != job_id:
+                pipe.unwatch()
+                return
+            pipe.multi()
+            pipe.delete(key)
+            pipe.execute()
+        except WatchError:
+            # 확인한 뒤 잠금이 바뀌었으면 이미 다른 작업의 잠금이므로 그대로 둠
+            pass
+
+@celery_app.task(bind=True, name="tasks.garmin_sync.sync_garmin_activities", max_retries=GARMIN_SYNC_MAX_RETRIES)
+def sync_garmin_activities(self, user_id: int):
+    """
+    Garmin Connect 활동 동기화를 백그라운드에서 실행합니다.
+    일시적인 오류는 지수 백오프로 재시도하고, 로그인 실패는 재시도하지 않습니다.
+    로그인 정보는 작업 인자로 받지 않고, 암호화된 토큰 저장소에 보관된 값(없으면 사용자에 저장된 값)을 사용합니다.
+    
+    Args:
+        user_id (int): 사용자 ID
+        
+    Returns:
+        dict: GarminService.sync_activities의 동기화 결과
+    """
+    job_id = self.request.id
+    db = SessionLocal()
+    try:
+        credentials = GarminTokenStore().load_credentials(user_id)
+        if credentials is not None:
+            garmin_email, garmin_password = credentials
+        else:
+            user = db.query(User).filter(User.id == user_id).first()
+            if user is None or not user.garmin_email:
+                release_sync_lock(user_id, job_id)
+                raise GarminSyncError("Garmin account is not connected")
+            garmin_email, garmin_password = user.garmin_email, user.garmin_password
+
+        def report_progress(stage: str, **info):
+            self.update_state(state="PROGRESS", meta={"stage": stage, **info})
+
+        try:
+            result = GarminService(db).sync_activities(user_id, garmin_email, garmin_password, progress=report_progress)
+        except HTTPException as e:
+            if e.status_code == 401 or self.request.retries >= self.max_retries:
+                release_sync_lock(user_id, job_id)
+                raise GarminSyncError(str(e.detail))
+            countdown = GARMIN_SYNC_RETRY_BACKOFF * 2 ** self.request.retries
+            logger.warning(f"Garmin sync for user {user_id} failed, retrying in {countdown}s: {e.detail}")
+            raise self.retry(exc=GarminSyncError(str(e.detail)), countdown=countdown)
+
+        release_sync_lock(user_id, job_id)
+        return result
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.activity import Activity, ActivityComment, ActivityFeedback, ActivitySplit
+from app.models.user import User
+from app.services.activity_service import ActivityService
+from app.services.stats_service import StatsService
+
+def add_activities(db, count: int, start: int = 0, user_id: int = 1):
+    if db.get(User, user_id) is None:
+        db.add(User(id=user_id, username=f"runner{user_id}", email=f"runner{user_id}@example.com"))
+        db.flush()
+    for index in range(start, start + count):
+        activity_id = 1000 + index
+        db.add(Activity(
+            user_id=user_id, activity_id=activity_id, activity_name=f"run {index}",
+            start_time_local=datetime(2025, 1, 1, 7) + timedelta(days=index),
+            distance=10000, duration=3000, average_speed=3.3, max_speed=4.0
+        ))
+        for lap_index in range(3):
+            db.add(ActivitySplit(user_id=user_id, activity_id=activity_id, lap_index=lap_index, distance=1000, duration=300, average_speed=3.3, max_speed=4.0))
+        db.add(ActivityComment(user_id=user_id, activity_id=activity_id, comment="good", created_at=datetime(2025, 1, 2)))
+        db.add(ActivityFeedback(user_id=user_id, activity_id=activity_id, feedback_data="keep going", created_at=datetime(2025, 1, 2)))
+    db.commit()
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+def count_queries(db, method, *args):
+    db.expire_all()
+    with QueryCounter() as counter:
+        result = method(*args)
+    return counter.count, result
+
+@pytest.mark.parametrize("method", ["get_activities_laps_with_comments", "get_activity_summary", "get_monthly_activity_summary"])
+def test_query_count_does_not_grow_with_activities(db, method):
+    service = ActivityService(db)
+    add_activities(db, 5)
+    StatsService(db).rebuild()
+    small, _ = count_queries(db, getattr(service, method), 1)
+    add_activities(db, 100, start=5)
+    StatsService(db).rebuild()
+    large, _ = count_queries(db, getattr(service, method), 1)
+    assert large == small
+
+def test_laps_with_comments_groups_children_per_activity(db):
+    add_activities(db, 3)
+    activities = ActivityService(db).get_activities_laps_with_comments(1)
+    assert [activity["activity_id"] for activity in activities] == [1002, 1001, 1000]
+    for activity in activities:
+        assert [lap["lap_index"] for lap in activity["laps"]] == [0, 1, 2]
+        assert [comment["comment"] for comment in activity["comments"]] == ["good"]
+        assert activity["feedback"] == "keep going"
+
+def test_shared_garmin_account_keeps_activities_per_user(db):
+    # 같은 Garmin 계정을 연결한 두 사용자는 같은 activity_id를 각자 저장함
+    add_activities(db, 2, user_id=1)
+    add_activities(db, 2, user_id=2)
+    service = ActivityService(db)
+    assert [len(activity["laps"]) for activity in service.get_activities_laps_with_comments(2)] == [3, 3]
+
+    service.delete_activity(1, 1000)
+    assert [activity["activity_id"] for activity in service.get_activities_laps_with_comments(1)] == [1001]
+    remaining = service.get_activities_laps_with_comments(2)
+    assert [activity["activity_id"] for activity in remaining] == [1001, 1000]
+    assert [len(activity["laps"]) for activity in remaining] == [3, 3]
+    assert len(service.get_activity_laps(2, 1000)) == 3
+
+    service.create_activity_comment({"activity_id": 1000, "user_id": 2, "comment": "shared"})
+    assert [comment["comment"] for comment in service.get_activities_laps_with_comments(2)[1]["comments"]] == ["good", "shared"]
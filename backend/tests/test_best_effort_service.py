@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from app.models.activity import ActivityBestEffort, PersonalRecord
+from app.models.user import User
+from app.services.activity_service import ActivityService
+from app.services.best_effort_service import BestEffortService
+
+def test_manual_activity_without_garmin_id_has_no_best_efforts(db):
+    db.add(User(id=1, username="runner1", email="runner1@example.com"))
+    db.commit()
+    service = ActivityService(db)
+    service.create_activity(1, {"start_time_local": datetime(2025, 3, 1, 7), "distance": 10000, "duration": 3000})
+    assert db.query(ActivityBestEffort).count() == 0
+    assert db.query(PersonalRecord).count() == 0
+
+    service.create_activity(1, {"activity_id": 42, "start_time_local": datetime(2025, 3, 2, 7), "distance": 10000, "duration": 3000})
+    assert {effort.activity_id for effort in db.query(ActivityBestEffort)} == {42}
+    assert BestEffortService(db).rebuild(1) == {"activities": 2, "efforts": 3}
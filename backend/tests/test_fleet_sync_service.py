@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.stats import UserWeeklyStats
+from app.models.user import User
+import app.services.fleet_sync_service as fleet_sync_service
+from app.services.fleet_sync_service import GARMIN_FLEET_SHARDS, FleetSyncService, get_shard
+
+NOW = datetime(2024, 6, 3, 12)
+
+def add_users(db, user_ids, sync_date=None, status="success"):
+    db.add_all([
+        User(id=user_id, email=f"runner{user_id}@example.com", garmin_sync_status=status, garmin_sync_date=sync_date)
+        for user_id in user_ids
+    ])
+    db.commit()
+
+def test_shard_only_reads_its_own_users(db, monkeypatch):
+    # 한 tick에 모든 사용자를 동기화할 수 있을 만큼 tick을 늘림
+    monkeypatch.setattr(fleet_sync_service, "GARMIN_FLEET_SYNC_TICK", 10 ** 6)
+    add_users(db, range(1, 4 * GARMIN_FLEET_SHARDS + 1))
+    add_users(db, [100, 101], status="failed")
+
+    rows = []
+
+    def count_rows(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            rows.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_rows)
+    try:
+        planned = {
+            shard: [user_id for user_id, _ in FleetSyncService(db).plan_shard(shard, now=NOW)]
+            for shard in range(GARMIN_FLEET_SHARDS)
+        }
+    finally:
+        event.remove(engine, "before_cursor_execute", count_rows)
+
+    for shard, user_ids in planned.items():
+        assert len(user_ids) == 4
+        assert all(get_shard(user_id) == shard for user_id in user_ids)
+    assert sorted(sum(planned.values(), [])) == list(range(1, 4 * GARMIN_FLEET_SHARDS + 1))
+    # 샤드 조건이 Python이 아니라 SQL에 들어감
+    assert rows and all("%" in statement for statement in rows)
+
+def test_stalest_users_are_planned_first_within_the_tick_budget(db, monkeypatch):
+    monkeypatch.setattr(fleet_sync_service, "GARMIN_FLEET_SYNC_TICK", 1800)
+    shard_ids = [GARMIN_FLEET_SHARDS * index for index in range(1, 7)]
+    never, inactive, stale, due, fresh, queued = shard_ids
+    add_users(db, [never])
+    add_users(db, [inactive], sync_date=NOW - timedelta(days=1))
+    add_users(db, [stale], sync_date=NOW - timedelta(hours=3))
+    add_users(db, [due], sync_date=NOW - timedelta(hours=2))
+    add_users(db, [fresh], sync_date=NOW - timedelta(minutes=30))
+    add_users(db, [queued], sync_date=NOW - timedelta(hours=10))
+    # 주 3회 달리는 사용자는 기본 주기(1시간), 활동이 없는 사용자는 최대 주기(6시간)
+    db.add_all([UserWeeklyStats(user_id=user_id, period=NOW.date(), activity_count=12) for user_id in (stale, due, fresh, queued)])
+    db.commit()
+
+    plan = FleetSyncService(db).plan_shard(get_shard(never), now=NOW, recently_queued={queued})
+
+    # 예산 = ceil(4 × 1800/3600 + 2 × 1800/21600) = 3: 동기화한 적 없는 사용자, 주기 대비 4배, 3배 순서
+    # 2배 지난 사용자는 예산 밖, 30분 전 동기화한 사용자와 최근 등록한 사용자는 제외
+    assert [user_id for user_id, _ in plan] == [never, inactive, stale]
+    # tick 안에서 고르게 나눈 시작 지연 시간
+    assert [countdown for _, countdown in plan] == [0, 600, 1200]
+
+def test_shard_without_due_users_plans_nothing(db):
+    add_users(db, [GARMIN_FLEET_SHARDS], sync_date=NOW - timedelta(minutes=5))
+    service = FleetSyncService(db)
+    assert service.plan_shard(0, now=NOW) == []
+    assert service.plan_shard(1, now=NOW) == []
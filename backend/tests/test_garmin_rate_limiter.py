@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import socket
+import threading
+import time
+
+import fakeredis
+import pytest
+import requests
+import uvicorn
+
+import app.redis_client as redis_client
+from app.garmin_standin import server as standin
+from app.garmin_standin.client import GarminStandInClient
+from app.services import garmin_rate_limiter as limiter_module
+from app.services.garmin_rate_limiter import GarminRateLimiter
+
+# 스탠드인 한도: 토큰별 1초에 12회. 제한기는 초당 8회 + 버스트 2회이므로 어느 1초 구간에도 10회를 넘지 않음
+QUOTA = 12
+QUOTA_WINDOW = 1.0
+
+@pytest.fixture(scope="module")
+def standin_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(standin.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture
+def standin_token(standin_url, monkeypatch):
+    requests.post(f"{standin_url}/_standin/reset").raise_for_status()
+    config = standin.StandInConfig(
+        latency_ms=5, latency_jitter_ms=0, login_latency_ms=0, activities_per_account=5,
+        quota_per_minute=QUOTA, quota_window_seconds=QUOTA_WINDOW
+    )
+    requests.put(f"{standin_url}/_standin/config", json=config.model_dump()).raise_for_status()
+    monkeypatch.setattr(limiter_module, "GARMIN_RATE_PER_MINUTE", 8 * 60)
+    monkeypatch.setattr(limiter_module, "GARMIN_RATE_BURST", 2)
+    monkeypatch.setattr(limiter_module, "GARMIN_RATE_MAX_RETRIES", 0)
+    client = GarminStandInClient("runner@example.com", "password", standin_url)
+    client.login()
+    return client.dumps()
+
+def run_calls(standin_url: str, token: str, limiters: list, calls_per_limiter: int) -> list:
+    def call(limiter):
+        client = GarminStandInClient("runner@example.com", "password", standin_url)
+        client.loads(token)
+        return limiter.call(client.get_activities, 0, 5)
+
+    jobs = [limiter for limiter in limiters for _ in range(calls_per_limiter)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(call, jobs))
+
+def standin_stats(standin_url: str) -> dict:
+    return requests.get(f"{standin_url}/_standin/stats").json()
+
+def test_processes_sharing_redis_stay_within_quota(standin_url, standin_token):
+    # 제한기 인스턴스 두 개 = 같은 Redis를 쓰는 두 프로세스
+    started = time.monotonic()
+    results = run_calls(standin_url, standin_token, [GarminRateLimiter(), GarminRateLimiter()], 12)
+    elapsed = time.monotonic() - started
+    assert len(results) == 24 and all(len(page) == 5 for page in results)
+    assert standin_stats(standin_url)["rate_limited"] == 0
+    # 버스트 2회 이후에는 초당 8회로 제한됨
+    assert elapsed >= (24 - 2) / 8 - 0.2
+
+def test_without_limit_the_quota_is_exceeded(standin_url, standin_token, monkeypatch):
+    monkeypatch.setattr(limiter_module, "GARMIN_RATE_PER_MINUTE", 10 ** 6)
+    monkeypatch.setattr(limiter_module, "GARMIN_RATE_BURST", 10 ** 3)
+    with pytest.raises(Exception):
+        run_calls(standin_url, standin_token, [GarminRateLimiter()], 24)
+    assert standin_stats(standin_url)["rate_limited"] > 0
+
+def test_redis_outage_warns_and_keeps_a_per_process_limit(standin_url, standin_token, caplog):
+    redis_client._client = fakeredis.FakeRedis(connected=False)
+    limiter = GarminRateLimiter()
+    with caplog.at_level(logging.WARNING, logger=limiter_module.__name__):
+        results = run_calls(standin_url, standin_token, [limiter], 16)
+    assert len(results) == 16
+    assert standin_stats(standin_url)["rate_limited"] == 0
+    warnings = [record for record in caplog.records if "falling back to a per-process limit" in record.getMessage()]
+    assert len(warnings) == 1
+
+    redis_client._client = fakeredis.FakeRedis()
+    with caplog.at_level(logging.INFO, logger=limiter_module.__name__):
+        run_calls(standin_url, standin_token, [limiter], 1)
+    assert any("reconnected to Redis" in record.getMessage() for record in caplog.records)
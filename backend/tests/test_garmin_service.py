@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+import time
+
+from sqlalchemy import func
+
+from app.models.activity import Activity, ActivitySplit
+from app.models.stats import UserWeeklyStats
+from app.models.user import User
+from app.services import garmin_service as garmin_service_module
+from app.services.garmin_archive import ACTIVITY, DETAILS, SPLITS, GarminArchive
+from app.services.garmin_service import GARMIN_FETCH_MAX_WORKERS, GARMIN_FETCH_PER_USER, GarminService
+from app.services.sample_store import SampleStore
+
+FETCH_SECONDS = 0.05
+
+class SlowClient:
+    """랩 조회마다 FETCH_SECONDS만큼 걸리고 동시 요청 수를 기록하는 클라이언트"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_activity_splits(self, activity_id):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(FETCH_SECONDS)
+        with self.lock:
+            self.in_flight -= 1
+        return {"activity_id": activity_id}
+
+def test_large_backfill_does_not_starve_other_users(monkeypatch):
+    monkeypatch.setattr(garmin_service_module.garmin_rate_limiter, "call", lambda func, *args: func(*args))
+    service = GarminService(None)
+    heavy_client, light_client = SlowClient(), SlowClient()
+    heavy_ids = list(range(1, 81))
+    light_ids = list(range(1001, 1005))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        heavy = executor.submit(service.fetch_activity_splits, heavy_client, 1, heavy_ids)
+        time.sleep(FETCH_SECONDS)
+        started = time.perf_counter()
+        light = service.fetch_activity_splits(light_client, 2, light_ids)
+        light_elapsed = time.perf_counter() - started
+        heavy_result = heavy.result()
+
+    assert sorted(heavy_result) == heavy_ids
+    assert sorted(light) == light_ids
+    assert heavy_client.max_in_flight <= GARMIN_FETCH_PER_USER
+    # 큰 백필(80개 ÷ 사용자당 4개 ≈ 1초)이 끝나기를 기다리지 않고, 남는 작업 스레드에서 바로 처리되어야 함
+    assert GARMIN_FETCH_MAX_WORKERS > GARMIN_FETCH_PER_USER
+    assert light_elapsed < FETCH_SECONDS * 5
+
+class FakeGarth:
+    def dumps(self):
+        return "tokens"
+
+class SyncClient:
+    """활동 목록/랩 조회만 흉내 내는 클라이언트"""
+
+    garth = FakeGarth()
+
+    def get_activity_splits(self, activity_id):
+        return {"lapDTOs": [{"lapIndex": 1, "startTimeGMT": "2025-03-01T22:00:00.0", "distance": 1000.0, "duration": 300.0}]}
+
+def garmin_activity(activity_id, day):
+    return {
+        "activityId": activity_id,
+        "activityName": "Running",
+        "startTimeLocal": f"2025-03-{day:02d} 07:00:00",
+        "startTimeGMT": f"2025-03-{day:02d} 22:00:00",
+        "endTimeGMT": f"2025-03-{day:02d} 23:00:00",
+        "distance": 10000.0,
+        "duration": 3000.0,
+    }
+
+def test_sync_fetches_splits_without_holding_a_transaction(db, monkeypatch):
+    monkeypatch.setattr(garmin_service_module.garmin_rate_limiter, "call", lambda func, *args: func(*args))
+    db.add(User(id=1, email="runner@example.com"))
+    db.add(Activity(user_id=1, activity_id=1, start_time_local=datetime(2025, 3, 1, 7)))
+    db.commit()
+
+    service = GarminService(db)
+    monkeypatch.setattr(service, "login_client", lambda *args: SyncClient())
+    monkeypatch.setattr(service, "_fetch_new_activities", lambda *args: [garmin_activity(day, day) for day in (1, 2, 3)])
+    monkeypatch.setattr(service, "ingest_activity_samples", lambda *args: 0)
+    monkeypatch.setattr(service.token_store, "save", lambda *args: True)
+    fetch_activity_splits = service.fetch_activity_splits
+    fetched = []
+
+    def fetch_outside_transaction(client, user_id, activity_ids):
+        # Garmin 호출(호출 제한으로 수 분 걸릴 수 있음) 동안 쓰기 잠금을 잡고 있으면 다른 쓰기가 실패함
+        assert not db.in_transaction()
+        fetched.extend(activity_ids)
+        return fetch_activity_splits(client, user_id, activity_ids)
+
+    monkeypatch.setattr(service, "fetch_activity_splits", fetch_outside_transaction)
+    result = service.sync_activities(1, "runner@example.com", "password")
+
+    assert result["message"] == "Successfully synced 2 activities"
+    assert sorted(fetched) == [2, 3]
+    assert sorted(activity_id for (activity_id,) in db.query(ActivitySplit.activity_id)) == [2, 3]
+
+def test_reprocess_archive_rebuilds_rows_without_garmin_or_token_store(db, monkeypatch, tmp_path):
+    db.add_all([User(id=1, email="runner@example.com"), User(id=2, email="other@example.com")])
+    # 저장된 값이 잘못된 활동: 보관된 응답 기준으로 다시 채워져야 함
+    db.add(Activity(user_id=1, activity_id=1, start_time_local=datetime(2025, 3, 1, 7), distance=0.0))
+    db.commit()
+
+    archive = GarminArchive(str(tmp_path))
+    for activity_id in (1, 2):
+        archive.save(1, activity_id, ACTIVITY, garmin_activity(activity_id, activity_id))
+        archive.save(1, activity_id, SPLITS, SyncClient().get_activity_splits(activity_id))
+    archive.save(2, 3, ACTIVITY, garmin_activity(3, 3))
+
+    service = GarminService(db)
+    service.archive = archive
+
+    def no_token_store(*args, **kwargs):
+        raise AssertionError("reprocessing must not need the Garmin token store")
+
+    # 작업 프로세스는 fork로 이 설정을 물려받으므로 행 변환에서 GarminService를 만들면 실패함
+    monkeypatch.setattr(garmin_service_module, "GarminTokenStore", no_token_store)
+    monkeypatch.setattr(garmin_service_module, "Garmin", no_token_store)
+    result = service.reprocess_archive(user_id=1, workers=2)
+
+    assert result == {"activities": 2, "splits": 2}
+    activities = db.query(Activity).order_by(Activity.activity_id).all()
+    assert [(activity.user_id, activity.activity_id, activity.distance) for activity in activities] == [(1, 1, 10000.0), (1, 2, 10000.0)]
+    assert sorted(db.query(ActivitySplit.activity_id).filter(ActivitySplit.user_id == 1)) == [(1,), (2,)]
+    # 롤업도 보관된 값으로 다시 계산
+    assert db.query(func.sum(UserWeeklyStats.total_distance)).filter(UserWeeklyStats.user_id == 1).scalar() == 20000.0
+
+class DetailsClient:
+    """활동마다 다른 get_activity_details 응답(정상, 샘플 없음, 실패)을 돌려주는 클라이언트"""
+
+    def get_activity_details(self, activity_id, maxchart):
+        if activity_id == 3:
+            raise ConnectionError("details unavailable")
+        if activity_id == 2:
+            return {}
+        return {
+            "metricDescriptors": [{"key": "sumDuration", "metricsIndex": 0}, {"key": "directHeartRate", "metricsIndex": 1}],
+            "activityDetailMetrics": [{"metrics": [float(second), 140.0 + second]} for second in range(5)],
+        }
+
+def test_sample_ingestion_stores_what_it_can_and_archives_details(monkeypatch, tmp_path):
+    monkeypatch.setattr(garmin_service_module.garmin_rate_limiter, "call", lambda func, *args: func(*args))
+    monkeypatch.setattr(garmin_service_module, "GARMIN_ARCHIVE_ENABLED", True)
+    service = GarminService(None)
+    service.sample_store = SampleStore(str(tmp_path / "samples"))
+    service.archive = GarminArchive(str(tmp_path / "archive"))
+
+    # 한 활동의 조회 실패나 빈 응답이 다른 활동의 저장이나 동기화를 막지 않음
+    assert service.ingest_activity_samples(DetailsClient(), 1, [1, 2, 3]) == 1
+    assert service.sample_store.load(1, 1, ["hr"])["hr"].tolist() == [140.0, 141.0, 142.0, 143.0, 144.0]
+    assert not service.sample_store.exists(1, 2)
+    assert not service.sample_store.exists(1, 3)
+    # 재처리로 샘플을 다시 만들 수 있도록 가져온 원본 응답은 보관
+    assert service.archive.load(1, 1, DETAILS)["activityDetailMetrics"][0]["metrics"] == [0.0, 140.0]
+    assert service.archive.load(1, 3, DETAILS) is None
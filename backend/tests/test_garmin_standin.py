@@ -0,0 +1,16 @@
+import zlib
+
+from app.garmin_standin.fixtures import generate_synthetic
+
+def test_synthetic_activity_ids_do_not_collide_across_accounts():
+    # 두 이메일의 crc32 % 1000이 같음 (이메일 해시 일부로 ID 구간을 정하면 겹치는 경우)
+    emails = ["runner31@example.com", "runner36@example.com"]
+    assert zlib.crc32(emails[0].encode()) % 1000 == zlib.crc32(emails[1].encode()) % 1000
+
+    fixtures = [generate_synthetic(email, 50) for email in emails]
+    ids = [{activity["activityId"] for activity in fixture.activities} for fixture in fixtures]
+
+    assert len(ids[0]) == len(ids[1]) == 50
+    assert not ids[0] & ids[1]
+    # 같은 계정은 다시 만들어도 같은 ID
+    assert {activity["activityId"] for activity in generate_synthetic(emails[0], 50).activities} == ids[0]
@@ -0,0 +1,57 @@
+import os
+
+from cryptography.fernet import Fernet
+import pytest
+
+from app.services import garmin_token_store as token_store_module
+from app.services.garmin_token_store import GarminTokenStore
+
+@pytest.fixture
+def token_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "tokens"
+    monkeypatch.setattr(token_store_module, "GARMIN_TOKEN_DIR", str(directory))
+    monkeypatch.setattr(token_store_module, "GARMIN_TOKEN_KEY", None)
+    monkeypatch.setattr(token_store_module, "GARMIN_TOKEN_KEY_FILE", None)
+    monkeypatch.setattr(token_store_module, "_key_warning_logged", False)
+    return directory
+
+def test_missing_key_turns_the_store_off_instead_of_generating_one(token_dir, caplog):
+    store = GarminTokenStore("disk")
+    store.save(1, "runner@example.com", '{"access_token": "abc"}')
+
+    assert store.backend == "none"
+    assert store.load(1, "runner@example.com") is None
+    assert store.save_credentials(1, "runner@example.com", "s3cret") is False
+    assert not token_dir.exists()
+    # 경고는 프로세스마다 한 번만
+    GarminTokenStore("disk")
+    assert [record.levelname for record in caplog.records].count("WARNING") == 1
+    assert "GARMIN_TOKEN_KEY" in caplog.text
+
+def test_key_file_inside_token_dir_is_rejected(token_dir, monkeypatch, caplog):
+    token_dir.mkdir()
+    key_file = token_dir / "token.key"
+    key_file.write_bytes(Fernet.generate_key())
+    monkeypatch.setattr(token_store_module, "GARMIN_TOKEN_KEY_FILE", str(key_file))
+
+    store = GarminTokenStore("disk")
+    store.save(1, "runner@example.com", '{"access_token": "abc"}')
+
+    assert store.backend == "none"
+    assert os.listdir(token_dir) == ["token.key"]
+    assert "outside GARMIN_TOKEN_DIR" in caplog.text
+
+def test_key_file_outside_token_dir_round_trips(token_dir, tmp_path, monkeypatch):
+    key_file = tmp_path / "secrets" / "garmin.key"
+    key_file.parent.mkdir()
+    key_file.write_bytes(Fernet.generate_key() + b"\n")
+    monkeypatch.setattr(token_store_module, "GARMIN_TOKEN_KEY_FILE", str(key_file))
+
+    store = GarminTokenStore("disk")
+    store.save(1, "runner@example.com", '{"access_token": "abc"}')
+    store.save_credentials(1, "runner@example.com", "s3cret")
+
+    assert GarminTokenStore("disk").load(1, "runner@example.com") == '{"access_token": "abc"}'
+    assert GarminTokenStore("disk").load(1, "other@example.com") is None
+    assert GarminTokenStore("disk").load_credentials(1) == ("runner@example.com", "s3cret")
+    assert sorted(os.listdir(token_dir)) == ["1.credentials", "1.token"]
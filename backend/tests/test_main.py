@@ -0,0 +1,45 @@
+import asyncio
+
+from tests.test_activity_service import add_activities
+
+def call_asgi(app, path: str):
+    """
+    ASGI 앱을 직접 호출해 응답 본문이 몇 번에 나뉘어 전송됐는지 확인합니다. (버퍼링된 응답은 한 번에 전송됨)
+    """
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def run():
+        finished = asyncio.Event()
+
+        async def receive():
+            # 서버처럼 요청 본문은 한 번만 전달하고, 이후에는 응답이 끝나면 연결 종료를 알림
+            if requests:
+                return requests.pop()
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                finished.set()
+
+        await app(scope, receive, send)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+    asyncio.run(run())
+    return messages
+
+def test_export_is_streamed_through_logging_middleware(db):
+    from app.main import app
+
+    add_activities(db, 3)
+    messages = call_asgi(app, "/activities/export/user/1")
+    assert messages[0]["status"] == 200
+    chunks = [message["body"] for message in messages if message["type"] == "http.response.body" and message.get("body")]
+    assert len(chunks) == 3
+    assert b"".join(chunks).count(b"\n") == 3
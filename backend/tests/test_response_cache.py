@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+import app.redis_client as redis_client
+from app.database import async_engine
+from app.models.activity import Activity
+from app.services import data_version, response_cache
+from tests.test_activity_service import add_activities
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from app.main import app
+
+    # 프로세스 내 캐시/버전은 테스트마다 새로 시작
+    monkeypatch.setattr(response_cache, "_local_cache", data_version.LocalCache(16, 60))
+    monkeypatch.setattr(data_version, "_local_versions", {})
+    monkeypatch.setattr(response_cache, "_local_metrics", response_cache.Counter())
+    # 요청마다 이벤트 루프를 새로 만들지 않도록 하나의 클라이언트 컨텍스트에서 실행 (asyncpg 커넥션은 루프에 묶임)
+    with TestClient(app) as test_client:
+        yield test_client
+        # 다음 테스트의 이벤트 루프에서 이 루프의 커넥션을 재사용하지 않도록 같은 루프에서 풀을 정리
+        test_client.portal.call(async_engine.dispose)
+
+def summary_count(client, user_id: int = 1) -> int:
+    response = client.get(f"/activities/summary/user/{user_id}")
+    assert response.status_code == 200
+    return response.json()["total_activities"]
+
+def test_cached_summary_is_served_until_data_version_changes(client, db):
+    add_activities(db, 2)
+    client.post("/stats/rebuild")
+    assert summary_count(client) == 2
+
+    # 버전을 올리지 않고 직접 넣은 활동은 캐시 때문에 보이지 않다가, 재계산 후에는 반영됨
+    db.add(Activity(user_id=1, activity_id=5000, start_time_local=datetime(2025, 6, 1, 7), distance=5000, duration=1500))
+    db.commit()
+    assert summary_count(client) == 2
+    client.post("/stats/rebuild", params={"user_id": 1})
+    assert summary_count(client) == 3
+
+    metrics = client.get("/cache/metrics").json()["activity_summary"]
+    assert (metrics["hits"], metrics["misses"]) == (1, 2)
+
+def test_rebuild_for_all_users_invalidates_every_user(client, db):
+    add_activities(db, 1, user_id=1)
+    add_activities(db, 1, start=1, user_id=2)
+    client.post("/stats/rebuild")
+    assert (summary_count(client, 1), summary_count(client, 2)) == (1, 1)
+
+    db.add(Activity(user_id=2, activity_id=5000, start_time_local=datetime(2025, 6, 1, 7), distance=5000, duration=1500))
+    db.commit()
+    client.post("/stats/rebuild")
+    assert (summary_count(client, 1), summary_count(client, 2)) == (1, 2)
+
+def test_comment_invalidates_laps_but_not_summary(client, db):
+    add_activities(db, 1)
+    client.post("/stats/rebuild")
+    summary_count(client)
+    assert [comment["comment"] for comment in client.get("/activities/laps/user/1").json()[0]["comments"]] == ["good"]
+
+    client.post("/activities/comments/", json={"activity_id": 1000, "user_id": 1, "comment": "again"})
+    assert [comment["comment"] for comment in client.get("/activities/laps/user/1").json()[0]["comments"]] == ["good", "again"]
+    summary_count(client)
+    metrics = client.get("/cache/metrics").json()
+    assert metrics["activity_summary"]["hits"] == 1
+    assert metrics["activities_laps"]["hits"] == 0
+
+def test_falls_back_to_process_cache_when_redis_is_down(client, db):
+    add_activities(db, 1)
+    client.post("/stats/rebuild")
+    redis_client._client = fakeredis.FakeRedis(connected=False)
+    assert summary_count(client) == 1
+    assert summary_count(client) == 1
+    client.delete("/activities/user/1/1000")
+    assert summary_count(client) == 0
+    metrics = client.get("/cache/metrics").json()["activity_summary"]
+    assert (metrics["hits"], metrics["misses"]) == (1, 2)
+
+def test_encode_body_matches_jsonable_encoder():
+    value = [{"start_time_local": datetime(2025, 6, 1, 7, 30), "distance": 5000.0, "zones": {"zone_1": 3}, "name": "한강"}]
+    expected = response_cache.json.dumps(
+        response_cache.jsonable_encoder(value), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+    assert response_cache.encode_body(value) == expected
+
+def test_activity_list_pages_with_cursor_header(client, db):
+    add_activities(db, 3)
+
+    first = client.get("/activities/user/1", params={"limit": 2, "fields": "activity_id,start_time_local"})
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    second = client.get("/activities/user/1", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    pages = first.json() + second.json()
+    assert [activity["activity_id"] for activity in pages] == sorted((activity["activity_id"] for activity in pages), reverse=True)
+    assert len({activity["activity_id"] for activity in pages}) == 3
+    assert isinstance(pages[0]["start_time_local"], str)
+    assert "X-Next-Cursor" not in second.headers
+
+def test_created_activity_is_returned_and_invalidates_summary(client, db):
+    add_activities(db, 1)
+    client.post("/stats/rebuild")
+    assert summary_count(client) == 1
+
+    # 쓰기 라우트는 스레드풀의 동기 세션에서 실행되므로 commit 후에도 저장된 값을 돌려줘야 함
+    response = client.post("/activities/user/1", json={
+        "activity_id": 5000, "activity_name": "Track", "start_time_local": "2025-06-01T07:00:00", "distance": 5000, "duration": 1500
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["user_id"], body["activity_id"], body["start_time_local"]) == (1, 5000, "2025-06-01T07:00:00")
+    assert summary_count(client) == 2
+
+    assert client.delete("/activities/user/1/5000").json() == {"message": "Activity deleted successfully"}
+    assert summary_count(client) == 1
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.services.activity_service import ActivityService
+from app.services.sample_store import SampleStore, SeriesReader, parse_activity_details
+
+def make_columns(length: int = 3600):
+    time = np.arange(length, dtype=np.float64)
+    return {"time": time, "distance": time * 3.0, "hr": np.full(length, 150.0)}
+
+def test_concurrent_writers_in_one_process_do_not_collide(tmp_path):
+    store = SampleStore(str(tmp_path / "samples"))
+    reader = SeriesReader(store, str(tmp_path / "series"))
+    store.save(1, 100, make_columns())
+
+    def materialize(_):
+        # 같은 활동의 캐시를 여러 스레드가 동시에 다시 만들어도 임시 파일 이름이 겹치지 않아야 함
+        os.utime(store.path(1, 100))
+        store.save(1, 100, make_columns())
+        series = reader.open(1, 100, ["time", "distance"])
+        return len(series["time"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(materialize, range(64))) == {3600}
+    leftovers = [name for root, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
+    assert leftovers == []
+
+def garmin_details(rows):
+    # 실제 응답처럼 metricsIndex 순서가 채널 순서와 다름
+    keys = ["directHeartRate", "sumDuration", "directSpeed", "directDoubleCadence", "directLatitude", "sumDistance"]
+    return {
+        "metricDescriptors": [{"key": key, "metricsIndex": index} for index, key in enumerate(keys)],
+        "activityDetailMetrics": [{"metrics": metrics} for metrics in rows],
+    }
+
+def test_details_round_trip_to_stored_precision_with_gaps(tmp_path):
+    details = garmin_details([
+        [None, 0.0, 2.5, 170.04, 37.12345678, 0.0],
+        [151.0, 1.0, 2.5004, 171.0, 37.12346, 2.501],
+        [152.0, 2.0, 0.0, None, None, 5.0],
+        [153.0, 3.0, 3.0, 172.0, 37.1235, 8.0],
+    ])
+    columns = parse_activity_details(details)
+    assert sorted(columns) == ["cadence", "distance", "hr", "lat", "speed", "time"]
+
+    store = SampleStore(str(tmp_path))
+    assert store.save(1, 100, columns) == 4
+    samples = store.load(1, 100, ["hr", "distance", "speed", "cadence", "lat", "pace"])
+
+    # 결측값은 NaN으로 복원되고, 값은 채널별 저장 정밀도로 반올림됨
+    np.testing.assert_array_equal(samples["hr"], [np.nan, 151, 152, 153])
+    np.testing.assert_array_equal(samples["distance"], [0.0, 2.5, 5.0, 8.0])
+    np.testing.assert_array_equal(samples["speed"], [2.5, 2.5, 0.0, 3.0])
+    np.testing.assert_array_equal(samples["cadence"], [170.0, 171.0, np.nan, 172.0])
+    np.testing.assert_allclose(samples["lat"], [37.1234568, 37.12346, np.nan, 37.1235], rtol=1e-12)
+    # 페이스는 속도에서 계산하며, 멈춘 구간은 NaN
+    np.testing.assert_array_equal(samples["pace"], [400.0, 400.0, np.nan, 1000 / 3.0])
+    # 요청한 채널만 복원
+    assert sorted(store.load(1, 100, ["hr"])) == ["hr"]
+
+def test_empty_details_store_nothing(tmp_path):
+    store = SampleStore(str(tmp_path))
+    assert parse_activity_details({}) == {}
+    assert store.save(1, 100, parse_activity_details(garmin_details([[None] * 6]))) is None
+    assert store.load(1, 100) is None
+
+def test_samples_endpoint_rejects_unknown_channels_and_missing_samples():
+    with pytest.raises(HTTPException) as unknown:
+        ActivityService(None).get_activity_samples(1, 100, ["hr", "watts"])
+    assert unknown.value.status_code == 400
+    with pytest.raises(HTTPException) as missing:
+        ActivityService(None).get_activity_samples(1, 404, ["hr"])
+    assert missing.value.status_code == 404
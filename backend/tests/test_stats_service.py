@@ -0,0 +1,73 @@
+from datetime import datetime
+import threading
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models.activity import Activity
+from app.models.stats import UserDailyStats, UserMonthlyStats, UserWeeklyStats
+from app.services.stats_service import StatsService
+
+def run(user_id=1, day=1, distance=10000.0, duration=3000.0):
+    return SimpleNamespace(user_id=user_id, start_time_local=datetime(2025, 3, day, 7), distance=distance, duration=duration)
+
+def test_apply_and_remove_accumulate_in_place(db):
+    service = StatsService(db)
+    service.apply_activities([run(day=3), run(day=4, distance=5000)])
+    service.apply_activities([run(day=4, distance=8000)])
+    db.commit()
+    month = db.query(UserMonthlyStats).one()
+    assert (month.period, month.activity_count, month.total_distance) == ("2025-03", 3, 23000)
+    assert db.query(UserWeeklyStats).count() == 1
+    assert db.query(UserDailyStats).count() == 2
+
+    service.remove_activities([run(day=3)])
+    db.commit()
+    assert [day.period.day for day in db.query(UserDailyStats).all()] == [4]
+    assert service.get_totals(1) == (2, 13000, 6000)
+
+def test_remove_without_bucket_leaves_no_rows(db):
+    StatsService(db).remove_activities([run(day=9)])
+    db.commit()
+    assert db.query(UserMonthlyStats).count() == 0
+    assert db.query(UserDailyStats).count() == 0
+
+def test_one_statement_per_rollup_regardless_of_activity_count(db):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        StatsService(db).apply_activities([run(day=day) for day in range(1, 29)])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    # 롤업별 INSERT ... ON CONFLICT 한 번 + 빈 버킷 정리 DELETE 한 번
+    assert len(statements) == 6
+    assert sum("ON CONFLICT" in statement for statement in statements) == 3
+
+def test_concurrent_syncs_do_not_lose_updates(db):
+    def sync(distance):
+        session = SessionLocal()
+        try:
+            for _ in range(10):
+                StatsService(session).apply_activities([run(day=5, distance=distance)])
+                session.commit()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=sync, args=(distance,)) for distance in (1000, 2000, 3000, 4000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert StatsService(db).get_totals(1) == (40, 100000, 120000)
+
+def test_rebuild_matches_incremental_updates(db):
+    db.add_all([Activity(user_id=1, activity_id=index, start_time_local=datetime(2025, 3, index, 7), distance=1000 * index, duration=300) for index in range(1, 6)])
+    db.commit()
+    service = StatsService(db)
+    service.apply_activities(db.query(Activity).all())
+    db.commit()
+    incremental = [(row.period, row.activity_count, row.total_distance) for row in service.get_daily_stats(1)]
+    service.rebuild(1)
+    assert [(row.period, row.activity_count, row.total_distance) for row in service.get_daily_stats(1)] == incremental
@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from fastapi import HTTPException
+import pytest
+
+from app.services import sync_job_service as sync_job_module
+from app.services.garmin_token_store import GarminTokenStore
+from app.services.sync_job_service import SyncJobService
+from tasks.garmin_sync import SYNC_LOCK_KEY, release_sync_lock
+
+FINISHED_JOB_ID = "finished-job"
+
+class FakeAsyncResult:
+    """끝난 작업(FINISHED_JOB_ID)만 ready로 보고하는 AsyncResult 대체. 확인이 겹치도록 잠깐 대기함"""
+
+    def __init__(self, job_id, app=None):
+        self.job_id = job_id
+        self.state = "SUCCESS" if job_id == FINISHED_JOB_ID else "PENDING"
+        self.info = None
+        self.result = None
+
+    def ready(self):
+        time.sleep(0.05)
+        return self.job_id == FINISHED_JOB_ID
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def apply_async(args=None, kwargs=None, task_id=None, countdown=0):
+        with lock:
+            calls.append({"args": args, "kwargs": kwargs, "task_id": task_id})
+
+    monkeypatch.setattr(sync_job_module, "AsyncResult", FakeAsyncResult)
+    monkeypatch.setattr(sync_job_module.sync_garmin_activities, "apply_async", apply_async)
+    return calls
+
+def test_start_sync_keeps_password_out_of_task_args(enqueued):
+    job = SyncJobService().start_sync(1, "runner@example.com", "s3cret")
+
+    assert job["deduplicated"] is False
+    assert enqueued == [{"args": [1], "kwargs": None, "task_id": job["job_id"]}]
+    # 워커는 암호화된 저장소에서 로그인 정보를 읽음
+    assert GarminTokenStore().load_credentials(1) == ("runner@example.com", "s3cret")
+    with open(GarminTokenStore()._path(1, "credentials"), "rb") as f:
+        assert b"s3cret" not in f.read()
+
+def test_start_sync_deduplicates_running_job(enqueued):
+    first = SyncJobService().start_sync(1)
+    second = SyncJobService().start_sync(1)
+
+    assert second["deduplicated"] is True
+    assert second["job_id"] == first["job_id"]
+    assert len(enqueued) == 1
+
+def test_concurrent_takeover_of_stale_lock_enqueues_one_job(enqueued, fake_redis):
+    fake_redis.set(SYNC_LOCK_KEY.format(user_id=1), FINISHED_JOB_ID)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        jobs = list(executor.map(lambda _: SyncJobService().start_sync(1), range(4)))
+
+    # 끝난 작업의 잠금은 한 요청만 넘겨받고, 나머지는 그 작업을 반환받아야 함
+    assert len(enqueued) == 1
+    assert {job["job_id"] for job in jobs} == {enqueued[0]["task_id"]}
+    assert sum(not job["deduplicated"] for job in jobs) == 1
+    assert fake_redis.get(SYNC_LOCK_KEY.format(user_id=1)).decode() == enqueued[0]["task_id"]
+
+def test_release_sync_lock_keeps_other_jobs_lock(fake_redis):
+    key = SYNC_LOCK_KEY.format(user_id=1)
+    fake_redis.set(key, "other-job")
+    release_sync_lock(1, "my-job")
+    assert fake_redis.get(key) == b"other-job"
+
+    release_sync_lock(1, "other-job")
+    assert fake_redis.get(key) is None
+
+def raise_broker_down(**kwargs):
+    raise ConnectionError("broker is down")
+
+def test_enqueue_failure_releases_only_this_calls_lock(enqueued, fake_redis, monkeypatch):
+    key = SYNC_LOCK_KEY.format(user_id=1)
+
+    def apply_async(args=None, kwargs=None, task_id=None, countdown=0):
+        # 등록하는 동안 다른 요청이 (만료된) 잠금을 넘겨받은 경우
+        fake_redis.set(key, "other-job")
+        raise ConnectionError("broker is down")
+
+    monkeypatch.setattr(sync_job_module.sync_garmin_activities, "apply_async", apply_async)
+    with pytest.raises(HTTPException) as error:
+        SyncJobService().start_sync(1)
+    assert error.value.status_code == 503
+    assert fake_redis.get(key) == b"other-job"
+
+    # 잠금이 그대로 이 요청의 것이면 해제해 다음 요청이 바로 등록할 수 있음
+    fake_redis.delete(key)
+    monkeypatch.setattr(sync_job_module.sync_garmin_activities, "apply_async", raise_broker_down)
+    with pytest.raises(HTTPException):
+        SyncJobService().start_sync(1)
+    assert fake_redis.get(key) is None
+
+def test_redis_outage_during_cleanup_still_returns_503(enqueued, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(sync_job_module.sync_garmin_activities, "apply_async", fail)
+    monkeypatch.setattr(sync_job_module, "release_sync_lock", fail)
+    with pytest.raises(HTTPException) as error:
+        SyncJobService().start_sync(1)
+    assert error.value.status_code == 503
+
+def test_failed_status_lookup_keeps_the_running_jobs_lock(enqueued, fake_redis, monkeypatch):
+    key = SYNC_LOCK_KEY.format(user_id=1)
+    fake_redis.set(key, "running-job")
+
+    def get_job(self, job_id):
+        raise HTTPException(status_code=404, detail="Job result expired")
+
+    monkeypatch.setattr(SyncJobService, "get_job", get_job)
+    with pytest.raises(HTTPException) as error:
+        SyncJobService().start_sync(1)
+    assert error.value.status_code == 404
+    assert fake_redis.get(key) == b"running-job"
+    assert enqueued == []
@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity
+from app.models.stats import UserTrainingLoad
+from app.models.user import User
+from app.services.training_load_service import (
+    TRAINING_LOAD_REST_HR, TRAINING_LOAD_THRESHOLD_HR_RATIO, TrainingLoadService, compute_activity_loads, estimate_garmin_scale
+)
+
+FIRST_DAY = date.today() - timedelta(days=30)
+
+def add_runs(db, user_id, count, first_id=1, first_day=FIRST_DAY, max_hr=180, training_load=None):
+    db.add_all([
+        Activity(
+            user_id=user_id,
+            activity_id=first_id + index,
+            start_time_local=datetime.combine(first_day + timedelta(days=index), datetime.min.time()) + timedelta(hours=7),
+            duration=3600.0,
+            average_hr=150,
+            max_hr=max_hr,
+            activity_training_load=training_load
+        )
+        for index in range(count)
+    ])
+    db.flush()
+
+def loads_by_day(db, user_id):
+    return [(row.period, row.load, row.ctl) for row in db.query(UserTrainingLoad).filter(
+        UserTrainingLoad.user_id == user_id
+    ).order_by(UserTrainingLoad.period)]
+
+def test_one_heart_rate_spike_does_not_rescale_max_hr(db):
+    db.add(User(id=1, email="runner@example.com"))
+    add_runs(db, 1, 30)
+    add_runs(db, 1, 1, first_id=100, max_hr=215)
+    add_runs(db, 1, 1, first_id=101, max_hr=250)
+    assert TrainingLoadService(db).get_max_hr(1) == pytest.approx(180)
+
+    db.add(User(id=2, email="aged@example.com", age=40))
+    add_runs(db, 2, 3, first_id=200, max_hr=199)
+    assert TrainingLoadService(db).get_max_hr(2) == 180
+
+def test_stored_profile_keeps_incremental_and_rebuilt_loads_equal(db):
+    db.add(User(id=1, email="runner@example.com"))
+    add_runs(db, 1, 20)
+    service = TrainingLoadService(db)
+    service.update(1)
+    db.commit()
+    stored = db.get(User, 1).training_max_hr
+    assert stored == pytest.approx(180)
+
+    # 나중에 들어온 높은 심박 활동이 이미 저장된 최대 심박수를 바꾸지 않음
+    add_runs(db, 1, 5, first_id=100, first_day=FIRST_DAY + timedelta(days=20), max_hr=205)
+    service.update(1, since=FIRST_DAY + timedelta(days=20))
+    db.commit()
+    incremental = loads_by_day(db, 1)
+    assert db.get(User, 1).training_max_hr == stored
+
+    service.rebuild(1)
+    rebuilt = loads_by_day(db, 1)
+    assert [period for period, _, _ in rebuilt] == [period for period, _, _ in incremental]
+    assert np.allclose([row[1:] for row in rebuilt], [row[1:] for row in incremental])
+
+    service.rebuild(1, refresh_profile=True)
+    assert db.get(User, 1).training_max_hr > stored
+
+def test_load_sources_share_a_threshold_hour_scale():
+    max_hr = 180.0
+    threshold_hr = max_hr * TRAINING_LOAD_THRESHOLD_HR_RATIO
+    nan = float("nan")
+    loads = compute_activity_loads(
+        np.array([150.0, nan, nan]),
+        np.array([[nan] * 5, [0, 0, 0, 3600, 0], [nan] * 5]),
+        np.array([threshold_hr, threshold_hr, threshold_hr]),
+        np.array([3600.0, 3600.0, 3600.0]),
+        max_hr,
+        garmin_scale=2 / 3
+    )
+    # 역치 심박으로 1시간: Garmin 부하 150 × 배율, 영역 4에서 60분, 평균 심박 = 역치 심박 모두 100
+    assert loads == pytest.approx([100, 100, 100])
+
+def test_garmin_scale_is_calibrated_against_heart_rate_load():
+    max_hr = 180.0
+    average_hr = np.full(6, max_hr * TRAINING_LOAD_THRESHOLD_HR_RATIO)
+    duration = np.full(6, 3600.0)
+    # 역치 1시간(공통 척도 100)에 Garmin이 200을 주는 사용자 (하나는 튄 값)
+    training_load = np.array([200.0, 200, 200, 200, 200, 900])
+    assert estimate_garmin_scale(training_load, average_hr, duration, max_hr, TRAINING_LOAD_REST_HR) == pytest.approx(0.5)
+    # 보정할 활동이 부족하면 기본 배율
+    assert estimate_garmin_scale(training_load[:2], average_hr[:2], duration[:2], max_hr) == 1.0
@@ -485,7 +485,7 @@ with tab5:
                         response = requests.post(
                             f"{API_BASE_URL}/activities/comments/",
                             headers={"Authorization": f"Bearer {st.session_state.token}"},
-                            json={"activity_id": activity['activity_id'], "comment": user_comment}
+                            json={"activity_id": activity['activity_id'], "user_id": st.session_state.user['id'], "comment": user_comment}
                         )
                         if response.status_code == 200:
                             st.success("댓글이 성공적으로 저장되었습니다.")
@@ -531,9 +531,8 @@ with tab5:
             headers={"Authorization": f"Bearer {st.session_state.token}"},
             json={"garmin_email": garmin_email, "garmin_password": garmin_password}
         )
-        if response.status_code == 200:
-            st.success("가민에서 활동 기록 가져오기 완료")
-            st.rerun()
+        if response.status_code in (200, 202):
+            st.success("가민에서 활동 기록 가져오기를 시작했습니다. 잠시 후 새로고침해 주세요.")
         else:
             st.error("가민에서 활동 기록 가져오기 실패")
     
@@ -162,7 +162,7 @@ class AIProvider:
                 logger.info(f"훈련 일정 생성 시도 {attempt + 1}/{max_retries}")
                 
                 # 에이전트 생성 및 실행
-                tools = self.tool_manager.create_tools(user_id, ["GetRunningActivities", "GetMonthlyActivitySummary", "GetSchedules"])
+                tools = self.tool_manager.create_tools(user_id, ["GetRunningActivities", "GetMonthlyActivitySummary", "GetRacePredictions", "GetSchedules"])
                 logger.info("도구 생성 완료")
                 
                 agent = self._create_training_schedule_agent(tools)
@@ -249,6 +249,7 @@ class AIProvider:
             2. 사용자 수준에 맞는 난이도
             3. 점진적 부하 증가
             4. 충분한 휴식 시간 확보 (휴식은 일정에 포함하지 않음)
+            5. 구간 페이스는 GetRacePredictions의 현재 예상 기록을 기준으로 목표 시간까지 점진적으로 조정
             
             훈련 설명 필수 항목:
             1. 워밍업/쿨다운 시간
@@ -288,6 +289,9 @@ class AIProvider:
             tools = self.tool_manager.create_tools(user_id, [
                 "GetRunningActivities", 
                 "GetMonthlyActivitySummary",
+                "GetTrainingLoad",
+                "GetPersonalRecords",
+                "GetRacePredictions",
                 "GetSchedules",
                 "UpdateSchedule"
             ])
@@ -355,11 +359,24 @@ class AIProvider:
                - 월간 활동 목표를 설정할 때 사용
                - 월간 활동 성과를 평가할 때 사용
 
-            3. 일정 조회 도구 (GetSchedules)
+            3. 훈련 부하 조회 도구 (GetTrainingLoad)
+               - 현재 체력(CTL), 피로(ATL), 컨디션(TSB)을 확인할 때 사용
+               - 훈련 강도를 높이거나 줄일지 판단할 때 사용
+               - 과훈련/부상 위험을 평가할 때 사용
+
+            4. 개인 기록 조회 도구 (GetPersonalRecords)
+               - 거리별 최고 기록(1k, 5k, 10k, 하프, 풀)을 물어볼 때 사용
+               - 목표 기록이나 훈련 페이스를 정할 때 사용
+
+            5. 예상 기록 조회 도구 (GetRacePredictions)
+               - 5k, 10k, 하프, 풀 예상 완주 기록을 물어볼 때 사용
+               - 목표 기록이 현실적인지 판단하거나 훈련 페이스를 정할 때 사용 (직접 추측하지 말 것)
+
+            6. 일정 조회 도구 (GetSchedules)
                - 현재 훈련 일정을 확인할 때 사용
                - 일정 충돌을 확인할 때 사용
 
-            4. 일정 수정 도구 (UpdateSchedule)
+            7. 일정 수정 도구 (UpdateSchedule)
                - 훈련 강도 조절이 필요할 때 사용
                - 훈련 일정 최적화가 필요할 때 사용
                - 부상 예방을 위한 일정 조정이 필요할 때 사용
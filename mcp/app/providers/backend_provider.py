@@ -31,6 +31,36 @@ class BackendProvider:
             logger.error(f"월간 활동 요약 조회 실패: {str(e)}")
             return {}
 
+    def get_training_load(self, user_id: int) -> Dict[str, Any]:
+        """훈련 부하(CTL/ATL/TSB) 조회"""
+        try:
+            response = self.session.get(f"{self.base_url}/activities/training-load/user/{user_id}")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"훈련 부하 조회 실패: {str(e)}")
+            return {}
+
+    def get_personal_records(self, user_id: int) -> List[Dict[str, Any]]:
+        """거리별 개인 최고 기록 조회"""
+        try:
+            response = self.session.get(f"{self.base_url}/activities/personal-records/user/{user_id}")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"개인 최고 기록 조회 실패: {str(e)}")
+            return []
+
+    def get_race_predictions(self, user_id: int) -> Dict[str, Any]:
+        """대회 거리별 예상 기록 조회"""
+        try:
+            response = self.session.get(f"{self.base_url}/activities/race-predictions/user/{user_id}")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"예상 기록 조회 실패: {str(e)}")
+            return {}
+
     def get_schedules(self, user_id: int) -> List[Dict[str, Any]]:
         """훈련 일정 조회"""
         try:
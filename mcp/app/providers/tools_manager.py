@@ -46,6 +46,60 @@ class ToolManager:
             description="러닝 활동 월간 통계를 조회합니다. 월별 거리, 소요시간, 평균 페이스를 조회합니다."
         )
 
+    def create_get_training_load_tool(self, user_id: int) -> Tool:
+        """훈련 부하 조회 도구 생성"""
+        def get_training_load(_):
+            try:
+                logger.info("GetTrainingLoad 도구 실행 시작")
+                result = self.backend_provider.get_training_load(user_id)
+                logger.info(f"GetTrainingLoad 결과: {result.get('current')}")
+                return json.dumps(result, ensure_ascii=False)
+            except Exception as e:
+                logger.error(f"Error in get_training_load: {str(e)}")
+                return "{}"
+        
+        return Tool(
+            name="GetTrainingLoad",
+            func=get_training_load,
+            description="최근 90일의 일별 훈련 부하(load)와 체력(CTL, 42일 평균 부하), 피로(ATL, 7일 평균 부하), 컨디션(TSB = 전날 CTL - ATL)을 조회합니다. current는 오늘 값이며, TSB가 크게 음수면 피로 누적, 양수면 회복된 상태입니다."
+        )
+
+    def create_get_personal_records_tool(self, user_id: int) -> Tool:
+        """개인 최고 기록 조회 도구 생성"""
+        def get_personal_records(_):
+            try:
+                logger.info("GetPersonalRecords 도구 실행 시작")
+                result = self.backend_provider.get_personal_records(user_id)
+                logger.info(f"GetPersonalRecords 결과: {result}")
+                return json.dumps(result, ensure_ascii=False, default=str)
+            except Exception as e:
+                logger.error(f"Error in get_personal_records: {str(e)}")
+                return "[]"
+        
+        return Tool(
+            name="GetPersonalRecords",
+            func=get_personal_records,
+            description="1k, 5k, 10k, 하프(half), 풀(full) 거리별 개인 최고 기록을 조회합니다. elapsed는 기록(초), pace는 초/km이며, 기록을 세운 활동 ID와 날짜를 포함합니다. 활동 중 가장 빨랐던 구간 기준이므로 대회 기록이 아니어도 됩니다."
+        )
+
+    def create_get_race_predictions_tool(self, user_id: int) -> Tool:
+        """대회 예상 기록 조회 도구 생성"""
+        def get_race_predictions(_):
+            try:
+                logger.info("GetRacePredictions 도구 실행 시작")
+                result = self.backend_provider.get_race_predictions(user_id)
+                logger.info(f"GetRacePredictions 결과: {result}")
+                return json.dumps(result, ensure_ascii=False, default=str)
+            except Exception as e:
+                logger.error(f"Error in get_race_predictions: {str(e)}")
+                return "{}"
+        
+        return Tool(
+            name="GetRacePredictions",
+            func=get_race_predictions,
+            description="최근 6개월 최고 기록과 Garmin VO2max로 계산한 VDOT와 5k, 10k, 하프(half), 풀(full) 예상 기록을 조회합니다. predicted_time은 예상 기록(초), predicted_time_text는 h:mm:ss, predicted_pace는 초/km입니다. riegel_time은 가장 가까운 거리의 최근 기록으로 Riegel 공식을 적용한 값입니다. 목표 기록과 훈련 페이스를 정할 때 추측하지 말고 이 값을 기준으로 사용하세요."
+        )
+
     def create_get_schedules_tool(self, user_id: int) -> Tool:
         """훈련 일정 조회 도구 생성"""
         def get_schedules(_):
@@ -98,6 +152,9 @@ class ToolManager:
         tool_creators = {
             "GetRunningActivities": lambda: self.create_get_activities_tool(user_id),
             "GetMonthlyActivitySummary": lambda: self.create_get_monthly_summary_tool(user_id),
+            "GetTrainingLoad": lambda: self.create_get_training_load_tool(user_id),
+            "GetPersonalRecords": lambda: self.create_get_personal_records_tool(user_id),
+            "GetRacePredictions": lambda: self.create_get_race_predictions_tool(user_id),
             "GetSchedules": lambda: self.create_get_schedules_tool(user_id),
             "UpdateSchedule": lambda: self.create_update_schedule_tool(user_id)
         }